@@ -26,4 +26,8 @@ setup(
         'beautifulsoup4',
         'lxml',
     ],
+    extras_require={
+        'parquet': ['pyarrow'],
+        'numpy': ['numpy'],
+    },
 )
\ No newline at end of file
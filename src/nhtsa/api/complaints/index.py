@@ -1,8 +1,11 @@
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Iterator, Callable, List, Optional
 from pydantic import parse_obj_as
 import logging
 
-from .models import ComplaintByVehicle, ModelYear, Make, Model, ComplaintByOdiNumber, ComplaintFlatFile
+from .models import ComplaintByVehicle, ModelYear, Make, Model, ComplaintByOdiNumber, ComplaintFlatFile, ComplaintFlatFileRecord
+from .sync import ComplaintIndex
+from ...lib.flat_files import iter_flat_file_records
+from ...lib.columnar import DEFAULT_ROW_GROUP_SIZE, write_parquet
 
 if TYPE_CHECKING:
     from ...client import NhtsaClient
@@ -23,6 +26,22 @@ class ComplaintsAPI:
         """
         self.client = client
 
+    def open_index(self, database_path: str) -> ComplaintIndex:
+        """
+        Opens (or creates) a local SQLite index of complaints; call `await index.sync()` to fill or update it.
+
+        Args:
+            database_path (str): Path of the SQLite file.
+
+        Returns:
+            ComplaintIndex: The index.
+        """
+        return ComplaintIndex(self, database_path)
+
+    @staticmethod
+    def _complaints_by_vehicle_url(make: str, model: str, model_year: int) -> str:
+        return f"/complaints/complaintsByVehicle?make={make}&model={model}&modelYear={model_year}"
+
     async def get_complaints_by_vehicle(self, make: str, model: str, model_year: int) -> ComplaintByVehicle:
         """
         Make the request to get the complaints for the required combination of Model Year, Make, and Model.
@@ -35,7 +54,7 @@ class ComplaintsAPI:
         Returns:
             ComplaintByVehicle: A Pydantic model representing a list of complaints for the given vehicle.
         """
-        url = f"/complaints/complaintsByVehicle?make={make}&model={model}&modelYear={model_year}"
+        url = self._complaints_by_vehicle_url(make, model, model_year)
         response = await self.client._request("GET", url)
         return parse_obj_as(ComplaintByVehicle, response.json())
 
@@ -104,8 +123,54 @@ class ComplaintsAPI:
             bytes: The content of the downloaded file.
         """
         logger.info(f"Downloading complaint data from: {file_url}")
-        response = await self.client._request("GET", file_url, follow_redirects=True, base_url="")
-        return response.content
+        # Goes through StaticFilesAPI so unchanged archives are served from the download store (if configured)
+        return await self.client.static_files.download_file(file_url)
+
+    async def download_flat_file_to(self, file_url: str, destination: str, chunk_size: int = 1024 * 1024, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> str:
+        """
+        Streams a complaint flat file (ZIP) to disk without holding the archive in memory.
+
+        Args:
+            file_url (str): The full URL of the flat file (e.g., from get_flat_file_metadata).
+            destination (str): The file path to write to.
+            chunk_size (int): Size in bytes of the chunks written to disk.
+            progress_callback (Optional[Callable[[int, Optional[int]], None]]): Called with the bytes received so far and the total size.
+
+        Returns:
+            str: The destination path.
+        """
+        logger.info(f"Streaming complaint data from: {file_url} to {destination}")
+        return await self.client.static_files.download_file_to(file_url, destination, chunk_size=chunk_size, progress_callback=progress_callback)
+
+    def iter_flat_file_records(self, zip_path: str, member: Optional[str] = None) -> Iterator[ComplaintFlatFileRecord]:
+        """
+        Lazily reads a downloaded complaints flat file (e.g., FLAT_CMPL.zip) without extracting it,
+        yielding one typed record per row in constant memory.
+
+        Args:
+            zip_path (str): Path to the downloaded ZIP archive (see download_flat_file_to).
+            member (Optional[str]): Name of the .txt file inside the archive. Defaults to the first .txt member.
+
+        Returns:
+            Iterator[ComplaintFlatFileRecord]: A generator of records.
+        """
+        return iter_flat_file_records(zip_path, ComplaintFlatFileRecord, member=member)
+
+    def export_flat_file_to_parquet(self, zip_path: str, destination: str, member: Optional[str] = None, row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> int:
+        """
+        Converts a downloaded complaints flat file into a Parquet file with typed columns (dates, ints, booleans),
+        streaming rows from the archive in row-group batches. Requires pyarrow.
+
+        Args:
+            zip_path (str): Path to the downloaded ZIP archive.
+            destination (str): The Parquet file to write.
+            member (Optional[str]): Name of the .txt file inside the archive. Defaults to the first .txt member.
+            row_group_size (int): Number of rows per Parquet row group.
+
+        Returns:
+            int: The number of rows written.
+        """
+        return write_parquet(self.iter_flat_file_records(zip_path, member=member), ComplaintFlatFileRecord, destination, row_group_size=row_group_size)
 
     async def get_flat_file_metadata(self) -> List[ComplaintFlatFile]:
         """
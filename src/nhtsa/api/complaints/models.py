@@ -1,6 +1,6 @@
 from typing import List, Optional
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
 
 
 class ComplaintBaseResponse(BaseModel):
@@ -86,3 +86,59 @@ class ComplaintFlatFile(BaseModel):
     path: str = Field(..., description="The URL path to the complaint flat file.")
     size: str = Field(..., description="The size of the flat file.")
     updated: str = Field(..., description="The last updated date of the flat file.")
+
+
+class ComplaintFlatFileRecord(BaseModel):
+    """
+    Represents one row of the complaints flat file (FLAT_CMPL.zip / COMPLAINTS_RECEIVED_*.zip).
+    Fields are declared in the order of the layout in CMPL.txt; aliases are the layout's field names.
+    """
+    cmplid: Optional[str] = Field(None, alias="CMPLID", description="NHTSA's internal unique sequence number.")
+    odino: Optional[int] = Field(None, alias="ODINO", description="NHTSA's internal reference number (ODI number).")
+    mfr_name: Optional[str] = Field(None, alias="MFR_NAME", description="Manufacturer's name.")
+    maketxt: Optional[str] = Field(None, alias="MAKETXT", description="Vehicle/equipment make.")
+    modeltxt: Optional[str] = Field(None, alias="MODELTXT", description="Vehicle/equipment model.")
+    yeartxt: Optional[int] = Field(None, alias="YEARTXT", description="Model year, 9999 if unknown or N/A.")
+    crash: Optional[bool] = Field(None, alias="CRASH", description="Was vehicle involved in a crash.")
+    faildate: Optional[date] = Field(None, alias="FAILDATE", description="Date of incident.")
+    fire: Optional[bool] = Field(None, alias="FIRE", description="Was vehicle involved in a fire.")
+    injured: Optional[int] = Field(None, alias="INJURED", description="Number of persons injured.")
+    deaths: Optional[int] = Field(None, alias="DEATHS", description="Number of fatalities.")
+    compdesc: Optional[str] = Field(None, alias="COMPDESC", description="Specific component's description.")
+    city: Optional[str] = Field(None, alias="CITY", description="Consumer's city.")
+    state: Optional[str] = Field(None, alias="STATE", description="Consumer's state code.")
+    vin: Optional[str] = Field(None, alias="VIN", description="Vehicle's VIN (partial).")
+    datea: Optional[date] = Field(None, alias="DATEA", description="Date added to file.")
+    ldate: Optional[date] = Field(None, alias="LDATE", description="Date complaint received.")
+    miles: Optional[int] = Field(None, alias="MILES", description="Vehicle mileage at failure.")
+    occurences: Optional[int] = Field(None, alias="OCCURENCES", description="Number of occurrences.")
+    cdescr: Optional[str] = Field(None, alias="CDESCR", description="Description of the complaint.")
+    cmpl_type: Optional[str] = Field(None, alias="CMPL_TYPE", description="Source of complaint code.")
+    police_rpt_yn: Optional[bool] = Field(None, alias="POLICE_RPT_YN", description="Was incident reported to police.")
+    purch_dt: Optional[date] = Field(None, alias="PURCH_DT", description="Date purchased.")
+    orig_owner_yn: Optional[bool] = Field(None, alias="ORIG_OWNER_YN", description="Was original owner.")
+    anti_brakes_yn: Optional[bool] = Field(None, alias="ANTI_BRAKES_YN", description="Anti-lock brakes.")
+    cruise_cont_yn: Optional[bool] = Field(None, alias="CRUISE_CONT_YN", description="Cruise control.")
+    num_cyls: Optional[int] = Field(None, alias="NUM_CYLS", description="Number of cylinders.")
+    drive_train: Optional[str] = Field(None, alias="DRIVE_TRAIN", description="Drive train type.")
+    fuel_sys: Optional[str] = Field(None, alias="FUEL_SYS", description="Fuel system code.")
+    fuel_type: Optional[str] = Field(None, alias="FUEL_TYPE", description="Fuel type.")
+    trans_type: Optional[str] = Field(None, alias="TRANS_TYPE", description="Vehicle transmission type.")
+    veh_speed: Optional[int] = Field(None, alias="VEH_SPEED", description="Vehicle speed.")
+    dot: Optional[str] = Field(None, alias="DOT", description="Department of Transportation tire identifier.")
+    tire_size: Optional[str] = Field(None, alias="TIRE_SIZE", description="Tire size.")
+    loc_of_tire: Optional[str] = Field(None, alias="LOC_OF_TIRE", description="Location of tire code.")
+    tire_fail_type: Optional[str] = Field(None, alias="TIRE_FAIL_TYPE", description="Type of tire failure code.")
+    orig_equip_yn: Optional[bool] = Field(None, alias="ORIG_EQUIP_YN", description="Was part original equipment.")
+    manuf_dt: Optional[date] = Field(None, alias="MANUF_DT", description="Date of manufacture.")
+    seat_type: Optional[str] = Field(None, alias="SEAT_TYPE", description="Type of child seat code.")
+    restraint_type: Optional[str] = Field(None, alias="RESTRAINT_TYPE", description="Installation system code.")
+    dealer_name: Optional[str] = Field(None, alias="DEALER_NAME", description="Dealer's name.")
+    dealer_tel: Optional[str] = Field(None, alias="DEALER_TEL", description="Dealer's telephone number.")
+    dealer_city: Optional[str] = Field(None, alias="DEALER_CITY", description="Dealer's city.")
+    dealer_state: Optional[str] = Field(None, alias="DEALER_STATE", description="Dealer's state code.")
+    dealer_zip: Optional[str] = Field(None, alias="DEALER_ZIP", description="Dealer's zip code.")
+    prod_type: Optional[str] = Field(None, alias="PROD_TYPE", description="Product type code (V, T, E, C).")
+    repaired_yn: Optional[bool] = Field(None, alias="REPAIRED_YN", description="Was defective tire repaired.")
+    medical_attn: Optional[bool] = Field(None, alias="MEDICAL_ATTN", description="Was medical attention required.")
+    vehicles_towed_yn: Optional[bool] = Field(None, alias="VEHICLES_TOWED_YN", description="Was vehicle towed.")
@@ -0,0 +1,359 @@
+import json
+import logging
+import time
+from datetime import date, datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ...lib.vehicle_tree import DEFAULT_RECENT_YEARS, VehicleTreeIndex
+from .models import ComplaintFlatFileRecord, ComplaintResult
+
+if TYPE_CHECKING:
+    from .index import ComplaintsAPI
+
+logger = logging.getLogger(__name__)
+
+FLAT_FILE_URL = "https://static.nhtsa.gov/odi/ffdd/cmpl/FLAT_CMPL.zip"
+
+# Complaints written per transaction while bulk-loading the flat file.
+FLAT_FILE_BATCH_SIZE = 5000
+
+# PROD_TYPE codes of the flat file, as the API spells them in `products[].type`.
+PRODUCT_TYPES = {"V": "Vehicle", "T": "Tire", "E": "Equipment", "C": "Child Seat"}
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS complaints (odi_number INTEGER PRIMARY KEY, payload TEXT NOT NULL, source TEXT NOT NULL, updated_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS complaint_vehicles (odi_number INTEGER NOT NULL, model_year TEXT NOT NULL, make TEXT NOT NULL, model TEXT NOT NULL, "
+    "PRIMARY KEY (odi_number, model_year, make, model))",
+    "CREATE INDEX IF NOT EXISTS complaint_vehicles_vehicle ON complaint_vehicles (model_year, make, model)",
+    "CREATE TABLE IF NOT EXISTS sync_state (name TEXT PRIMARY KEY, value TEXT)",
+)
+
+
+def _iso(value: Optional[date]) -> Optional[str]:
+    return None if value is None else f"{value.isoformat()}T00:00:00"
+
+
+def _flat_product(record: ComplaintFlatFileRecord) -> Dict[str, Any]:
+    return {
+        "type": PRODUCT_TYPES.get(record.prod_type or "V", record.prod_type),
+        "productYear": None if record.yeartxt in (None, 9999) else str(record.yeartxt),
+        "productMake": record.maketxt,
+        "productModel": record.modeltxt,
+        "manufacturer": record.mfr_name,
+    }
+
+
+def flat_record_payload(record: ComplaintFlatFileRecord) -> Dict[str, Any]:
+    """
+    Converts one flat file row into the API's complaint shape (the aliases of ComplaintResult).
+    The flat file has one row per complaint, component and product; rows of the same complaint are merged with
+    merge_flat_record.
+
+    Args:
+        record (ComplaintFlatFileRecord): The row.
+
+    Returns:
+        Dict[str, Any]: The complaint payload.
+    """
+    return {
+        "odiNumber": record.odino,
+        "manufacturer": record.mfr_name,
+        "crash": bool(record.crash),
+        "fire": bool(record.fire),
+        "numberOfInjuries": record.injured or 0,
+        "numberOfDeaths": record.deaths or 0,
+        "dateOfIncident": _iso(record.faildate),
+        "dateComplaintFiled": _iso(record.ldate),
+        "vin": record.vin,
+        "components": record.compdesc,
+        "summary": record.cdescr,
+        "products": [_flat_product(record)],
+    }
+
+
+def merge_flat_record(payload: Dict[str, Any], record: ComplaintFlatFileRecord) -> None:
+    """
+    Adds the component and product of another flat file row of the same complaint to its payload, in place.
+
+    Args:
+        payload (Dict[str, Any]): The complaint payload (see flat_record_payload).
+        record (ComplaintFlatFileRecord): A further row of the same ODI number.
+    """
+    components = payload["components"].split(",") if payload["components"] else []
+    if record.compdesc and record.compdesc not in components:
+        payload["components"] = ",".join(components + [record.compdesc])
+    product = _flat_product(record)
+    if product not in payload["products"]:
+        payload["products"].append(product)
+
+
+def _vehicle_links(payload: Dict[str, Any]) -> Set[Tuple[str, str, str]]:
+    return {
+        (product["productYear"], product["productMake"], product["productModel"]) for product in payload.get("products") or []
+        if product.get("type") == "Vehicle" and product.get("productYear") and product.get("productMake") and product.get("productModel")
+    }
+
+
+class ComplaintIndex(VehicleTreeIndex):
+    """
+    Local SQLite index of consumer complaints, one row per `odi_number`.
+    One complaint is listed under every vehicle in its `products`, so complaints are deduplicated while streaming:
+    the ODI numbers already indexed are kept in memory and a complaint the index has is never parsed again. When
+    FLAT_CMPL.zip is newer than what the index last loaded from it, the whole file is bulk-loaded (no API budget
+    spent) and the API is only asked for the deltas of the `recent_years` newest model years. Without a flat file
+    the vehicle tree is walked (see VehicleTreeIndex) and every vehicle is fetched once.
+    """
+    def __init__(self, api: "ComplaintsAPI", database_path: str):
+        """
+        Initializes the ComplaintIndex.
+
+        Args:
+            api (ComplaintsAPI): The API used to sync the index.
+            database_path (str): Path of the SQLite file (created if missing).
+        """
+        super().__init__(api, database_path, schema=_SCHEMA)
+        self._known: Optional[Set[int]] = None
+
+    def _state_sync(self, name: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM sync_state WHERE name = ?", (name,)).fetchone()
+            return row[0] if row else None
+
+    def _set_state_sync(self, name: str, value: str) -> None:
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO sync_state VALUES (?, ?)", (name, value))
+
+    def _odi_numbers_sync(self) -> Set[int]:
+        with self._lock:
+            return {row[0] for row in self._connection.execute("SELECT odi_number FROM complaints")}
+
+    async def odi_numbers(self) -> Set[int]:
+        """
+        Returns the ODI numbers in the index.
+
+        Returns:
+            Set[int]: The ODI numbers.
+        """
+        return await self._run(self._odi_numbers_sync)
+
+    async def flat_file_modified(self) -> Optional[datetime]:
+        """
+        Asks the static file server when FLAT_CMPL.zip was last modified (one HEAD request).
+
+        Returns:
+            Optional[datetime]: The Last-Modified time, or None if the server does not say.
+        """
+        response = await self.api.client._request("HEAD", FLAT_FILE_URL, follow_redirects=True, use_static_client=True)
+        last_modified = response.headers.get("last-modified")
+        try:
+            return parsedate_to_datetime(last_modified) if last_modified else None
+        except (TypeError, ValueError):
+            return None
+
+    def _write_flat_batch_sync(self, batch: Dict[int, Dict[str, Any]], merges: Dict[int, List[ComplaintFlatFileRecord]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                # Rows of a complaint whose first row went out in an earlier batch are merged into the stored payload.
+                for odi_number, records in merges.items():
+                    row = self._connection.execute("SELECT payload FROM complaints WHERE odi_number = ?", (odi_number,)).fetchone()
+                    if row is None:
+                        continue
+                    payload = json.loads(row[0])
+                    for record in records:
+                        merge_flat_record(payload, record)
+                    batch[odi_number] = payload
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO complaints VALUES (?, ?, 'flat', ?)", [(odi_number, json.dumps(payload), now) for odi_number, payload in batch.items()]
+                )
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO complaint_vehicles VALUES (?, ?, ?, ?)",
+                    [(odi_number, *vehicle) for odi_number, payload in batch.items() for vehicle in _vehicle_links(payload)],
+                )
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def _load_flat_records_sync(self, records: Iterable[ComplaintFlatFileRecord]) -> Dict[str, int]:
+        stats = {"flat_rows": 0, "flat_complaints": 0}
+        loaded: Set[int] = set()
+        batch: Dict[int, Dict[str, Any]] = {}
+        merges: Dict[int, List[ComplaintFlatFileRecord]] = {}
+        for record in records:
+            stats["flat_rows"] += 1
+            if record.odino is None:
+                continue
+            if record.odino in batch:
+                merge_flat_record(batch[record.odino], record)
+            elif record.odino in loaded:
+                merges.setdefault(record.odino, []).append(record)
+            else:
+                loaded.add(record.odino)
+                batch[record.odino] = flat_record_payload(record)
+            if len(batch) >= FLAT_FILE_BATCH_SIZE:
+                self._write_flat_batch_sync(batch, merges)
+                batch, merges = {}, {}
+        self._write_flat_batch_sync(batch, merges)
+        stats["flat_complaints"] = len(loaded)
+        return stats
+
+    async def load_flat_file(self, zip_path: str) -> Dict[str, int]:
+        """
+        Bulk-loads a downloaded complaints flat file into the index, replacing the complaints it contains.
+        Reading and writing run in the default executor.
+
+        Args:
+            zip_path (str): Path of the downloaded FLAT_CMPL.zip (or a COMPLAINTS_RECEIVED_*.zip).
+
+        Returns:
+            Dict[str, int]: Counts of "flat_rows" read and distinct "flat_complaints" stored.
+        """
+        stats = await self._run(self._load_flat_records_sync, self.api.iter_flat_file_records(zip_path))
+        self._known = None
+        logger.info(f"Loaded complaints flat file {zip_path}: {stats}")
+        return stats
+
+    async def _fetch_new_complaints(self, make: str, model: str, model_year: str) -> Tuple[List[int], List[ComplaintResult]]:
+        response = await self.api.client._request("GET", self.api._complaints_by_vehicle_url(make, model, model_year))
+        odi_numbers, parsed = [], {}
+        for row in response.json().get("results") or []:
+            odi_number = row.get("odiNumber")
+            if odi_number is None:
+                continue
+            odi_numbers.append(odi_number)
+            # Only complaints the index has not seen are parsed; the rest only get this vehicle linked.
+            if odi_number not in self._known and odi_number not in parsed:
+                parsed[odi_number] = ComplaintResult.model_validate(row)
+        # Marked as known only once the whole response parsed: a row failing validation fails this vehicle
+        # without hiding its other complaints from the vehicles that list them too.
+        self._known.update(parsed)
+        return odi_numbers, list(parsed.values())
+
+    def _store_vehicle_sync(self, vehicle: Tuple[str, str, str], odi_numbers: List[int], complaints: List[ComplaintResult]) -> None:
+        now = time.time()
+        payloads = [complaint.model_dump(mode="json", by_alias=True) for complaint in complaints]
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO complaints VALUES (?, ?, 'api', ?)", [(payload["odiNumber"], json.dumps(payload), now) for payload in payloads]
+                )
+                links = {(odi_number, *vehicle) for odi_number in odi_numbers}
+                links.update((payload["odiNumber"], *link) for payload in payloads for link in _vehicle_links(payload))
+                self._connection.executemany("INSERT OR IGNORE INTO complaint_vehicles VALUES (?, ?, ?, ?)", list(links))
+                self._connection.execute("UPDATE vehicles SET fetched_at = ? WHERE model_year = ? AND make = ? AND model = ?", (now, *vehicle))
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    async def sync_vehicles(self, vehicles: List[Tuple[str, str, str]], max_concurrency: Optional[int] = None, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict[str, int]:
+        """
+        Fetches the complaints of the given vehicles concurrently (client.bulk) and indexes the ones not seen yet.
+
+        Args:
+            vehicles (List[Tuple[str, str, str]]): (model_year, make, model) tuples.
+            max_concurrency (Optional[int]): Requests in flight at once; defaults to client.bulk's default.
+            progress_callback (Optional[Callable[[int, Optional[int]], None]]): Passed to client.bulk.
+
+        Returns:
+            Dict[str, int]: Counts of "fetched" and "failed" vehicles, "new_complaints" and "duplicate_complaints"
+                            (listed again under another vehicle, so not parsed).
+        """
+        if self._known is None:
+            self._known = await self.odi_numbers()
+        stats = {"fetched": 0, "failed": 0, "new_complaints": 0, "duplicate_complaints": 0}
+        inputs = [dict(make=make, model=model, model_year=year) for year, make, model in vehicles]
+        async for result in self.api.client.bulk(self._fetch_new_complaints, inputs, max_concurrency=max_concurrency, ordered=False, progress_callback=progress_callback):
+            stats["fetched"] += 1
+            if not result.ok:
+                stats["failed"] += 1
+                continue
+            odi_numbers, complaints = result.value
+            stats["new_complaints"] += len(complaints)
+            stats["duplicate_complaints"] += len(odi_numbers) - len(complaints)
+            vehicle = (result.input["model_year"], result.input["make"], result.input["model"])
+            try:
+                await self._run(self._store_vehicle_sync, vehicle, odi_numbers, complaints)
+            except Exception as e:
+                # Unmark the complaints as known, so another vehicle (or the next sync) indexes them.
+                self._known.difference_update(complaint.odi_number for complaint in complaints)
+                stats["failed"] += 1
+                logger.error(f"Failed to index the complaints of {vehicle}: {e}", exc_info=True)
+        logger.info(f"Complaint index vehicles synced: {stats}")
+        return stats
+
+    async def sync(self, flat_file_path: Optional[str] = None, recent_years: int = DEFAULT_RECENT_YEARS, max_age: Optional[float] = None, max_concurrency: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Brings the index up to date:
+        1. With `flat_file_path`, if FLAT_CMPL.zip changed since the index last loaded it, downloads it there
+           (conditionally, through the client's download store) and bulk-loads it.
+        2. Refreshes the vehicle tree: only its `recent_years` newest model years once a flat file was loaded.
+        3. Fetches from the API the vehicles of the `recent_years` newest model years, where complaints filed after
+           the flat file show up. If no flat file was ever loaded, every vehicle not fetched yet (or older than
+           `max_age`) is fetched instead.
+
+        Args:
+            flat_file_path (Optional[str]): Where to keep FLAT_CMPL.zip; the flat file is not used when None.
+            recent_years (int): Number of newest model years that are always fetched from the API.
+            max_age (Optional[float]): Without a flat file, also fetch again vehicles older than this many seconds.
+            max_concurrency (Optional[int]): Complaint requests in flight at once.
+
+        Returns:
+            Dict[str, Any]: The counts of each step, plus "flat_file_loaded".
+        """
+        stats: Dict[str, Any] = {"flat_file_loaded": False}
+        if flat_file_path is not None:
+            modified = await self.flat_file_modified()
+            loaded = await self._run(self._state_sync, "flat_file_modified")
+            if loaded is None or (modified is not None and modified > datetime.fromisoformat(loaded)):
+                await self.api.download_flat_file_to(FLAT_FILE_URL, flat_file_path)
+                stats.update(await self.load_flat_file(flat_file_path))
+                stats["flat_file_loaded"] = True
+                await self._run(self._set_state_sync, "flat_file_modified", (modified or datetime.now(timezone.utc)).isoformat())
+            else:
+                logger.info(f"Complaints flat file unchanged since {loaded}; syncing deltas from the API only.")
+
+        # With a flat file the API only serves deltas, so only the recent model years of the tree are walked.
+        has_flat_file = await self._run(self._state_sync, "flat_file_modified") is not None
+        stats.update(await self.refresh_tree(recent_years=recent_years, only_recent=has_flat_file))
+        vehicles = await self.vehicles_to_fetch(recent_years=recent_years, max_age=max_age, only_recent=has_flat_file)
+        tree_failed = stats.pop("failed")
+        stats.update(await self.sync_vehicles(vehicles, max_concurrency=max_concurrency))
+        stats["failed"] += tree_failed
+        await self._run(self._set_state_sync, "last_sync", datetime.now(timezone.utc).isoformat())
+        return stats
+
+    async def get_complaint(self, odi_number: int) -> Optional[ComplaintResult]:
+        """
+        Returns an indexed complaint, without a network call.
+
+        Args:
+            odi_number (int): The ODI number.
+
+        Returns:
+            Optional[ComplaintResult]: The complaint, or None if it is not indexed.
+        """
+        rows = await self._query("SELECT payload FROM complaints WHERE odi_number = ?", (odi_number,))
+        return ComplaintResult.model_validate(json.loads(rows[0][0])) if rows else None
+
+    async def get_complaints_for_vehicle(self, make: str, model: str, model_year: str) -> List[ComplaintResult]:
+        """
+        Returns the indexed complaints of a vehicle, without a network call.
+
+        Args:
+            make (str): The make, as listed by the API.
+            model (str): The model, as listed by the API.
+            model_year (str): The model year.
+
+        Returns:
+            List[ComplaintResult]: The complaints.
+        """
+        rows = await self._query(
+            "SELECT c.payload FROM complaint_vehicles v JOIN complaints c USING (odi_number) WHERE v.model_year = ? AND v.make = ? AND v.model = ? ORDER BY c.odi_number",
+            (str(model_year), make, model),
+        )
+        return [ComplaintResult.model_validate(json.loads(payload)) for payload, in rows]
@@ -4,6 +4,7 @@ import logging
 from datetime import date
 
 from ...lib.models import APIResponse, Error, Meta, Pagination
+from ...lib.nrd import NrdDatabaseMixin
 
 if TYPE_CHECKING:
     from ...client import NhtsaClient
@@ -11,7 +12,7 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-class ComponentTestDatabaseAPI:
+class ComponentTestDatabaseAPI(NrdDatabaseMixin):
     """
     API for programmatic access to the NHTSA Component Test Database.
     Base URL: /nhtsa/component/
@@ -0,0 +1,96 @@
+import logging
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from ...lib.signals import require_numpy, parse_curve
+from .models import CurveData
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CurveArray:
+    """One instrumentation channel of a crash avoidance test as NumPy arrays."""
+    test_id: Optional[int]
+    curve_no: Optional[int]
+    time: "numpy.ndarray"
+    value: "numpy.ndarray"
+
+    @classmethod
+    def from_curve_data(cls, curve: CurveData) -> "CurveArray":
+        """
+        Builds a CurveArray from a CurveData model whose curve string holds (time, value) pairs.
+
+        Args:
+            curve (CurveData): The curve.
+
+        Returns:
+            CurveArray: The parsed curve; `time` and `value` are views into one parsed array.
+        """
+        samples = parse_curve(curve.curve_data, columns=2)
+        return cls(test_id=curve.test_id, curve_no=curve.curve_no, time=samples[:, 0], value=samples[:, 1])
+
+    def samples(self) -> "numpy.ndarray":
+        """
+        Returns the curve as one (samples, 2) array of (time, value) rows, the layout of the signal store.
+
+        Returns:
+            numpy.ndarray: The rows.
+        """
+        return require_numpy().column_stack((self.time, self.value))
+
+
+@dataclass
+class CurveBatch:
+    """
+    All curves of a test in 2-D arrays, one row per curve. Curves of different lengths are padded with NaN;
+    `lengths` holds the real sample count of each row.
+    """
+    test_id: Optional[int]
+    curve_nos: "numpy.ndarray"
+    time: "numpy.ndarray"
+    value: "numpy.ndarray"
+    lengths: "numpy.ndarray"
+
+    @classmethod
+    def from_curve_data(cls, curves: Sequence[CurveData]) -> "CurveBatch":
+        """
+        Parses every curve and packs them into (curves, max samples) time and value arrays.
+
+        Args:
+            curves (Sequence[CurveData]): The curves of one test, e.g. from get_all_curve_data_for_test.
+
+        Returns:
+            CurveBatch: The packed curves, in the order given.
+        """
+        numpy = require_numpy()
+        parsed = [parse_curve(curve.curve_data, columns=2) for curve in curves]
+        lengths = numpy.array([samples.shape[0] for samples in parsed], dtype=numpy.int64)
+        width = int(lengths.max()) if len(parsed) else 0
+        time = numpy.full((len(parsed), width), numpy.nan)
+        value = numpy.full((len(parsed), width), numpy.nan)
+        for row, samples in enumerate(parsed):
+            time[row, :samples.shape[0]] = samples[:, 0]
+            value[row, :samples.shape[0]] = samples[:, 1]
+        curve_nos = numpy.array([-1 if curve.curve_no is None else curve.curve_no for curve in curves], dtype=numpy.int64)
+        return cls(test_id=curves[0].test_id if curves else None, curve_nos=curve_nos, time=time, value=value, lengths=lengths)
+
+    def curve(self, curve_no: int) -> CurveArray:
+        """
+        Returns one curve of the batch, without its padding.
+
+        Args:
+            curve_no (int): The curve number.
+
+        Returns:
+            CurveArray: The curve (views into the batch arrays).
+
+        Raises:
+            KeyError: If the batch has no such curve.
+        """
+        rows = (self.curve_nos == curve_no).nonzero()[0]
+        if not len(rows):
+            raise KeyError(curve_no)
+        row = int(rows[0])
+        length = int(self.lengths[row])
+        return CurveArray(test_id=self.test_id, curve_no=curve_no, time=self.time[row, :length], value=self.value[row, :length])
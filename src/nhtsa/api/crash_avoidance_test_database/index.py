@@ -1,11 +1,14 @@
 
 from typing import TYPE_CHECKING, Any, Dict, List, Optional
 from pydantic import parse_obj_as
+import asyncio
 import logging
 from datetime import datetime
 
 from ...lib.models import APIResponse, Error, Meta, Pagination
+from ...lib.signal_store import SignalStoreMixin
 from .models import NhtsaCaDbTestData, CurveData
+from .curves import CurveArray, CurveBatch
 
 if TYPE_CHECKING:
     from ...client import NhtsaClient
@@ -13,7 +16,7 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
-class CrashAvoidanceTestDatabaseAPI:
+class CrashAvoidanceTestDatabaseAPI(SignalStoreMixin):
     """
     API for programmatic access to the NHTSA Crash Avoidance Test Database (CADB).
     Base URL: /nhtsa/cadb/
@@ -111,6 +114,44 @@ class CrashAvoidanceTestDatabaseAPI:
         response = await self.client._request("GET", url, use_nrd_client=True)
         return parse_obj_as(CurveData, response.json())
 
+    async def get_curve_array(self, test_id: int, curve_no: int) -> CurveArray:
+        """
+        Retrieves one curve of a test with its curve string parsed into NumPy time and value arrays.
+        Requires NumPy (`pip install nhtsa[numpy]`).
+
+        Args:
+            test_id (int): The ID of the test.
+            curve_no (int): The curve number.
+
+        Returns:
+            CurveArray: The parsed curve. It is also added to the attached signal store, if any.
+        """
+        curve = await self.get_all_curve_data_for_test_and_curve(test_id, curve_no)
+        array = CurveArray.from_curve_data(curve)
+        if self.signal_store is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.signal_store.put, self.database, str(test_id), curve_no, array.samples())
+        return array
+
+    async def get_curve_batch(self, test_id: int) -> CurveBatch:
+        """
+        Retrieves every curve of a test parsed into 2-D NumPy arrays (one row per curve, NaN padded).
+        Requires NumPy (`pip install nhtsa[numpy]`).
+
+        Args:
+            test_id (int): The ID of the test.
+
+        Returns:
+            CurveBatch: The parsed curves. They are also added to the attached signal store, if any.
+        """
+        curves = await self.get_all_curve_data_for_test(test_id)
+        loop = asyncio.get_running_loop()
+        # Parsing long curve strings is CPU work, so it runs in the default executor to keep the event loop free.
+        batch = await loop.run_in_executor(None, CurveBatch.from_curve_data, curves)
+        if self.signal_store is not None:
+            stored = {curve_no: batch.curve(curve_no).samples() for curve_no in batch.curve_nos.tolist()}
+            await loop.run_in_executor(None, self.signal_store.put_test, self.database, str(test_id), stored)
+        return batch
+
     async def search_test_data(
         self,
         page_number: Optional[int] = None,
@@ -1,8 +1,10 @@
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Iterator, Callable, List, Optional
 from pydantic import parse_obj_as
 import logging
 
-from .models import InvestigationFlatFile
+from .models import InvestigationFlatFile, InvestigationFlatFileRecord
+from ...lib.flat_files import iter_flat_file_records
+from ...lib.columnar import DEFAULT_ROW_GROUP_SIZE, write_parquet
 
 if TYPE_CHECKING:
     from ...client import NhtsaClient
@@ -36,8 +38,54 @@ class InvestigationsAPI:
             bytes: The content of the downloaded file.
         """
         logger.info(f"Downloading investigation data from: {file_url}")
-        response = await self.client._request("GET", file_url, follow_redirects=True, base_url="")
-        return response.content
+        # Goes through StaticFilesAPI so unchanged archives are served from the download store (if configured)
+        return await self.client.static_files.download_file(file_url)
+
+    async def download_flat_file_to(self, file_url: str, destination: str, chunk_size: int = 1024 * 1024, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> str:
+        """
+        Streams an investigation flat file (ZIP) to disk without holding the archive in memory.
+
+        Args:
+            file_url (str): The full URL of the flat file (e.g., from get_flat_file_metadata).
+            destination (str): The file path to write to.
+            chunk_size (int): Size in bytes of the chunks written to disk.
+            progress_callback (Optional[Callable[[int, Optional[int]], None]]): Called with the bytes received so far and the total size.
+
+        Returns:
+            str: The destination path.
+        """
+        logger.info(f"Streaming investigation data from: {file_url} to {destination}")
+        return await self.client.static_files.download_file_to(file_url, destination, chunk_size=chunk_size, progress_callback=progress_callback)
+
+    def iter_flat_file_records(self, zip_path: str, member: Optional[str] = None) -> Iterator[InvestigationFlatFileRecord]:
+        """
+        Lazily reads a downloaded investigations flat file (e.g., FLAT_INV.zip) without extracting it,
+        yielding one typed record per row in constant memory.
+
+        Args:
+            zip_path (str): Path to the downloaded ZIP archive (see download_flat_file_to).
+            member (Optional[str]): Name of the .txt file inside the archive. Defaults to the first .txt member.
+
+        Returns:
+            Iterator[InvestigationFlatFileRecord]: A generator of records.
+        """
+        return iter_flat_file_records(zip_path, InvestigationFlatFileRecord, member=member)
+
+    def export_flat_file_to_parquet(self, zip_path: str, destination: str, member: Optional[str] = None, row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> int:
+        """
+        Converts a downloaded investigations flat file into a Parquet file with typed columns (dates, ints, booleans),
+        streaming rows from the archive in row-group batches. Requires pyarrow.
+
+        Args:
+            zip_path (str): Path to the downloaded ZIP archive.
+            destination (str): The Parquet file to write.
+            member (Optional[str]): Name of the .txt file inside the archive. Defaults to the first .txt member.
+            row_group_size (int): Number of rows per Parquet row group.
+
+        Returns:
+            int: The number of rows written.
+        """
+        return write_parquet(self.iter_flat_file_records(zip_path, member=member), InvestigationFlatFileRecord, destination, row_group_size=row_group_size)
 
     async def get_flat_file_metadata(self) -> List[InvestigationFlatFile]:
         """
@@ -1,6 +1,6 @@
 from typing import List, Optional
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
 
 
 class InvestigationFlatFile(BaseModel):
@@ -11,6 +11,24 @@ class InvestigationFlatFile(BaseModel):
     size: str = Field(..., description="The size of the flat file.")
     updated: str = Field(..., description="The last updated date of the flat file.")
 
+
+class InvestigationFlatFileRecord(BaseModel):
+    """
+    Represents one row of the defect investigations flat file (FLAT_INV.zip).
+    Fields are declared in the order of the layout in INV.txt; aliases are the layout's field names.
+    """
+    nhtsa_action_number: Optional[str] = Field(None, alias="NHTSA_ACTION_NUMBER", description="NHTSA investigation number (e.g., PE24012).")
+    make: Optional[str] = Field(None, alias="MAKE", description="Vehicle/equipment make.")
+    model: Optional[str] = Field(None, alias="MODEL", description="Vehicle/equipment model.")
+    year: Optional[int] = Field(None, alias="YEAR", description="Model year, 9999 if unknown or N/A.")
+    compname: Optional[str] = Field(None, alias="COMPNAME", description="Component description.")
+    mfr_name: Optional[str] = Field(None, alias="MFR_NAME", description="Manufacturer's name.")
+    odate: Optional[date] = Field(None, alias="ODATE", description="Date the investigation was opened.")
+    cdate: Optional[date] = Field(None, alias="CDATE", description="Date the investigation was closed.")
+    campno: Optional[str] = Field(None, alias="CAMPNO", description="Recall campaign number, if the investigation led to a recall.")
+    subject: Optional[str] = Field(None, alias="SUBJECT", description="Subject of the investigation.")
+    summary: Optional[str] = Field(None, alias="SUMMARY", description="Summary of the investigation.")
+
 # Since the Investigations API primarily deals with downloading flat files as per the provided context,
 # there are no direct JSON API responses to model beyond the metadata of the files themselves.
 # If there were direct API endpoints for querying investigations (like for recalls or complaints),
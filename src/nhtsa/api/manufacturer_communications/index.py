@@ -1,16 +1,19 @@
 from datetime import datetime
-from typing import TYPE_CHECKING, List
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
 from pydantic import parse_obj_as
 import logging
 import re
 
-from .models import ManufacturerCommunicationFlatFile, TSBInfo
+from .models import ManufacturerCommunicationFlatFile, TSBInfo, TSBInfoColumns
+from ...lib.columnar import DEFAULT_ROW_GROUP_SIZE, write_parquet_columns
 
 if TYPE_CHECKING:
     from ...client import NhtsaClient
 
 logger = logging.getLogger(__name__)
 
+_TSB_DATA_LINE = re.compile(r'^\d+\t')
+
 
 class ManufacturerCommunicationsAPI:
     """
@@ -38,9 +41,24 @@ class ManufacturerCommunicationsAPI:
             bytes: The content of the downloaded file.
         """
         logger.info(f"Downloading manufacturer communication data from: {file_url}")
-        # Use the new static_client for downloading files
-        response = await self.client._request("GET", file_url, follow_redirects=True, use_static_client=True)
-        return response.content
+        # Goes through StaticFilesAPI so unchanged archives are served from the download store (if configured)
+        return await self.client.static_files.download_file(file_url)
+
+    async def download_flat_file_to(self, file_url: str, destination: str, chunk_size: int = 1024 * 1024, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> str:
+        """
+        Streams a manufacturer communication flat file (ZIP) to disk without holding the archive in memory.
+
+        Args:
+            file_url (str): The full URL of the flat file (e.g., from get_flat_file_metadata).
+            destination (str): The file path to write to.
+            chunk_size (int): Size in bytes of the chunks written to disk.
+            progress_callback (Optional[Callable[[int, Optional[int]], None]]): Called with the bytes received so far and the total size.
+
+        Returns:
+            str: The destination path.
+        """
+        logger.info(f"Streaming manufacturer communication data from: {file_url} to {destination}")
+        return await self.client.static_files.download_file_to(file_url, destination, chunk_size=chunk_size, progress_callback=progress_callback)
 
     async def get_flat_file_metadata(self) -> List[ManufacturerCommunicationFlatFile]:
         """
@@ -107,49 +125,80 @@ class ManufacturerCommunicationsAPI:
         Returns:
             List[TSBInfo]: A list of Pydantic models, each representing a TSB entry.
         """
+        return (await self.get_tsb_columns_from_flat_file(file_url)).to_records()
+
+    async def get_tsb_columns_from_flat_file(self, file_url: str) -> TSBInfoColumns:
+        """
+        Downloads a TSBS flat file and parses it into columns, without building a model per row.
+        Use this instead of get_tsb_information_from_flat_file for whole-file processing.
+
+        Args:
+            file_url (str): The URL of the TSBS .txt flat file to download.
+
+        Returns:
+            TSBInfoColumns: The TSB information as equal-length columns.
+        """
         logger.info(f"Fetching TSB information from flat file: {file_url}")
         file_content = await self.download_flat_file(file_url)
+        return self.parse_tsb_flat_file(file_content)
 
+    def parse_tsb_flat_file(self, file_content: bytes) -> TSBInfoColumns:
+        """
+        Parses the content of a TSBS flat file into columns.
+        Works on the whole file at once: the start of the data is located once, fields are split with bounded
+        splits in a single pass, and each distinct date string is parsed only once (dates repeat heavily).
+
+        Args:
+            file_content (bytes): The raw content of the TSBS .txt flat file.
+
+        Returns:
+            TSBInfoColumns: The TSB information as equal-length columns.
+        """
         decoded_content = file_content.decode('utf-8', errors='ignore')
         lines = decoded_content.strip().split('\n')
 
-        tsb_data: List[TSBInfo] = []
         # Assuming the first few lines are headers/metadata and actual data starts later.
         # Based on RCL.txt, there's a FIELDS section. We need to skip this.
         # A more robust solution would dynamically find the start of data.
         # For now, we'll assume a fixed skip or look for the first line that looks like data.
 
         # Skip lines until we find something that looks like data or a specific header pattern
-        data_started = False
-        for line in lines:
-            if not data_started and re.match(r'^\d+\t', line): # heuristic: starts with digits then tab
-                data_started = True
-            if not data_started:
-                continue
-
-            # Assuming tab-delimited as per RCL.txt, TSBS.txt should be similar
-            parts = line.strip().split('\t')
-            if len(parts) >= 10: # Based on the TSBS.txt structure, minimum required fields for NHTSA ID and TSB ID
+        data_start = next((i for i, line in enumerate(lines) if _TSB_DATA_LINE.match(line)), len(lines)) # heuristic: starts with digits then tab
+
+        # Assuming tab-delimited as per RCL.txt, TSBS.txt should be similar.
+        # Only the first 10 fields matter, so later (long free-text) fields are left unsplit.
+        rows = [parts for parts in (line.strip().split('\t', 10) for line in lines[data_start:]) if len(parts) >= 10] # Based on the TSBS.txt structure, minimum required fields for NHTSA ID and TSB ID
+        valid_rows = [parts for parts in rows if parts[0].isdigit()]
+        if len(valid_rows) != len(rows):
+            logger.warning(f"Skipped {len(rows) - len(valid_rows)} TSB lines with a non-numeric NHTSA ID.")
+
+        # Dates in TSBS.txt are YYYYMMDD; parse each distinct value once.
+        parsed_dates: Dict[str, Optional[datetime]] = {}
+        for date_str in {parts[4] for parts in valid_rows}: # Field#5 "Mfr Communication Date"
+            parsed_dates[date_str] = None
+            if date_str and date_str != "null":
                 try:
-                    nhtsa_id = int(parts[0]) # Field#1 "NHTSA ID Number"
-                    tsb_document_id = parts[3] # Field#4 "TSB/Document ID"
-                    mfr_comm_date_str = parts[4] # Field#5 "Mfr Communication Date"
-                    # Attempt to parse the date, handling potential errors
-                    mfr_communication_date = None
-                    if mfr_comm_date_str and mfr_comm_date_str != "null":
-                        try:
-                            # Dates in TSBS.txt are YYYYMMDD
-                            mfr_communication_date = datetime.strptime(mfr_comm_date_str, '%Y%m%d')
-                        except ValueError:
-                            logger.warning(f"Could not parse Mfr Communication Date: {mfr_comm_date_str} for NHTSA ID: {nhtsa_id}")
-
-                    tsb_data.append(TSBInfo(
-                        nhtsa_id_number=nhtsa_id,
-                        tsb_document_id=tsb_document_id,
-                        mfr_communication_date=mfr_communication_date
-                    ))
-                except ValueError as ve:
-                    logger.warning(f"Could not parse line as TSBInfo, skipping: {line}. Error: {ve}", exc_info=True)
-                except IndexError as ie:
-                    logger.warning(f"Line had fewer parts than expected, skipping: {line}. Error: {ie}", exc_info=True)
-        return tsb_data
\ No newline at end of file
+                    parsed_dates[date_str] = datetime.strptime(date_str, '%Y%m%d')
+                except ValueError:
+                    logger.warning(f"Could not parse Mfr Communication Date: {date_str}")
+
+        return TSBInfoColumns.model_construct(
+            nhtsa_id_number=[int(parts[0]) for parts in valid_rows], # Field#1 "NHTSA ID Number"
+            tsb_document_id=[parts[3] for parts in valid_rows], # Field#4 "TSB/Document ID"
+            mfr_communication_date=[parsed_dates[parts[4]] for parts in valid_rows],
+        )
+
+    async def export_tsb_information_to_parquet(self, file_url: str, destination: str, row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> int:
+        """
+        Downloads and parses a TSBS flat file, then writes the TSB information to a Parquet file. Requires pyarrow.
+
+        Args:
+            file_url (str): The URL of the TSBS .txt flat file to download.
+            destination (str): The Parquet file to write.
+            row_group_size (int): Number of rows per Parquet row group.
+
+        Returns:
+            int: The number of rows written.
+        """
+        tsb_columns = await self.get_tsb_columns_from_flat_file(file_url)
+        return write_parquet_columns(dict(tsb_columns), TSBInfo, destination, row_group_size=row_group_size)
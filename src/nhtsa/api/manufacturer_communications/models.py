@@ -21,6 +21,31 @@ class TSBInfo(BaseModel):
     mfr_communication_date: Optional[datetime] = Field(None, description="Date the communication was disseminated by the manufacturer (Field#5 in TSBS.txt).")
 
 
+class TSBInfoColumns(BaseModel):
+    """
+    Column-oriented TSB information parsed from a TSB flat file: one list per TSBInfo field, all of equal length.
+    Much cheaper to build than one TSBInfo per row; use `to_records` when row objects are needed.
+    """
+    nhtsa_id_number: List[int] = Field(default_factory=list, description="NHTSA identifiers (Field#1 in TSBS.txt).")
+    tsb_document_id: List[str] = Field(default_factory=list, description="Manufacturer identifiers (Field#4 in TSBS.txt).")
+    mfr_communication_date: List[Optional[datetime]] = Field(default_factory=list, description="Manufacturer communication dates (Field#5 in TSBS.txt).")
+
+    def __len__(self) -> int:
+        return len(self.nhtsa_id_number)
+
+    def to_records(self) -> List[TSBInfo]:
+        """
+        Materializes the columns as TSBInfo models (without re-validating the already typed values).
+
+        Returns:
+            List[TSBInfo]: One model per row.
+        """
+        return [
+            TSBInfo.model_construct(nhtsa_id_number=nhtsa_id, tsb_document_id=document_id, mfr_communication_date=communication_date)
+            for nhtsa_id, document_id, communication_date in zip(self.nhtsa_id_number, self.tsb_document_id, self.mfr_communication_date)
+        ]
+
+
 # As with Investigations, this module primarily handles static file downloads.
 # If there were direct API query endpoints for manufacturer communications,
 # additional Pydantic models would be defined here.
\ No newline at end of file
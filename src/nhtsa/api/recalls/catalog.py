@@ -0,0 +1,172 @@
+import hashlib
+import json
+import logging
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Set, Tuple
+
+from ...lib.vehicle_tree import DEFAULT_RECENT_YEARS, VehicleTreeIndex
+from .models import RecallResult
+
+if TYPE_CHECKING:
+    from .index import RecallsAPI
+
+logger = logging.getLogger(__name__)
+
+# Recall fields that describe the vehicle a recall was looked up for rather than the campaign itself.
+# They are kept in `recall_vehicles`, so one campaign listed for many vehicles is stored (and hashed) once.
+VEHICLE_FIELDS = ("model_year", "make", "model")
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS recalls (nhtsa_campaign_number TEXT PRIMARY KEY, payload TEXT NOT NULL, content_hash TEXT NOT NULL, "
+    "first_seen REAL NOT NULL, updated_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS recall_vehicles (nhtsa_campaign_number TEXT NOT NULL, model_year TEXT NOT NULL, make TEXT NOT NULL, model TEXT NOT NULL, "
+    "PRIMARY KEY (nhtsa_campaign_number, model_year, make, model))",
+    "CREATE INDEX IF NOT EXISTS recall_vehicles_vehicle ON recall_vehicles (model_year, make, model)",
+)
+
+
+def _hash(value: Any) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class RecallCatalog(VehicleTreeIndex):
+    """
+    Local SQLite catalog of every recall, built by walking model years -> makes -> models -> recalls.
+    The model year / make / model tree is stored once (see VehicleTreeIndex); later refreshes only walk model years
+    that are new or among the `recent_years` newest. Recalls are fetched concurrently (client.bulk), stored once per
+    `nhtsa_campaign_number` and linked to the vehicles they apply to. A vehicle whose recall list hashes the same as
+    last time costs no writes; a campaign is only rewritten when its content changed.
+    Every step commits as it goes, so an interrupted crawl continues where it stopped.
+    """
+    def __init__(self, api: "RecallsAPI", database_path: str):
+        """
+        Initializes the RecallCatalog.
+
+        Args:
+            api (RecallsAPI): The API used to walk the catalog.
+            database_path (str): Path of the SQLite file (created if missing).
+        """
+        super().__init__(api, database_path, schema=_SCHEMA)
+
+    def _store_recalls_sync(self, vehicle: Tuple[str, str, str], recalls: List[RecallResult], stats: Dict[str, int]) -> None:
+        campaigns = {}
+        for recall in recalls:
+            # Campaign payloads leave out the vehicle fields; the vehicle link is kept in recall_vehicles.
+            campaigns[recall.nhtsa_campaign_number] = recall.model_dump(mode="json", by_alias=True, exclude=set(VEHICLE_FIELDS))
+        vehicle_hash = _hash(sorted(campaigns.items()))
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT content_hash FROM vehicles WHERE model_year = ? AND make = ? AND model = ?", vehicle).fetchone()
+            if row is not None and row[0] == vehicle_hash:
+                self._connection.execute("UPDATE vehicles SET fetched_at = ? WHERE model_year = ? AND make = ? AND model = ?", (now, *vehicle))
+                stats["unchanged_vehicles"] += 1
+                return
+            self._connection.execute("BEGIN")
+            try:
+                for campaign_number, payload in campaigns.items():
+                    content_hash = _hash(payload)
+                    stored = self._connection.execute("SELECT content_hash FROM recalls WHERE nhtsa_campaign_number = ?", (campaign_number,)).fetchone()
+                    if stored is None:
+                        self._connection.execute("INSERT INTO recalls VALUES (?, ?, ?, ?, ?)", (campaign_number, json.dumps(payload), content_hash, now, now))
+                        stats["new_recalls"] += 1
+                    elif stored[0] != content_hash:
+                        self._connection.execute(
+                            "UPDATE recalls SET payload = ?, content_hash = ?, updated_at = ? WHERE nhtsa_campaign_number = ?", (json.dumps(payload), content_hash, now, campaign_number)
+                        )
+                        stats["updated_recalls"] += 1
+                self._connection.execute("DELETE FROM recall_vehicles WHERE model_year = ? AND make = ? AND model = ?", vehicle)
+                self._connection.executemany("INSERT INTO recall_vehicles VALUES (?, ?, ?, ?)", [(campaign_number, *vehicle) for campaign_number in campaigns])
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO vehicles (model_year, make, model, fetched_at, content_hash) VALUES (?, ?, ?, ?, ?)", (*vehicle, now, vehicle_hash)
+                )
+                self._connection.execute("COMMIT")
+                stats["changed_vehicles"] += 1
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    async def refresh_recalls(self, recent_years: int = DEFAULT_RECENT_YEARS, max_age: Optional[float] = None, max_concurrency: Optional[int] = None, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> Dict[str, int]:
+        """
+        Fetches the recalls of every vehicle in the tree that was never fetched, belongs to the `recent_years` newest
+        model years, or (with `max_age`) was last fetched longer ago than that.
+
+        Args:
+            recent_years (int): Number of newest model years whose recalls are always fetched again.
+            max_age (Optional[float]): Also fetch again vehicles last fetched more than this many seconds ago.
+            max_concurrency (Optional[int]): Requests in flight at once; defaults to client.bulk's default.
+            progress_callback (Optional[Callable[[int, Optional[int]], None]]): Passed to client.bulk.
+
+        Returns:
+            Dict[str, int]: Counts of "fetched", "failed", "changed_vehicles", "unchanged_vehicles", "new_recalls" and
+                            "updated_recalls".
+        """
+        stats = {"fetched": 0, "failed": 0, "changed_vehicles": 0, "unchanged_vehicles": 0, "new_recalls": 0, "updated_recalls": 0}
+        vehicles = await self.vehicles_to_fetch(recent_years=recent_years, max_age=max_age)
+        logger.info(f"Fetching recalls of {len(vehicles)} vehicles")
+        inputs = [dict(make=make, model=model, model_year=year) for year, make, model in vehicles]
+        async for result in self.api.client.bulk(self.api.get_recalls_by_vehicle, inputs, max_concurrency=max_concurrency, ordered=False, progress_callback=progress_callback):
+            stats["fetched"] += 1
+            if not result.ok:
+                stats["failed"] += 1
+                continue
+            vehicle = (result.input["model_year"], result.input["make"], result.input["model"])
+            await self._run(self._store_recalls_sync, vehicle, result.value.results, stats)
+        logger.info(f"Recall catalog recalls refreshed: {stats}")
+        return stats
+
+    async def crawl(self, recent_years: int = DEFAULT_RECENT_YEARS, max_age: Optional[float] = None, max_concurrency: Optional[int] = None) -> Dict[str, int]:
+        """
+        Refreshes the tree, then the recalls. The first run walks the whole catalog; later runs only the new and
+        recent model years (plus vehicles older than `max_age`). Failed requests are retried on the next run.
+
+        Args:
+            recent_years (int): Number of newest model years that are always walked again.
+            max_age (Optional[float]): Also fetch again vehicles last fetched more than this many seconds ago.
+            max_concurrency (Optional[int]): Recall requests in flight at once.
+
+        Returns:
+            Dict[str, int]: The counts of refresh_tree and refresh_recalls ("failed" is their sum).
+        """
+        tree = await self.refresh_tree(recent_years=recent_years)
+        recalls = await self.refresh_recalls(recent_years=recent_years, max_age=max_age, max_concurrency=max_concurrency)
+        return {**tree, **recalls, "failed": tree["failed"] + recalls["failed"]}
+
+    async def get_recall(self, campaign_number: str) -> Optional[RecallResult]:
+        """
+        Returns a stored recall campaign (without vehicle fields).
+
+        Args:
+            campaign_number (str): The NHTSA campaign number.
+
+        Returns:
+            Optional[RecallResult]: The recall, or None if it is not in the catalog.
+        """
+        rows = await self._query("SELECT payload FROM recalls WHERE nhtsa_campaign_number = ?", (campaign_number,))
+        return RecallResult.model_validate({**json.loads(rows[0][0]), "ModelYear": None, "Make": None, "Model": None}) if rows else None
+
+    async def get_recalls_for_vehicle(self, make: str, model: str, model_year: str) -> List[RecallResult]:
+        """
+        Returns the stored recalls of a vehicle, without a network call.
+
+        Args:
+            make (str): The make, as listed by the catalog.
+            model (str): The model, as listed by the catalog.
+            model_year (str): The model year.
+
+        Returns:
+            List[RecallResult]: The recalls, with the vehicle fields filled in.
+        """
+        rows = await self._query(
+            "SELECT r.payload FROM recall_vehicles v JOIN recalls r USING (nhtsa_campaign_number) WHERE v.model_year = ? AND v.make = ? AND v.model = ?",
+            (str(model_year), make, model),
+        )
+        return [RecallResult.model_validate({**json.loads(payload), "ModelYear": str(model_year), "Make": make, "Model": model}) for payload, in rows]
+
+    async def campaign_numbers(self) -> Set[str]:
+        """
+        Returns the campaign numbers in the catalog.
+
+        Returns:
+            Set[str]: The campaign numbers.
+        """
+        return {row[0] for row in await self._query("SELECT nhtsa_campaign_number FROM recalls")}
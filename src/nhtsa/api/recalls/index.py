@@ -1,8 +1,11 @@
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Iterator, List, Optional
 from pydantic import parse_obj_as
 import logging
 
-from .models import RecallByVehicle, ModelYear, Make, Model, RecallCampaign
+from .models import RecallByVehicle, ModelYear, Make, Model, RecallCampaign, RecallFlatFileRecord
+from .catalog import RecallCatalog
+from ...lib.flat_files import iter_flat_file_records
+from ...lib.columnar import DEFAULT_ROW_GROUP_SIZE, write_parquet
 
 if TYPE_CHECKING:
     from ...client import NhtsaClient
@@ -23,6 +26,18 @@ class RecallsAPI:
         """
         self.client = client
 
+    def open_catalog(self, database_path: str) -> RecallCatalog:
+        """
+        Opens (or creates) a local SQLite catalog of every recall; call `await catalog.crawl()` to fill or refresh it.
+
+        Args:
+            database_path (str): Path of the SQLite file.
+
+        Returns:
+            RecallCatalog: The catalog.
+        """
+        return RecallCatalog(self, database_path)
+
     async def get_recalls_by_vehicle(self, make: str, model: str, model_year: int) -> RecallByVehicle:
         """
         Get recalls for the required combination of Model Year, Make, and Model.
@@ -92,3 +107,33 @@ class RecallsAPI:
         url = f"/recalls/campaignNumber?campaignNumber={campaign_number}"
         response = await self.client._request("GET", url)
         return parse_obj_as(RecallCampaign, response.json())
+
+    def iter_flat_file_records(self, zip_path: str, member: Optional[str] = None) -> Iterator[RecallFlatFileRecord]:
+        """
+        Lazily reads a downloaded recalls flat file (e.g., FLAT_RCL.zip) without extracting it,
+        yielding one typed record per row in constant memory.
+
+        Args:
+            zip_path (str): Path to the downloaded ZIP archive (e.g., via client.static_files.download_file_to).
+            member (Optional[str]): Name of the .txt file inside the archive. Defaults to the first .txt member.
+
+        Returns:
+            Iterator[RecallFlatFileRecord]: A generator of records.
+        """
+        return iter_flat_file_records(zip_path, RecallFlatFileRecord, member=member)
+
+    def export_flat_file_to_parquet(self, zip_path: str, destination: str, member: Optional[str] = None, row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> int:
+        """
+        Converts a downloaded recalls flat file into a Parquet file with typed columns (dates, ints, booleans),
+        streaming rows from the archive in row-group batches. Requires pyarrow.
+
+        Args:
+            zip_path (str): Path to the downloaded ZIP archive.
+            destination (str): The Parquet file to write.
+            member (Optional[str]): Name of the .txt file inside the archive. Defaults to the first .txt member.
+            row_group_size (int): Number of rows per Parquet row group.
+
+        Returns:
+            int: The number of rows written.
+        """
+        return write_parquet(self.iter_flat_file_records(zip_path, member=member), RecallFlatFileRecord, destination, row_group_size=row_group_size)
@@ -1,6 +1,6 @@
 from typing import List, Optional, Any
 from pydantic import BaseModel, Field
-from datetime import datetime
+from datetime import date, datetime
 
 
 class RecallBaseResponse(BaseModel):
@@ -81,4 +81,40 @@ class Model(RecallBaseResponse):
 
 class RecallCampaign(RecallBaseResponse):
     """Represents the response structure for recalls by campaign number."""
-    results: List[RecallResult] = Field(alias="results")
\ No newline at end of file
+    results: List[RecallResult] = Field(alias="results")
+
+
+class RecallFlatFileRecord(BaseModel):
+    """
+    Represents one row of the recalls flat file (FLAT_RCL.zip / RCL_FROM_*.zip).
+    Fields are declared in the order of the layout in RCL.txt; aliases are the layout's field names.
+    """
+    record_id: Optional[int] = Field(None, alias="RECORD_ID", description="Running sequence number that uniquely identifies the record.")
+    campno: Optional[str] = Field(None, alias="CAMPNO", description="NHTSA campaign number.")
+    maketxt: Optional[str] = Field(None, alias="MAKETXT", description="Vehicle/equipment make.")
+    modeltxt: Optional[str] = Field(None, alias="MODELTXT", description="Vehicle/equipment model.")
+    yeartxt: Optional[int] = Field(None, alias="YEARTXT", description="Model year, 9999 if unknown or N/A.")
+    mfgcampno: Optional[str] = Field(None, alias="MFGCAMPNO", description="Manufacturer campaign number.")
+    compname: Optional[str] = Field(None, alias="COMPNAME", description="Component description.")
+    mfgname: Optional[str] = Field(None, alias="MFGNAME", description="Manufacturer that filed the defect/noncompliance report.")
+    bgman: Optional[date] = Field(None, alias="BGMAN", description="Begin date of manufacturing.")
+    endman: Optional[date] = Field(None, alias="ENDMAN", description="End date of manufacturing.")
+    rcltypecd: Optional[str] = Field(None, alias="RCLTYPECD", description="Vehicle, equipment, tire or child seat report.")
+    potaff: Optional[int] = Field(None, alias="POTAFF", description="Potential number of units affected.")
+    odate: Optional[date] = Field(None, alias="ODATE", description="Date owner notified by manufacturer.")
+    influenced_by: Optional[str] = Field(None, alias="INFLUENCED_BY", description="Recall initiator (MFR/OVSC/ODI).")
+    mfgtxt: Optional[str] = Field(None, alias="MFGTXT", description="Manufacturers of recalled vehicles/products.")
+    rcdate: Optional[date] = Field(None, alias="RCDATE", description="Report received date.")
+    datea: Optional[date] = Field(None, alias="DATEA", description="Record creation date.")
+    rpno: Optional[str] = Field(None, alias="RPNO", description="Regulation part number.")
+    fmvss: Optional[str] = Field(None, alias="FMVSS", description="Federal motor vehicle safety standard number.")
+    desc_defect: Optional[str] = Field(None, alias="DESC_DEFECT", description="Defect summary.")
+    conequence_defect: Optional[str] = Field(None, alias="CONEQUENCE_DEFECT", description="Consequence summary.")
+    corrective_action: Optional[str] = Field(None, alias="CORRECTIVE_ACTION", description="Corrective summary.")
+    notes: Optional[str] = Field(None, alias="NOTES", description="Recall notes.")
+    rcl_cmpt_id: Optional[str] = Field(None, alias="RCL_CMPT_ID", description="Number that uniquely identifies a recalled component.")
+    mfr_comp_name: Optional[str] = Field(None, alias="MFR_COMP_NAME", description="Manufacturer-supplied component name.")
+    mfr_comp_desc: Optional[str] = Field(None, alias="MFR_COMP_DESC", description="Manufacturer-supplied component description.")
+    mfr_comp_ptno: Optional[str] = Field(None, alias="MFR_COMP_PTNO", description="Manufacturer-supplied component part number.")
+    do_not_drive: Optional[bool] = Field(None, alias="DO_NOT_DRIVE", description="Do-not-drive advisory.")
+    park_outside: Optional[bool] = Field(None, alias="PARK_OUTSIDE", description="Park-outside advisory.")
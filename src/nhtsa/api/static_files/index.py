@@ -1,5 +1,12 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Callable, List, Optional
+import asyncio
+import hashlib
+import json
 import logging
+import os
+
+import aiofiles
+import httpx
 
 if TYPE_CHECKING:
     from ...client import NhtsaClient
@@ -24,6 +31,8 @@ class StaticFilesAPI:
     async def download_file(self, file_url: str) -> bytes:
         """
         Downloads a generic static file given its full URL.
+        If the client has a download store, the request is conditional (If-None-Match / If-Modified-Since)
+        and an unchanged file is read from the local copy instead of being downloaded again.
 
         Args:
             file_url (str): The full URL of the static file to download.
@@ -34,10 +43,241 @@ class StaticFilesAPI:
         Raises:
             httpx.RequestError: If the download fails.
         """
-        logger.info(f"Downloading static file from: {file_url}")
-        response = await self.client._request("GET", file_url, follow_redirects=True, use_static_client=True)
+        store = self.client.download_store
+        if store is None:
+            logger.info(f"Downloading static file from: {file_url}")
+            response = await self.client._request("GET", file_url, follow_redirects=True, use_static_client=True)
+            return response.content
+
+        headers = await store.conditional_headers(file_url)
+        logger.info(f"Downloading static file from: {file_url} (conditional: {bool(headers)})")
+        response = await self.client._request("GET", file_url, follow_redirects=True, use_static_client=True, headers=headers)
+        if response.status_code == 304:
+            logger.info(f"Static file not modified, using local copy: {file_url}")
+            return await store.read(file_url)
+        await store.save(file_url, response)
         return response.content
 
+    async def download_file_to(self, file_url: str, destination: str, chunk_size: int = 1024 * 1024, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> str:
+        """
+        Streams a static file to disk without holding it in memory. Peak memory stays around `chunk_size`.
+        The body is written to `<destination>.part` and moved into place once complete.
+        If the client has a download store, the request is conditional and an unchanged file is copied from the local copy.
+
+        Args:
+            file_url (str): The full URL of the static file to download.
+            destination (str): The file path to write to.
+            chunk_size (int): Size in bytes of the chunks read from the network and written to disk.
+            progress_callback (Optional[Callable[[int, Optional[int]], None]]): Called after each chunk with the bytes
+                                                                               received so far and the total size (None if unknown).
+
+        Returns:
+            str: The destination path.
+
+        Raises:
+            httpx.RequestError: If the download fails.
+        """
+        store = self.client.download_store
+        headers = await store.conditional_headers(file_url) if store is not None else {}
+        logger.info(f"Streaming static file from: {file_url} to {destination} (conditional: {bool(headers)})")
+
+        partial_path = destination + ".part"
+        async with aiofiles.open(partial_path, "wb") as f:
+            response = await self.client._stream("GET", file_url, f.write, chunk_size=chunk_size, progress_callback=progress_callback, follow_redirects=True, use_static_client=True, headers=headers)
+
+        if response.status_code == 304:
+            os.remove(partial_path)
+            stored_path = await store.local_path(file_url)
+            logger.info(f"Static file not modified, using local copy: {file_url}")
+            if os.path.abspath(stored_path) != os.path.abspath(destination):
+                async with aiofiles.open(stored_path, "rb") as source, aiofiles.open(destination, "wb") as target:
+                    while True:
+                        chunk = await source.read(chunk_size)
+                        if not chunk:
+                            break
+                        await target.write(chunk)
+            return destination
+
+        os.replace(partial_path, destination)
+        if store is not None:
+            await store.keep(file_url, destination, response.headers)
+        return destination
+
+    async def download_file_resumable(self, file_url: str, destination: str, parts: int = 1, chunk_size: int = 1024 * 1024, expected_sha256: Optional[str] = None, max_attempts: int = 5, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None) -> str:
+        """
+        Downloads a large static file with HTTP Range requests so an interrupted download resumes where it stopped
+        instead of restarting from byte 0. Partial data is kept next to the destination (`<destination>.part`, or
+        `<destination>.part<N>` when downloading in parallel) together with the file's validators, so a later call
+        (even from a new process) picks up the partial file, and a file that changed upstream is started over.
+        Once complete, the size (and optionally the SHA-256) is verified and the file is atomically renamed into place.
+        Falls back to `download_file_to` if the server does not support byte ranges.
+
+        Args:
+            file_url (str): The full URL of the static file to download.
+            destination (str): The file path to write to.
+            parts (int): Number of byte ranges fetched in parallel. 1 downloads sequentially.
+            chunk_size (int): Size in bytes of the chunks read from the network and written to disk.
+            expected_sha256 (Optional[str]): Hex SHA-256 the finished file must match.
+            max_attempts (int): How many times each range is resumed after a failure before giving up.
+            progress_callback (Optional[Callable[[int, Optional[int]], None]]): Called with the bytes on disk so far and the total size.
+
+        Returns:
+            str: The destination path.
+
+        Raises:
+            httpx.RequestError: If a range still fails after `max_attempts` resumptions.
+            ValueError: If the finished file does not match the expected size or checksum.
+        """
+        head = await self.client._request("HEAD", file_url, follow_redirects=True, use_static_client=True)
+        content_length = head.headers.get("content-length")
+        if head.headers.get("accept-ranges", "").lower() != "bytes" or not content_length or not content_length.isdigit():
+            logger.info(f"Server does not support byte ranges for {file_url}; downloading in one stream.")
+            return await self.download_file_to(file_url, destination, chunk_size=chunk_size, progress_callback=progress_callback)
+        total = int(content_length)
+        validator = head.headers.get("etag") or head.headers.get("last-modified")
+        if total == 0:
+            return await self._write_empty_file(file_url, destination, head.headers, expected_sha256, progress_callback)
+
+        parts = max(1, min(parts, total // chunk_size + 1))
+        bounds = [(total * i // parts, total * (i + 1) // parts - 1) for i in range(parts)]
+        part_paths = [destination + ".part"] if parts == 1 else [f"{destination}.part{i}" for i in range(parts)]
+        await self._discard_stale_parts(destination, part_paths, validator, parts)
+
+        done = [os.path.getsize(path) if os.path.exists(path) else 0 for path in part_paths]
+
+        def report() -> None:
+            if progress_callback is not None:
+                progress_callback(sum(done), total)
+
+        async def fetch(index: int) -> None:
+            start, end = bounds[index]
+            for attempt in range(max_attempts):
+                offset = start + done[index]
+                if offset > end:
+                    return
+                headers = {"Range": f"bytes={offset}-{end}"}
+                if validator:
+                    headers["If-Range"] = validator
+                async with aiofiles.open(part_paths[index], "ab") as f:
+                    async def check_range(response: httpx.Response) -> None:
+                        if response.status_code == 206:
+                            return
+                        if parts > 1:
+                            raise ValueError(f"Server ignored the Range request for {file_url} (status {response.status_code}).")
+                        # A full 200 body means the server could not resume (e.g., the file changed): start over.
+                        logger.warning(f"Server sent the whole file instead of resuming {file_url}; starting over.")
+                        await f.truncate(0)
+                        await f.seek(0)
+                        done[index] = 0
+
+                    async def sink(chunk: bytes) -> None:
+                        await f.write(chunk)
+                        done[index] += len(chunk)
+                        report()
+
+                    try:
+                        await self.client._stream("GET", file_url, sink, chunk_size=chunk_size, response_hook=check_range, follow_redirects=True, use_static_client=True, headers=headers)
+                        return
+                    except httpx.RequestError as e:
+                        logger.warning(f"Range {offset}-{end} of {file_url} failed on attempt {attempt + 1} after {done[index]} bytes: {e}.", exc_info=True)
+                if attempt < max_attempts - 1:
+                    await asyncio.sleep(min(2 ** attempt, 30))  # Back off before resuming
+            raise httpx.RequestError(f"Failed to download bytes {start}-{end} of {file_url} after {max_attempts} attempts.")
+
+        logger.info(f"Downloading {file_url} ({total} bytes) in {parts} range(s); {sum(done)} bytes already on disk.")
+        await asyncio.gather(*(fetch(i) for i in range(parts)))
+
+        partial_path = destination + ".part"
+        if parts > 1:
+            async with aiofiles.open(partial_path, "wb") as target:
+                for path in part_paths:
+                    async with aiofiles.open(path, "rb") as source:
+                        while True:
+                            chunk = await source.read(chunk_size)
+                            if not chunk:
+                                break
+                            await target.write(chunk)
+
+        size = os.path.getsize(partial_path)
+        if size != total:
+            os.remove(partial_path)
+            raise ValueError(f"Downloaded size of {file_url} is {size} bytes, expected {total}.")
+        if expected_sha256 is not None:
+            digest = hashlib.sha256()
+            async with aiofiles.open(partial_path, "rb") as f:
+                while True:
+                    chunk = await f.read(chunk_size)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+            if digest.hexdigest().lower() != expected_sha256.lower():
+                os.remove(partial_path)
+                raise ValueError(f"SHA-256 of {file_url} is {digest.hexdigest()}, expected {expected_sha256}.")
+
+        os.replace(partial_path, destination)
+        for path in part_paths + [destination + ".part.json"]:
+            if path != partial_path and os.path.exists(path):
+                os.remove(path)
+        if self.client.download_store is not None:
+            await self.client.download_store.keep(file_url, destination, head.headers)
+        logger.info(f"Finished downloading {file_url} to {destination}.")
+        return destination
+
+    async def _write_empty_file(self, file_url: str, destination: str, headers: httpx.Headers, expected_sha256: Optional[str], progress_callback: Optional[Callable[[int, Optional[int]], None]]) -> str:
+        """
+        Finishes a resumable download of a zero-length file: there is no byte range to request.
+
+        Args:
+            file_url (str): The full URL of the static file.
+            destination (str): The file path to write to.
+            headers (httpx.Headers): The HEAD response headers carrying ETag / Last-Modified.
+            expected_sha256 (Optional[str]): Hex SHA-256 the file must match.
+            progress_callback (Optional[Callable[[int, Optional[int]], None]]): Called once with (0, 0).
+
+        Returns:
+            str: The destination path.
+
+        Raises:
+            ValueError: If `expected_sha256` is not the checksum of an empty file.
+        """
+        digest = hashlib.sha256(b"").hexdigest()
+        if expected_sha256 is not None and digest != expected_sha256.lower():
+            raise ValueError(f"SHA-256 of {file_url} is {digest}, expected {expected_sha256}.")
+        partial_path = destination + ".part"
+        async with aiofiles.open(partial_path, "wb"):
+            pass
+        os.replace(partial_path, destination)
+        if progress_callback is not None:
+            progress_callback(0, 0)
+        if self.client.download_store is not None:
+            await self.client.download_store.keep(file_url, destination, headers)
+        logger.info(f"{file_url} is empty; wrote an empty file to {destination}.")
+        return destination
+
+    async def _discard_stale_parts(self, destination: str, part_paths: List[str], validator: Optional[str], parts: int) -> None:
+        """
+        Removes partial files left by an earlier run if the upstream file changed or the part layout differs,
+        then records the current validator and layout for the next run.
+
+        Args:
+            destination (str): The final destination path.
+            part_paths (List[str]): The partial files used by this download.
+            validator (Optional[str]): The file's ETag or Last-Modified value.
+            parts (int): The number of parallel ranges.
+        """
+        meta_path = destination + ".part.json"
+        meta = {}
+        if os.path.exists(meta_path):
+            async with aiofiles.open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.loads(await f.read())
+        if meta.get("validator") != validator or meta.get("parts") != parts or not validator:
+            stale = [destination + ".part"] + [f"{destination}.part{i}" for i in range(max(parts, meta.get("parts", 0)))]
+            for path in stale:
+                if os.path.exists(path):
+                    os.remove(path)
+        async with aiofiles.open(meta_path, "w", encoding="utf-8") as f:
+            await f.write(json.dumps({"validator": validator, "parts": parts}))
+
     # Now handled by the undocumented `safety_issues` endpoint
     # async def get_manufacturer_communication_pdf(self, year: int, nhtsa_id_number: int, sequential_number: int = 1) -> bytes:
     #     """
@@ -1,10 +1,10 @@
 from typing import TYPE_CHECKING, List, Optional, Union, Set, Any
-import asyncio
 import logging
 import re
 
 # Import necessary models from other API modules
 from ...api.vin_decoding.models import VinDecodeFlatResult, VinDecodeFlatEntry
+from ...api.vin_decoding.validation import VIN_ERROR_TEXTS, VIN_OK, validate_vin
 from ...api.products.models import VehicleByYmmtResult, VehicleDetailsResult, SafetyIssueManufacturerCommunication
 from ...api.safety_issues.models import SafetyIssueByNhtsaIdResult, SafetyIssueAssociatedDocument
 
@@ -35,7 +35,7 @@ class ToolsAPI:
         """
         raise NotImplementedError("This requires accumulating all nhtsa ids, since NHTSA does not support search by mfg number directly. you would need to make a cronjob to get all mfg numbers and index them yourself. Email me if you need to do this, I already have this set up and can give you api access.")
 
-    async def get_tsb_by_mfg_number(self, vin: str, mfg_number: str) -> Set[str]:
+    async def get_tsb_by_mfg_number(self, vin: str, mfg_number: str, validate: bool = False, check_digit: bool = True) -> Set[str]:
         """
         Retrieves all unique document URLs (e.g., PDFs) for a specific Manufacturer Communication Number
         associated with a given VIN. This involves a multi-step process:
@@ -52,6 +52,10 @@ class ToolsAPI:
         Args:
             vin (str): The Vehicle Identification Number of the vehicle.
             mfg_number (str): The internal Manufacturer Communication Number (e.g., "N212355740").
+            validate (bool): Check the VIN locally first and return an empty set for an invalid one,
+                             without making any request.
+            check_digit (bool): With `validate`, also verify the check digit. It is mandatory for North American VINs
+                                only, so pass False for VINs of vehicles built for other markets.
 
         Returns:
             Set[str]: A set of unique URLs to the associated documents (e.g., PDF files).
@@ -59,6 +63,11 @@ class ToolsAPI:
                       or if an error occurs.
         """
         urls: Set[str] = set()
+        if validate:
+            code = validate_vin(vin, check_digit)
+            if code != VIN_OK:
+                logger.warning(f"Skipping TSB retrieval for invalid VIN '{vin}': {VIN_ERROR_TEXTS[code]}")
+                return urls
         try:
             logger.info(f"\n--- Step 1: Decoding VIN {vin} to get basic vehicle info ---")
             decoded_vin_flat: VinDecodeFlatResult = await self.client.vin_decoding.decode_vin_flat_format(
@@ -78,15 +87,18 @@ class ToolsAPI:
 
             logger.info(f"\n--- Step 3: Retrieving Manufacturer Communications for Vehicle IDs {vehicle_ids} ---")
             vehicle_safety_issues_ids = set() # set to remove duplicates
-            tasks = [
-                self.client.products.get_vehicle_details_by_id(
+            inputs = [
+                dict(
                     vehicle_id=vehicle,
                     data="manufacturercommunications",
                     product_detail="all" # Keep this to get as much detail as possible in the first call
                 ) for vehicle in vehicle_ids
             ]
-            vehicle_details_list: List[VehicleDetailsResult] = await asyncio.gather(*tasks)
-            for vehicle, vehicle_details in zip(vehicle_ids, vehicle_details_list):
+            # One failing vehicle is logged and skipped instead of aborting the whole lookup.
+            async for details in self.client.bulk(self.client.products.get_vehicle_details_by_id, inputs):
+                if not details.ok:
+                    continue
+                vehicle_details: VehicleDetailsResult = details.value
                 # with open(f"vehicle_{vehicle}_details.json", "w", encoding="utf-8", newline="\n") as f:
                 #     f.write(vehicle_details.model_dump_json(indent=4))
                 vehicle_safety_issues_ids.update([result.nhtsa_id_number for result in vehicle_details.results[0].safety_issues.manufacturer_communications if result.manufacturer_communication_number == mfg_number])
@@ -96,9 +108,10 @@ class ToolsAPI:
             logger.info(f"\n--- Step 4: Retrieving Documents for NHTSA IDs {vehicle_safety_issues_ids} ---")
             urls = set()
             issues = list(vehicle_safety_issues_ids)
-            issue_tasks = [self.client.safety_issues.get_safety_issues_by_nhtsa_id(nhtsa_id=issue) for issue in issues]
-            detailed_responses: List[SafetyIssueByNhtsaIdResult] = await asyncio.gather(*issue_tasks)
-            for issue, detailed_safety_issues_response in zip(issues, detailed_responses):
+            async for detailed in self.client.bulk(self.client.safety_issues.get_safety_issues_by_nhtsa_id, issues):
+                if not detailed.ok:
+                    continue
+                detailed_safety_issues_response: SafetyIssueByNhtsaIdResult = detailed.value
                 # logger.debug(f"Detailed Safety Issue for NHTSA ID {issue}: {detailed_safety_issues_response.model_dump_json(indent=4)}")
                 for result in (detailed_safety_issues_response.results or []):
                     for mc in (getattr(result, "manufacturer_communications", None) or []):
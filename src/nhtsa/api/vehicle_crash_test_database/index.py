@@ -4,6 +4,7 @@ import logging
 from datetime import date
 
 from ...lib.models import APIResponse, Error, Meta, Pagination
+from ...lib.nrd import NrdDatabaseMixin
 from .models import (
     VehicleDocument, VehicleTestData, VehicleModel, OccupantType, VehicleMetadata,
     VehicleInformation, VehicleDetailInformation, TestDetail, RestraintInformation,
@@ -12,13 +13,15 @@ from .models import (
     VehicleInformationResponse, BarrierInformationResponse
 )
 
+from .mirror import VehicleCrashTestMirror
+
 if TYPE_CHECKING:
     from ...client import NhtsaClient
 
 logger = logging.getLogger(__name__)
 
 
-class VehicleCrashTestDatabaseAPI:
+class VehicleCrashTestDatabaseAPI(NrdDatabaseMixin):
     """
     API for programmatic access to the NHTSA Vehicle Crash Test Database.
     Base URL: /nhtsa/vehicle/
@@ -33,6 +36,18 @@ class VehicleCrashTestDatabaseAPI:
         self.client = client
         self.base_path = "/nhtsa/vehicle" # Specific path for this API on the NRD server
 
+    def open_mirror(self, database_path: str) -> VehicleCrashTestMirror:
+        """
+        Opens (or creates) a local SQLite mirror of the database; call `await mirror.mirror()` to fill or update it.
+
+        Args:
+            database_path (str): Path of the SQLite file.
+
+        Returns:
+            VehicleCrashTestMirror: The mirror.
+        """
+        return VehicleCrashTestMirror(self, database_path)
+
     async def find_vehicle_documents_by_test_no(self, test_no: str) -> APIResponse:
         """
         Retrieves vehicle documents by test number.
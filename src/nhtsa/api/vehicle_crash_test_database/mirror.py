@@ -0,0 +1,314 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from ...lib.columnar import require_pyarrow
+from ...lib.records import record_dict
+
+if TYPE_CHECKING:
+    from .index import VehicleCrashTestDatabaseAPI
+
+logger = logging.getLogger(__name__)
+
+# Field names the NRD uses for the keys of the per-vehicle and per-occupant endpoints; the first one present wins.
+TEST_NO_FIELDS = ("testNo", "test_no", "testNumber")
+VEHICLE_NO_FIELDS = ("vehicleNo", "vehNo", "vehicle_no", "vehicleNumber")
+OCCUPANT_LOCATION_FIELDS = ("occupantLocation", "occLoc", "occupant_location", "occLocation")
+
+# Mirrored tables, in the order they are written for a test. Every table starts with the key columns.
+MIRROR_TABLES = {
+    "test_details": ("test_no",),
+    "vehicles": ("test_no",),
+    "occupants": ("test_no",),
+    "restraints": ("test_no", "vehicle_no", "occupant_location"),
+    "intrusions": ("test_no", "vehicle_no"),
+    "barriers": ("test_no",),
+    "instrumentation": ("test_no",),
+}
+
+
+async def _gather_endpoints(test_no: str, calls: List[Tuple[str, Awaitable[Any]]]) -> List[Any]:
+    """Awaits named endpoint calls concurrently. Every call finishes before a failure is raised, so none is left running."""
+    results = await asyncio.gather(*(call for _, call in calls), return_exceptions=True)
+    failed = [(name, result) for (name, _), result in zip(calls, results) if isinstance(result, BaseException)]
+    if failed:
+        raise RuntimeError(f"Crash test {test_no}: {', '.join(name for name, _ in failed)} failed; first error: {failed[0][1]!r}") from failed[0][1]
+    return results
+
+
+def _first_value(record: Dict[str, Any], names: Sequence[str]) -> Optional[Any]:
+    for name in names:
+        if record.get(name) is not None:
+            return record[name]
+    return None
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sqlite_value(value: Any) -> Any:
+    # Nested objects and lists are kept as JSON text; SQLite stores scalars natively.
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    if isinstance(value, (dict, list, tuple)):
+        return json.dumps(value, default=str)
+    return str(value)
+
+
+class VehicleCrashTestMirror:
+    """
+    Mirrors the NRD Vehicle Crash Test Database into a local SQLite file, one table per endpoint
+    (see MIRROR_TABLES). Tests are listed with iter_all_test_data and mirrored by concurrent workers; each test's
+    endpoints are fanned out concurrently and all its rows are written in one transaction together with a row in
+    `mirrored_tests`, so an interrupted run resumes with the tests it had not finished.
+    Table columns follow the API's field names and are added as new fields show up.
+    """
+    def __init__(self, api: "VehicleCrashTestDatabaseAPI", database_path: str):
+        """
+        Initializes the VehicleCrashTestMirror.
+
+        Args:
+            api (VehicleCrashTestDatabaseAPI): The API used to fetch the tests.
+            database_path (str): Path of the SQLite file (created if missing).
+        """
+        self.api = api
+        self.database_path = database_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database_path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("CREATE TABLE IF NOT EXISTS mirrored_tests (test_no TEXT PRIMARY KEY, mirrored_at REAL NOT NULL)")
+        for table, keys in MIRROR_TABLES.items():
+            self._connection.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({", ".join(f"{key} TEXT" for key in keys)})')
+            self._connection.execute(f'CREATE INDEX IF NOT EXISTS "{table}_test_no" ON "{table}" (test_no)')
+        self._columns = self._read_columns()
+
+    def _read_columns(self) -> Dict[str, Set[str]]:
+        # SQLite column names are case-insensitive, so they are compared in lower case.
+        return {table: {row[1].lower() for row in self._connection.execute(f'PRAGMA table_info("{table}")')} for table in MIRROR_TABLES}
+
+    async def _run(self, function, *args):
+        # SQLite calls are blocking, so they run in the default executor to keep the event loop free.
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    def _mirrored_test_nos_sync(self) -> Set[str]:
+        with self._lock:
+            return {row[0] for row in self._connection.execute("SELECT test_no FROM mirrored_tests")}
+
+    async def mirrored_test_nos(self) -> Set[str]:
+        """
+        Returns the test numbers that are completely mirrored.
+
+        Returns:
+            Set[str]: The test numbers.
+        """
+        return await self._run(self._mirrored_test_nos_sync)
+
+    async def fetch_test(self, test_no: str) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Fetches every per-test endpoint of one test: test detail, vehicles, occupants, barrier and instrumentation
+        concurrently, then restraints (per occupant) and intrusions (per vehicle) concurrently.
+
+        Args:
+            test_no (str): The test number.
+
+        Returns:
+            Dict[str, List[Dict[str, Any]]]: Table name -> rows, each row keyed by the API's field names plus
+                                             the table's key columns.
+
+        Raises:
+            RuntimeError: If any endpoint failed (naming them); the first failure is chained as the cause.
+        """
+        async def instrumentation() -> List[Any]:
+            return [record async for record in self.api.iter_instrumentation_information(test_no)]
+
+        details, vehicles, occupants, barriers, instruments = await _gather_endpoints(test_no, [
+            ("test details", self.api.get_test_details(test_no)),
+            ("vehicles", self.api.get_vehicle_information(test_no)),
+            ("occupants", self.api.get_all_occupant_information_for_vehicle(test_no)),
+            ("barriers", self.api.get_barrier_information(test_no)),
+            ("instrumentation", instrumentation()),
+        ])
+        tables: Dict[str, List[Dict[str, Any]]] = {
+            "test_details": [record_dict(record) for record in details.results or []],
+            "vehicles": [record_dict(record) for record in vehicles.results or []],
+            "occupants": [record_dict(record) for record in occupants.results or []],
+            "barriers": [record_dict(record) for record in barriers.results or []],
+            "instrumentation": [record_dict(record) for record in instruments],
+        }
+
+        vehicle_nos = list(dict.fromkeys(
+            str(vehicle_no) for vehicle_no in (_first_value(row, VEHICLE_NO_FIELDS) for row in tables["vehicles"]) if vehicle_no is not None
+        ))
+        occupant_keys: List[Tuple[str, str]] = list(dict.fromkeys(
+            (str(vehicle_no), str(location))
+            for vehicle_no, location in ((_first_value(row, VEHICLE_NO_FIELDS), _first_value(row, OCCUPANT_LOCATION_FIELDS)) for row in tables["occupants"])
+            if vehicle_no is not None and location is not None
+        ))
+        responses = await _gather_endpoints(test_no, [
+            *((f"restraints of vehicle {vehicle_no} {location}", self.api.get_restraint_information(vehicle_no, test_no, location)) for vehicle_no, location in occupant_keys),
+            *((f"intrusions of vehicle {vehicle_no}", self.api.get_intrusion_info(vehicle_no, test_no)) for vehicle_no in vehicle_nos),
+        ])
+        restraints, intrusions = responses[:len(occupant_keys)], responses[len(occupant_keys):]
+        tables["restraints"] = [
+            {**record_dict(record), "vehicle_no": vehicle_no, "occupant_location": location}
+            for (vehicle_no, location), response in zip(occupant_keys, restraints) for record in response.results or []
+        ]
+        tables["intrusions"] = [
+            {**record_dict(record), "vehicle_no": vehicle_no}
+            for vehicle_no, response in zip(vehicle_nos, intrusions) for record in response.results or []
+        ]
+        for rows in tables.values():
+            for row in rows:
+                row["test_no"] = test_no
+        return tables
+
+    def _ensure_columns(self, table: str, rows: Iterable[Dict[str, Any]]) -> None:
+        columns = self._columns[table]
+        for row in rows:
+            for name in row:
+                if name.lower() not in columns:
+                    self._connection.execute(f'ALTER TABLE "{table}" ADD COLUMN {_quote(name)}')
+                    columns.add(name.lower())
+
+    def _store_test_sync(self, test_no: str, tables: Dict[str, List[Dict[str, Any]]]) -> None:
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                for table in MIRROR_TABLES:
+                    rows = tables.get(table, [])
+                    # Replace whatever an earlier (refreshing) run stored for this test.
+                    self._connection.execute(f'DELETE FROM "{table}" WHERE test_no = ?', (test_no,))
+                    if not rows:
+                        continue
+                    self._ensure_columns(table, rows)
+                    for row in rows:
+                        names = list(row)
+                        self._connection.execute(
+                            f'INSERT INTO "{table}" ({", ".join(_quote(name) for name in names)}) VALUES ({", ".join("?" * len(names))})',
+                            [_sqlite_value(row[name]) for name in names],
+                        )
+                self._connection.execute("INSERT OR REPLACE INTO mirrored_tests VALUES (?, ?)", (test_no, time.time()))
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                # Columns added by the rolled-back transaction are gone again.
+                self._columns = self._read_columns()
+                raise
+
+    async def mirror_test(self, test_no: str) -> None:
+        """
+        Fetches one test and stores it, replacing any rows previously stored for it.
+
+        Args:
+            test_no (str): The test number.
+        """
+        tables = await self.fetch_test(test_no)
+        await self._run(self._store_test_sync, test_no, tables)
+
+    async def mirror(self, test_nos: Optional[Iterable[str]] = None, refresh: bool = False, max_concurrent_tests: Optional[int] = None) -> Dict[str, int]:
+        """
+        Mirrors the database. Tests already in `mirrored_tests` are skipped unless `refresh` is set, so running it
+        again after an interruption (or periodically) only fetches what is missing.
+
+        Args:
+            test_nos (Optional[Iterable[str]]): The tests to mirror. Defaults to every test listed by iter_all_test_data.
+            refresh (bool): Fetch tests again even if they are already mirrored.
+            max_concurrent_tests (Optional[int]): Tests fetched at once. Defaults to the NRD host's max_concurrent_requests
+                                                  (each test makes several requests, all behind the NRD rate limiter).
+
+        Returns:
+            Dict[str, int]: Counts of "mirrored", "skipped" and "failed" tests. Failed tests are logged and retried on the next run.
+        """
+        if max_concurrent_tests is None:
+            max_concurrent_tests = self.api.client.host_budgets["nrd"].max_concurrent_requests
+        done = set() if refresh else await self.mirrored_test_nos()
+        stats = {"mirrored": 0, "skipped": 0, "failed": 0}
+        queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=max_concurrent_tests * 2)
+
+        async def worker() -> None:
+            while True:
+                test_no = await queue.get()
+                if test_no is None:
+                    return
+                try:
+                    await self.mirror_test(test_no)
+                    stats["mirrored"] += 1
+                    if stats["mirrored"] % 100 == 0:
+                        logger.info(f"Mirrored {stats['mirrored']} crash tests into {self.database_path}")
+                except Exception as e:
+                    stats["failed"] += 1
+                    logger.error(f"Failed to mirror crash test {test_no}: {e}", exc_info=True)
+
+        async def listed_test_nos():
+            if test_nos is not None:
+                for test_no in test_nos:
+                    yield test_no
+                return
+            async for record in self.api.iter_all_test_data(order_by="testNo", sort_by="ASC"):
+                test_no = _first_value(record_dict(record), TEST_NO_FIELDS)
+                if test_no is not None:
+                    yield test_no
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(max_concurrent_tests)]
+        try:
+            async for test_no in listed_test_nos():
+                test_no = str(test_no)
+                if test_no in done:
+                    stats["skipped"] += 1
+                    continue
+                done.add(test_no)
+                await queue.put(test_no)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+        logger.info(f"Crash test mirror finished: {stats}")
+        return stats
+
+    def _export_parquet_sync(self, directory: str) -> Dict[str, int]:
+        pa = require_pyarrow()
+        counts = {}
+        with self._lock:
+            for table in MIRROR_TABLES:
+                cursor = self._connection.execute(f'SELECT * FROM "{table}"')
+                names = [description[0] for description in cursor.description]
+                rows = cursor.fetchall()
+                columns = {}
+                for index, name in enumerate(names):
+                    values = [row[index] for row in rows]
+                    try:
+                        columns[name] = pa.array(values)
+                    except (pa.ArrowInvalid, pa.ArrowTypeError):
+                        # SQLite columns can mix types; such a column is exported as text.
+                        columns[name] = pa.array([None if value is None else str(value) for value in values], pa.string())
+                pa.parquet.write_table(pa.table(columns), os.path.join(directory, f"{table}.parquet"))
+                counts[table] = len(rows)
+        return counts
+
+    async def export_parquet(self, directory: str) -> Dict[str, int]:
+        """
+        Writes every mirrored table to `<directory>/<table>.parquet`. Requires pyarrow (`pip install nhtsa[parquet]`).
+
+        Args:
+            directory (str): An existing directory.
+
+        Returns:
+            Dict[str, int]: Table name -> number of rows written.
+        """
+        counts = await self._run(self._export_parquet_sync, directory)
+        logger.info(f"Exported crash test mirror to {directory}: {counts}")
+        return counts
+
+    def close(self) -> None:
+        """
+        Closes the underlying SQLite connection.
+        """
+        self._connection.close()
@@ -0,0 +1,228 @@
+import logging
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Tuple, Union
+
+from ...lib.columnar import require_pyarrow, arrow_schema
+from .models import VinDecodeFlatEntry
+from .offline import OfflineVinDecoder, like_prefix_regex
+
+logger = logging.getLogger(__name__)
+
+# Characters a VIN key can hold at a position: printable ASCII without lower case (VINs are upper-cased before decoding).
+_KEY_ALPHABET = "".join(chr(code) for code in range(32, 127) if not "a" <= chr(code) <= "z")
+
+
+def _key_positions(keys: str) -> Optional[List[Optional[FrozenSet[str]]]]:
+    """
+    Splits a pattern key into the set of characters each position accepts (None for '*', i.e. any character).
+
+    Args:
+        keys (str): The Pattern.Keys value.
+
+    Returns:
+        Optional[List[Optional[FrozenSet[str]]]]: One entry per key position, or None for keys that cannot be
+                                                  expressed per position (a '%' wildcard or an unclosed class).
+    """
+    positions: List[Optional[FrozenSet[str]]] = []
+    i = 0
+    while i < len(keys):
+        char = keys[i]
+        if char == "%":
+            return None
+        if char == "[":
+            end = keys.find("]", i + 2)
+            if end < 0:
+                return None
+            character_class = like_prefix_regex(keys[i:end + 1])
+            positions.append(frozenset(candidate for candidate in _KEY_ALPHABET if character_class.fullmatch(candidate)))
+            i = end + 1
+            continue
+        positions.append(None if char in "*_" else frozenset(char.upper()))
+        i += 1
+    return positions
+
+
+class PatternIndex:
+    """
+    Per-position lookup tables for the patterns of one WMI and model year.
+    Every pattern is a bit; for each key position the table maps a character to the bitset of patterns accepting it.
+    Matching a VIN is then one dict lookup and one AND per position instead of one regex per pattern.
+    """
+    def __init__(self, patterns: Sequence[Dict[str, Any]]):
+        """
+        Initializes the PatternIndex.
+
+        Args:
+            patterns (Sequence[Dict[str, Any]]): The pattern rows (with "Keys"), in decoding order.
+        """
+        self.patterns = list(patterns)
+        self._tables: List[Dict[str, int]] = []
+        self._free: List[int] = []
+        self._fallback: List[int] = []
+        lengths: List[Tuple[int, int]] = []
+        for bit, pattern in enumerate(self.patterns):
+            positions = _key_positions(pattern["Keys"])
+            if positions is None:
+                self._fallback.append(bit)
+                continue
+            while len(self._tables) < len(positions):
+                self._tables.append({})
+                self._free.append(0)
+            for position, accepted in enumerate(positions):
+                if accepted is None:
+                    self._free[position] |= 1 << bit
+                else:
+                    table = self._tables[position]
+                    for char in accepted:
+                        table[char] = table.get(char, 0) | 1 << bit
+            lengths.append((len(positions), bit))
+
+        # Patterns no longer than the key at each key length; a pattern does not constrain positions past its end.
+        self._up_to_length = [0] * (len(self._tables) + 1)
+        for length, bit in lengths:
+            for position in range(length, len(self._tables)):
+                self._free[position] |= 1 << bit
+            self._up_to_length[length] |= 1 << bit
+        for length in range(1, len(self._up_to_length)):
+            self._up_to_length[length] |= self._up_to_length[length - 1]
+
+    def match(self, keys: str) -> List[Dict[str, Any]]:
+        """
+        Returns the patterns matching a VIN key, in their original order.
+
+        Args:
+            keys (str): The VIN key (positions 4-8, '|', positions 10-17).
+
+        Returns:
+            List[Dict[str, Any]]: The matching pattern rows.
+        """
+        mask = self._up_to_length[min(len(keys), len(self._tables))]
+        tables, free = self._tables, self._free
+        for position, char in enumerate(keys[:len(tables)]):
+            if not mask:
+                break
+            mask &= tables[position].get(char, 0) | free[position]
+        # Reading the set bits from the binary string is much cheaper than repeated big-int arithmetic.
+        binary = bin(mask)[:1:-1]
+        bits = []
+        bit = binary.find("1")
+        while bit >= 0:
+            bits.append(bit)
+            bit = binary.find("1", bit + 1)
+        if self._fallback:
+            bits.extend(bit for bit in self._fallback if self.patterns[bit]["regex"].match(keys))
+            bits.sort()
+        return [self.patterns[bit] for bit in bits]
+
+
+def _as_list(values: Any) -> List[Any]:
+    """Turns a NumPy array, Arrow array / chunked array, pandas Series or any iterable into a Python list."""
+    if hasattr(values, "to_pylist"):
+        return values.to_pylist()
+    if hasattr(values, "tolist"):
+        return values.tolist()
+    return list(values)
+
+
+class CompiledVinDecoder(OfflineVinDecoder):
+    """
+    OfflineVinDecoder with the WMI -> VIN schema -> pattern rules compiled into memory.
+    WMIs resolve through a dict of their schemas and year ranges, each (WMI, model year) gets a PatternIndex of
+    per-position bitset tables, and the small join tables (Make_Model, Wmi_Make, EngineModelPattern, VinSchema)
+    are held as dicts, so a decode only touches SQLite for descriptor years and vehicle spec schemas (both cached).
+    """
+    def __init__(self, database_path: str, pattern_cache_size: int = 65536):
+        """
+        Initializes the CompiledVinDecoder.
+
+        Args:
+            database_path (str): Path of the SQLite database built by import_vpic_database.
+            pattern_cache_size (int): Number of compiled (WMI, model year) indexes kept in memory.
+        """
+        super().__init__(database_path, pattern_cache_size)
+        self._pattern_index = lru_cache(maxsize=pattern_cache_size)(self._compile_patterns)
+        self._descriptor_years = lru_cache(maxsize=pattern_cache_size)(super()._descriptor_year)
+
+        self._tobe_qced_schemas = {row[0] for row in self._query("SELECT Id FROM VinSchema WHERE TobeQCed = 1")}
+        makes = {str(row[0]): row[1] for row in self._query("SELECT Id, Name FROM Make")}
+        self._model_makes: Dict[str, List[Tuple[str, str]]] = {}
+        for model_id, make_id in self._query("SELECT ModelId, MakeId FROM Make_Model ORDER BY Id"):
+            if str(make_id) in makes:
+                self._model_makes.setdefault(str(model_id), []).append((str(make_id), makes[str(make_id)]))
+        self._wmi_makes: Dict[int, List[Tuple[str, str]]] = {}
+        for wmi_id, make_id in self._query("SELECT WmiId, MakeId FROM Wmi_Make"):
+            if str(make_id) in makes:
+                self._wmi_makes.setdefault(wmi_id, []).append((str(make_id), makes[str(make_id)]))
+        self._engine_models: Dict[str, List[Dict[str, Any]]] = {}
+        for name, element_id, attribute_id, changed_on in self._query(
+            """
+            SELECT em.Name, p.ElementId, p.AttributeId, COALESCE(p.UpdatedOn, p.CreatedOn)
+            FROM EngineModel em JOIN EngineModelPattern p ON em.Id = p.EngineModelId JOIN Element e ON p.ElementId = e.Id
+            ORDER BY p.Id
+            """
+        ):
+            self._engine_models.setdefault(name, []).append({"ElementId": element_id, "AttributeId": str(attribute_id), "ChangedOn": changed_on})
+        logger.info(f"Compiled vPIC decoder loaded from {database_path}: {len(self._wmis)} WMIs, {len(self._model_makes)} models")
+
+    def _compile_patterns(self, wmi: str, model_year: Optional[int]) -> PatternIndex:
+        return PatternIndex(self._patterns(wmi, model_year))
+
+    def _matching_patterns(self, wmi: str, model_year: Optional[int], keys: str) -> List[Dict[str, Any]]:
+        return self._pattern_index(wmi, model_year).match(keys)
+
+    def _descriptor_year(self, descriptor: str) -> Optional[int]:
+        return self._descriptor_years(descriptor)
+
+    def _schema_tobe_qced(self, vin_schema_id: int) -> bool:
+        return vin_schema_id in self._tobe_qced_schemas
+
+    def _engine_model_patterns(self, engine_model: str) -> List[Dict[str, Any]]:
+        return self._engine_models.get(engine_model, [])
+
+    def _makes_for_model(self, model_id: str) -> List[Tuple[str, str]]:
+        return self._model_makes.get(model_id, [])
+
+    def _makes_for_wmi(self, wmi_id: int) -> List[Tuple[str, str]]:
+        return self._wmi_makes.get(wmi_id, [])
+
+    def decode_flat_batch(self, vins: Any, model_years: Union[None, int, Any] = None) -> Dict[str, List[Optional[str]]]:
+        """
+        Decodes an array of VINs into columns, one list per flat-format variable (VinDecodeFlatEntry field names).
+
+        Args:
+            vins (Any): The VINs: a NumPy array, Arrow array, pandas Series, list or any iterable of strings.
+            model_years (Union[None, int, Any]): One model year for all VINs, or an array of model years aligned
+                                                 with `vins` (None / null entries mean unknown).
+
+        Returns:
+            Dict[str, List[Optional[str]]]: Field name -> values, in input order.
+        """
+        vins = _as_list(vins)
+        if model_years is None or isinstance(model_years, int):
+            years: List[Optional[int]] = [model_years] * len(vins)
+        else:
+            years = [None if year is None or year != year else int(year) for year in _as_list(model_years)]
+            if len(years) != len(vins):
+                raise ValueError(f"Got {len(vins)} VINs but {len(years)} model years.")
+        fields = [(name, field.alias or name) for name, field in VinDecodeFlatEntry.model_fields.items()]
+        columns: Dict[str, List[Optional[str]]] = {name: [] for name, _ in fields}
+        for vin, year in zip(vins, years):
+            values = self.decode_flat_values(vin, year) if vin else {}
+            for name, alias in fields:
+                columns[name].append(values.get(alias))
+        return columns
+
+    def decode_flat_table(self, vins: Any, model_years: Union[None, int, Any] = None) -> "pyarrow.Table":
+        """
+        Decodes an array of VINs into an Arrow table with one string column per flat-format variable.
+        Requires pyarrow (`pip install nhtsa[parquet]`).
+
+        Args:
+            vins (Any): The VINs: a NumPy array, Arrow array, pandas Series, list or any iterable of strings.
+            model_years (Union[None, int, Any]): One model year for all VINs, or an array aligned with `vins`.
+
+        Returns:
+            pyarrow.Table: The decoded rows, in input order.
+        """
+        pa = require_pyarrow()
+        return pa.table(self.decode_flat_batch(vins, model_years), schema=arrow_schema(VinDecodeFlatEntry))
@@ -1,5 +1,8 @@
-from typing import TYPE_CHECKING, List, Optional, Union
+from typing import TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Deque, Dict, Iterable, List, Optional, Tuple, Type, TypeVar, Union
 from pydantic import parse_obj_as
+from collections import OrderedDict, deque
+import asyncio
+import httpx
 import logging
 from urllib.parse import urljoin, urlsplit
 import re
@@ -12,14 +15,22 @@ from .models import (
     VehicleTypesForMakeResult, VehicleTypesForMakeIdResult, EquipmentPlantCodeResult,
     ModelsForMakeResult, ModelsForMakeIdResult, ModelsForMakeYearResult,
     VehicleVariableListResult, VehicleVariableValuesListResult, DecodeVinBatchResult,
-    CanadianVehicleSpecificationsResult, BaseNHTSAResponse
+    CanadianVehicleSpecificationsResult, BaseNHTSAResponse, DecodeVinBatchEntry, VinDecodeFlatEntry
 )
+from .compiled import CompiledVinDecoder
+from .offline import OfflineVinDecoder, vin_descriptor
+from .validation import VIN_ERROR_TEXTS, VIN_OK, validate_vin
 
 if TYPE_CHECKING:
     from ...client import NhtsaClient
 
 logger = logging.getLogger(__name__)
 
+# vPIC rejects DecodeVINValuesBatch requests with more than 50 VINs.
+VPIC_BATCH_SIZE = 50
+
+FlatEntryT = TypeVar("FlatEntryT", bound=VinDecodeFlatEntry)
+
 
 class VinDecodingAPI:
     """
@@ -33,18 +44,131 @@ class VinDecodingAPI:
             client (NhtsaClient): The main client instance.
         """
         self.client = client
+        self.offline_decoder: Optional[OfflineVinDecoder] = None
+        # Flat decodes shared by every VIN with the same descriptor and model year (see decode_key), LRU ordered.
+        self.descriptor_cache_size = 100_000
+        self._descriptor_cache: "OrderedDict[Tuple[str, Optional[int]], VinDecodeFlatEntry]" = OrderedDict()
+
+    def load_offline_decoder(self, database_path: str, compiled: bool = True) -> OfflineVinDecoder:
+        """
+        Opens a local vPIC database (built with offline.import_vpic_database or offline.import_vpic_csv_directory)
+        for the decode_vin_offline / decode_vin_flat_format_offline methods.
 
-    async def decode_vin(self, vin: str, model_year: Optional[int] = None) -> VinDecodeResult:
+        Args:
+            database_path (str): Path of the SQLite database.
+            compiled (bool): Use the CompiledVinDecoder (in-memory pattern index, batch decoding of arrays).
+                             Set to False to keep memory use minimal and read everything from SQLite.
+
+        Returns:
+            OfflineVinDecoder: The decoder, also kept on `self.offline_decoder`.
+        """
+        if self.offline_decoder is not None:
+            self.offline_decoder.close()
+        self.offline_decoder = CompiledVinDecoder(database_path) if compiled else OfflineVinDecoder(database_path)
+        return self.offline_decoder
+
+    def _require_offline_decoder(self) -> OfflineVinDecoder:
+        if self.offline_decoder is None:
+            raise RuntimeError("No offline vPIC database loaded; call load_offline_decoder(database_path) first.")
+        return self.offline_decoder
+
+    @staticmethod
+    def decode_key(vin: str, model_year: Optional[int] = None) -> Tuple[str, Optional[int]]:
+        """
+        Returns the key under which deduplicated decodes are shared: the VIN descriptor (positions 1-8 and 10-11,
+        plus 12-14 for manufacturers with a '9' in position 3, i.e. the part of the VIN vPIC patterns are written
+        against) and the model year. VINs that differ only in the check digit or serial number share a key.
+
+        Args:
+            vin (str): The VIN.
+            model_year (Optional[int]): The model year passed to the decode.
+
+        Returns:
+            Tuple[str, Optional[int]]: The key.
+        """
+        return vin_descriptor(vin), model_year or None
+
+    def _cached_decode(self, key: Tuple[str, Optional[int]], vin: str, entry_type: Type[FlatEntryT]) -> Optional[FlatEntryT]:
+        entry = self._descriptor_cache.get(key)
+        if entry is None:
+            return None
+        self._descriptor_cache.move_to_end(key)
+        return self._fan_out(entry, vin, entry_type)
+
+    def _remember_decode(self, key: Tuple[str, Optional[int]], entry: VinDecodeFlatEntry) -> None:
+        self._descriptor_cache[key] = entry
+        self._descriptor_cache.move_to_end(key)
+        while len(self._descriptor_cache) > self.descriptor_cache_size:
+            self._descriptor_cache.popitem(last=False)
+
+    @staticmethod
+    def _fan_out(entry: VinDecodeFlatEntry, vin: str, entry_type: Type[FlatEntryT]) -> FlatEntryT:
+        # Everything but the VIN itself is shared; valid VINs never carry per-VIN fields like SuggestedVIN.
+        return entry_type.model_construct(**{**dict(entry), "vin": vin})
+
+    def _raise_for_invalid_vin(self, vin: str, check_digit: bool = True) -> None:
+        code = validate_vin(vin, check_digit)
+        if code != VIN_OK:
+            raise ValueError(f"Invalid VIN {vin!r}: {VIN_ERROR_TEXTS[code]}")
+
+    async def decode_vin_offline(self, vin: str, model_year: Optional[int] = None) -> VinDecodeResult:
+        """
+        Decodes the VIN locally, without a network call, and returns the output as Key-value pairs like decode_vin.
+
+        Args:
+            vin (str): The VIN to decode. Supports partial VINs (less than 17 characters).
+            model_year (Optional[int]): The vehicle's model year (recommended for accuracy).
+
+        Returns:
+            VinDecodeResult: A Pydantic model representing the decoded VIN in key-value pairs.
+
+        Raises:
+            RuntimeError: If no offline database has been loaded.
+        """
+        decoder = self._require_offline_decoder()
+        # Decoding is blocking SQLite and CPU work, so it runs in the default executor to keep the event loop free.
+        results = await asyncio.get_running_loop().run_in_executor(None, decoder.decode, vin, model_year)
+        return VinDecodeResult.model_construct(count=len(results), message="Results returned successfully (offline vPIC decoder)", search_criteria=f"VIN:{vin}", results=results)
+
+    async def decode_vin_flat_format_offline(self, vin: str, model_year: Optional[int] = None) -> VinDecodeFlatResult:
+        """
+        Decodes the VIN locally, without a network call, and returns the output in the same flat format as
+        decode_vin_flat_format (DecodeVinValues).
+
+        Args:
+            vin (str): The VIN to decode. Supports partial VINs.
+            model_year (Optional[int]): The vehicle's model year (recommended for accuracy).
+
+        Returns:
+            VinDecodeFlatResult: A Pydantic model representing the decoded VIN in a flat format.
+
+        Raises:
+            RuntimeError: If no offline database has been loaded.
+        """
+        decoder = self._require_offline_decoder()
+        result = await asyncio.get_running_loop().run_in_executor(None, decoder.decode_flat, vin, model_year)
+        return VinDecodeFlatResult.model_construct(count=1, message="Results returned successfully (offline vPIC decoder)", search_criteria=f"VIN:{vin}", results=[result])
+
+    async def decode_vin(self, vin: str, model_year: Optional[int] = None, validate: bool = False, check_digit: bool = True) -> VinDecodeResult:
         """
         Decodes the VIN and returns the output as Key-value pairs.
 
         Args:
             vin (str): The VIN to decode. Supports partial VINs (less than 17 characters).
             model_year (Optional[int]): The vehicle's model year (recommended for accuracy).
+            validate (bool): Check the VIN locally (see validation.validate_vin) and reject it before spending a
+                             rate-limited request. Only for full 17 character VINs.
+            check_digit (bool): With `validate`, also verify the check digit. It is mandatory for North American VINs
+                                only, so pass False for VINs of vehicles built for other markets.
 
         Returns:
             VinDecodeResult: A Pydantic model representing the decoded VIN in key-value pairs.
+
+        Raises:
+            ValueError: If `validate` is set and the VIN is invalid.
         """
+        if validate:
+            self._raise_for_invalid_vin(vin, check_digit)
         params = {"format": "json"}
         if model_year:
             params["modelyear"] = model_year
@@ -52,23 +176,42 @@ class VinDecodingAPI:
         response = await self.client._request("GET", url, params=params, use_vpic_client=True)
         return parse_obj_as(VinDecodeResult, response.json())
 
-    async def decode_vin_flat_format(self, vin: str, model_year: Optional[int] = None) -> VinDecodeFlatResult:
+    async def decode_vin_flat_format(self, vin: str, model_year: Optional[int] = None, validate: bool = False, dedupe: bool = False, check_digit: bool = True) -> VinDecodeFlatResult:
         """
         Decodes the VIN and returns the output in a flat file format.
 
         Args:
             vin (str): The VIN to decode. Supports partial VINs.
             model_year (Optional[int]): The vehicle's model year (recommended for accuracy).
+            validate (bool): Check the VIN locally (see validation.validate_vin) and reject it before spending a
+                             rate-limited request. Only for full 17 character VINs.
+            dedupe (bool): Share one decode between all valid VINs with the same decode_key (same vehicle, different
+                           serial number). Only VINs that pass local validation, check digit included, are shared.
+            check_digit (bool): With `validate`, also verify the check digit. It is mandatory for North American VINs
+                                only, so pass False for VINs of vehicles built for other markets.
 
         Returns:
             VinDecodeFlatResult: A Pydantic model representing the decoded VIN in a flat format.
-        """
+
+        Raises:
+            ValueError: If `validate` is set and the VIN is invalid.
+        """
+        if validate:
+            self._raise_for_invalid_vin(vin, check_digit)
+        key = self.decode_key(vin, model_year) if dedupe and validate_vin(vin) == VIN_OK else None
+        if key is not None:
+            entry = self._cached_decode(key, vin, VinDecodeFlatEntry)
+            if entry is not None:
+                return VinDecodeFlatResult.model_construct(count=1, message="Results returned successfully (shared decode of an identical VIN descriptor)", search_criteria=f"VIN:{vin}", results=[entry])
         params = {"format": "json"}
         if model_year:
             params["modelyear"] = model_year
         url = f"/vehicles/DecodeVinValues/{vin}"
         response = await self.client._request("GET", url, params=params, use_vpic_client=True)
-        return parse_obj_as(VinDecodeFlatResult, response.json())
+        result = parse_obj_as(VinDecodeFlatResult, response.json())
+        if key is not None and result.results:
+            self._remember_decode(key, result.results[0])
+        return result
 
     async def decode_vin_extended(self, vin: str, model_year: Optional[int] = None) -> VinDecodeExtendedResult:
         """
@@ -421,7 +564,8 @@ class VinDecodingAPI:
         Decodes a batch of VINs that are submitted in a standardized format in a string to return multiple decodes.
 
         Args:
-            data (str): The input string in the format "vin,modelYear;vin,modelYear;...".
+            data (str): The input string in the format "vin,modelYear;vin,modelYear;..." (at most 50 VINs;
+                        use decode_vins for larger inputs).
 
         Returns:
             DecodeVinBatchResult: A Pydantic model representing the decoded VINs in a batch.
@@ -431,6 +575,160 @@ class VinDecodingAPI:
         response = await self.client._request("POST", url, data=post_fields, use_vpic_client=True)
         return parse_obj_as(DecodeVinBatchResult, response.json())
 
+    async def decode_vins(self, vins: Union[Iterable[Tuple[str, Optional[int]]], AsyncIterable[Tuple[str, Optional[int]]]], chunk_size: int = VPIC_BATCH_SIZE, max_concurrent_chunks: Optional[int] = None, max_attempts: int = 3, validate: bool = False, dedupe: bool = False, check_digit: bool = True) -> AsyncIterator[DecodeVinBatchEntry]:
+        """
+        Decodes any number of VINs through DecodeVINValuesBatch. The input is split into chunks of at most 50 VINs,
+        the chunks are posted concurrently (still subject to the client's vPIC rate limit and concurrency budget),
+        failed chunks are retried, and the decoded rows are yielded in input order as soon as they are available.
+        The input is read lazily, so only the chunks in flight are held in memory.
+
+        Args:
+            vins (Union[Iterable[Tuple[str, Optional[int]]], AsyncIterable[Tuple[str, Optional[int]]]]):
+                (vin, model_year) pairs; the model year may be None.
+            chunk_size (int): VINs per request (at most 50).
+            max_concurrent_chunks (Optional[int]): Chunks in flight at once. Defaults to the vPIC host's
+                                                   max_concurrent_requests.
+            max_attempts (int): Attempts per chunk before giving up.
+            validate (bool): Check every VIN locally first (see validation.validate_vin). Invalid VINs are not sent;
+                             their row carries only the VIN and the vPIC error code / text of the problem.
+            dedupe (bool): Send only the first valid VIN of each decode_key (same vehicle, different serial number)
+                           and fan its decode out to the others. Only VINs that pass local validation, check digit
+                           included, are shared.
+            check_digit (bool): With `validate`, also verify the check digit. It is mandatory for North American VINs
+                                only, so pass False for VINs of vehicles built for other markets.
+
+        Yields:
+            DecodeVinBatchEntry: One decoded row per input VIN, in input order.
+
+        Raises:
+            ValueError: If chunk_size is not between 1 and 50.
+            httpx.RequestError: If a chunk still fails after max_attempts attempts.
+            httpx.HTTPStatusError: If the server answers a chunk with a non-throttling error status.
+            ValueError: If vPIC does not answer a chunk with exactly one row per VIN sent.
+        """
+        if not 1 <= chunk_size <= VPIC_BATCH_SIZE:
+            raise ValueError(f"chunk_size must be between 1 and {VPIC_BATCH_SIZE}, got {chunk_size}.")
+        if max_concurrent_chunks is None:
+            max_concurrent_chunks = self.client.host_budgets["vpic"].max_concurrent_requests
+
+        # With dedupe, decode_key -> future of the row being decoded for the first VIN sent with that key.
+        # The future is only created once a later VIN shares that decode; until then the entry is None.
+        in_flight: Dict[Tuple[str, Optional[int]], Optional["asyncio.Future[VinDecodeFlatEntry]"]] = {}
+
+        def settle(sent: List[Tuple[str, Optional[int], Optional[Tuple[str, Optional[int]]]]], error: Optional[BaseException]) -> None:
+            # VINs of later chunks waiting on this chunk's decodes fail (or are cancelled) with it instead of waiting forever.
+            for _, _, key in sent:
+                future = in_flight.pop(key, None) if key is not None else None
+                if future is None or future.done():
+                    continue
+                if error is None:
+                    future.cancel()
+                else:
+                    future.set_exception(error)
+                    # Marked as retrieved: the sharing chunk may itself be cancelled before it awaits the future.
+                    future.exception()
+
+        async def decode_chunk(chunk: List[Tuple[str, Optional[int], str, Optional[Tuple[str, Optional[int]]], Any]]) -> List[DecodeVinBatchEntry]:
+            sent = [(vin, model_year, key) for vin, model_year, code, key, shared in chunk if code == VIN_OK and shared is None]
+            try:
+                decoded = await post(sent) if sent else []
+                if len(decoded) != len(sent):
+                    raise ValueError(f"vPIC returned {len(decoded)} rows for a batch of {len(sent)} VINs starting with {sent[0][0]}.")
+            except asyncio.CancelledError:
+                settle(sent, None)
+                raise
+            except Exception as e:
+                settle(sent, e)
+                raise
+            for (_, _, key), row in zip(sent, decoded):
+                if key is not None:
+                    self._remember_decode(key, row)
+                    future = in_flight.pop(key, None)
+                    if future is not None and not future.done():
+                        future.set_result(row)
+            # vPIC answers in request order; put the decoded rows between the locally rejected and shared ones.
+            results = iter(decoded)
+            rows = []
+            for vin, model_year, code, key, shared in chunk:
+                if code != VIN_OK:
+                    rows.append(DecodeVinBatchEntry.model_construct(vin=vin, error_code=code, error_text=VIN_ERROR_TEXTS[code]))
+                elif shared is None:
+                    rows.append(next(results))
+                else:
+                    entry = await shared if isinstance(shared, asyncio.Future) else shared
+                    rows.append(self._fan_out(entry, vin, DecodeVinBatchEntry))
+            return rows
+
+        async def post(sent: List[Tuple[str, Optional[int], Optional[Tuple[str, Optional[int]]]]]) -> List[DecodeVinBatchEntry]:
+            data = ";".join(f"{vin},{model_year}" if model_year else vin for vin, model_year, _ in sent)
+            for attempt in range(max_attempts):
+                try:
+                    # _request already retries throttling and network errors; this outer loop covers chunks that
+                    # exhausted those retries, with a longer back-off so a struggling server can recover.
+                    return (await self.decode_vin_batch(data)).results
+                except httpx.RequestError as e:
+                    logger.warning(f"Batch of {len(sent)} VINs starting with {sent[0][0]} failed on attempt {attempt + 1}: {e}.", exc_info=True)
+                if attempt < max_attempts - 1:
+                    await asyncio.sleep(min(2 ** (attempt + 2), 60))
+            raise httpx.RequestError(f"Failed to decode a batch of {len(sent)} VINs starting with {sent[0][0]} after {max_attempts} attempts.")
+
+        async def pairs() -> AsyncIterator[Tuple[str, Optional[int]]]:
+            if hasattr(vins, "__aiter__"):
+                async for pair in vins:
+                    yield pair
+            else:
+                for pair in vins:
+                    yield pair
+
+        async def chunks() -> AsyncIterator[List[Tuple[str, Optional[int], str, Optional[Tuple[str, Optional[int]]], Any]]]:
+            # Chunks are filled up to chunk_size VINs that will actually be sent; rejected and shared VINs ride along.
+            # `shared` is None for a VIN that is sent, else the cached row or the in-flight future it shares.
+            chunk: List[Tuple[str, Optional[int], str, Optional[Tuple[str, Optional[int]]], Any]] = []
+            sent = 0
+            async for vin, model_year in pairs():
+                code = validate_vin(vin, check_digit) if validate or dedupe else VIN_OK
+                key, shared = None, None
+                # vPIC reports a wrong check digit in the decode itself, so only VINs with a right one share a decode.
+                if dedupe and code == VIN_OK and (check_digit or validate_vin(vin) == VIN_OK):
+                    key = self.decode_key(vin, model_year)
+                    if key in in_flight:
+                        shared = in_flight[key]
+                        if shared is None:
+                            shared = in_flight[key] = asyncio.get_running_loop().create_future()
+                    else:
+                        shared = self._descriptor_cache.get(key)
+                        if shared is None:
+                            in_flight[key] = None
+                if not validate:
+                    # Without validate, invalid VINs are still sent; dedupe just does not share their decode.
+                    code = VIN_OK
+                chunk.append((vin, model_year, code, key, shared))
+                if code == VIN_OK and shared is None:
+                    sent += 1
+                # A long run of rejected VINs is flushed too, so memory use stays bounded.
+                if sent == chunk_size or len(chunk) == 10 * chunk_size:
+                    yield chunk
+                    chunk, sent = [], 0
+            if chunk:
+                yield chunk
+
+        # A window of in-flight chunks: the oldest is awaited first, which keeps the output in input order,
+        # while the newer ones keep the connection pool busy.
+        pending: Deque[asyncio.Task] = deque()
+        try:
+            async for chunk in chunks():
+                pending.append(asyncio.ensure_future(decode_chunk(chunk)))
+                if len(pending) >= max_concurrent_chunks:
+                    for entry in await pending.popleft():
+                        yield entry
+            while pending:
+                for entry in await pending.popleft():
+                    yield entry
+        finally:
+            # The caller stopped early or a chunk failed: don't leave orphaned requests running.
+            for task in pending:
+                task.cancel()
+
     async def get_canadian_vehicle_specifications(self, year: int, make: str, model: Optional[str] = None, units: Optional[str] = None) -> CanadianVehicleSpecificationsResult:
         """
         The Canadian Vehicle Specifications (CVS) consists of a database of original vehicle dimensions.
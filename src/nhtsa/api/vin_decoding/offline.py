@@ -0,0 +1,1078 @@
+import ast
+import csv
+import itertools
+import logging
+import operator
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+from .models import VinDecodeEntry, VinDecodeFlatEntry
+from .validation import CHECK_DIGIT_WEIGHTS, TRANSLITERATION, VALID_CHARS, vin_wmi
+
+logger = logging.getLogger(__name__)
+
+# Tables of the standalone vPIC database (vPICList_Lite) that spVinDecode reads.
+# The lookup tables referenced by Element.LookupTable are discovered from the Element table at import time.
+VPIC_DECODER_TABLES: Tuple[str, ...] = (
+    "Conversion", "DefaultValue", "Element", "EngineModel", "EngineModelPattern", "ErrorCode",
+    "Make", "Make_Model", "Manufacturer", "Model", "Pattern", "VehicleSpecPattern", "VehicleSpecSchema",
+    "VehicleSpecSchema_Model", "VehicleSpecSchema_Year", "VehicleType", "VinDescriptor", "VinException",
+    "VinSchema", "VSpecSchemaPattern", "Wmi", "Wmi_Make", "Wmi_VinSchema", "WMIYearValidChars",
+    "WMIYearValidChars_CacheExceptions",
+)
+
+# Indexes matching the lookups the decoder makes for every VIN.
+_INDEXES: Tuple[Tuple[str, str], ...] = (
+    ("Wmi", "Wmi"),
+    ("Wmi_VinSchema", "WmiId"),
+    ("Pattern", "VinSchemaId"),
+    ("VinDescriptor", "Descriptor"),
+    ("WMIYearValidChars", "WMI, Year"),
+    ("EngineModel", "Name"),
+    ("EngineModelPattern", "EngineModelId"),
+    ("Make_Model", "ModelId"),
+    ("Wmi_Make", "WmiId"),
+    ("VehicleSpecSchema_Model", "ModelId"),
+    ("VehicleSpecPattern", "VSpecSchemaPatternId"),
+)
+
+_IMPORT_BATCH_SIZE = 10000
+
+# Element ids used by the decoding procedures.
+_MAKE, _MANUFACTURER, _MODEL, _MODEL_YEAR, _VEHICLE_TYPE = 26, 27, 28, 29, 39
+_BODY_CLASS, _ENGINE_MODEL, _MANUFACTURER_ID = 5, 18, 157
+_SUGGESTED_VIN, _ERROR_CODE, _POSSIBLE_VALUES, _ADDITIONAL_ERROR_TEXT, _ERROR_TEXT, _VEHICLE_DESCRIPTOR = 142, 143, 144, 156, 191, 196
+_WMI_ELEMENTS = (_MAKE, _MANUFACTURER, _MODEL_YEAR, _VEHICLE_TYPE)
+_MULTI_VALUE_ELEMENTS = (121, 129, 150, 154, 155, 114, 169, 186)
+_OFF_ROAD_BODY_CLASSES = ("69", "84", "86", "88", "97", "105", "113", "124", "126", "127")
+_INCOMPLETE_BODY_CLASSES = ("65", "107", "70", "74", "63", "72", "112", "62", "64", "76", "78", "71", "77", "67", "116", "75")
+
+# The check digit functions use case-insensitive LIKE classes [a-h,j-n,p,r-z,0-9] and [a-h,j-n,p,r-t,v-y,1-9];
+# note the commas are (harmlessly) part of the class.
+_DEFAULT_CHARS = frozenset("ABCDEFGHJKLMNPRSTUVWXYZ0123456789,abcdefghjklmnprstuvwxyz")
+_MODEL_YEAR_CHARS = frozenset("ABCDEFGHJKLMNPRSTVWXY123456789,abcdefghjklmnprstvwxy")
+_DIGITS = frozenset("0123456789")
+
+_GROUP_ORDER = {
+    "": 0, "General": 1, "Exterior / Body": 2, "Exterior / Dimension": 3, "Exterior / Truck": 4,
+    "Exterior / Trailer": 5, "Exterior / Wheel tire": 6, "Exterior / Motorcycle": 7, "Exterior / Bus": 8,
+    "Interior": 9, "Interior / Seat": 10, "Mechanical / Transmission": 11, "Mechanical / Drivetrain": 12,
+    "Mechanical / Brake": 13, "Mechanical / Battery": 14, "Mechanical / Battery / Charger": 15, "Engine": 16,
+    "Passive Safety System": 17, "Passive Safety System / Air Bag Location": 18, "Active Safety System": 19,
+    "Active Safety System / Maintaining Safe Distance": 20, "Active Safety System / Forward Collision Prevention": 21,
+    "Active Safety System / Lane and Side Assist": 22, "Active Safety System / Backing Up and Parking": 23,
+    "Active Safety System / 911 Notification": 24, "Active Safety System / Lighting Technologies": 25, "Internal": 26,
+}
+
+_OFF_ROAD_NOTE = " NOTE: Disregard if this is an off-road vehicle PIN, as check digit calculation may not be accurate."
+_CHECK_DIGIT_EXCEPTION_NOTE = " NOTE: Check Digit Exception - The check digit was given an exception based on data from the OEM indicating an error on production."
+_INCOMPLETE_VEHICLE_WARNING = "Incomplete Vehicle Warning - Please be advised that the vehicle may have been altered and may not be an accurate representation of the vehicle in its current condition."
+_UNCERTAIN_MODEL_YEAR_WARNING = "The Model Year decoded for this VIN may be incorrect. If you know the Model year, please enter it and decode again to get more accurate information."
+
+
+def _sqlite_value(value: Any) -> Any:
+    """Converts a value fetched from SQL Server into something sqlite3 stores as-is."""
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _csv_value(value: str) -> Any:
+    """Converts a CSV cell: empty cells are NULL and SQL Server bit values become 0/1."""
+    if value == "" or value == "NULL":
+        return None
+    if value in ("True", "False"):
+        return int(value == "True")
+    return value
+
+
+def _column_type(name: str) -> str:
+    """Declared column type for an imported column; INTEGER affinity turns numeric text from CSV files into integers."""
+    if name == "AttributeId" or name == "DefaultValue":
+        return "TEXT"
+    if name.endswith("Id") or name.endswith("ID") or name in ("Id", "id", "Year", "YearFrom", "YearTo", "ModelYear", "Position", "weight", "IsKey", "IsPrivate", "TobeQCed", "CheckDigit"):
+        return "INTEGER"
+    return ""
+
+
+def _create_table(target: sqlite3.Connection, table: str, columns: Sequence[str]) -> None:
+    target.execute(f'DROP TABLE IF EXISTS "{table}"')
+    target.execute(f'CREATE TABLE "{table}" ({", ".join(f"{chr(34)}{column}{chr(34)} {_column_type(column)}" for column in columns)})')
+
+
+def _create_indexes(target: sqlite3.Connection) -> None:
+    existing = {row[0] for row in target.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for table, columns in _INDEXES:
+        if table in existing:
+            target.execute(f'CREATE INDEX IF NOT EXISTS "ix_{table}_{columns.replace(", ", "_")}" ON "{table}" ({columns})')
+
+
+def _lookup_tables(target: sqlite3.Connection) -> List[str]:
+    """Returns the lookup tables referenced by the already imported Element table."""
+    return sorted({row[0] for row in target.execute("SELECT DISTINCT LookupTable FROM Element WHERE LookupTable IS NOT NULL")})
+
+
+def import_vpic_database(source: Any, database_path: str, schema: str = "dbo") -> str:
+    """
+    Copies the tables used for VIN decoding from the standalone vPIC database into a SQLite file.
+    The standalone database ships as a SQL Server backup (see VinDecodingAPI.get_standalone_vpic_db_url); restore it
+    once, connect with any DB-API driver (e.g., pyodbc, as in _README.py) and pass the connection here.
+
+    Args:
+        source (Any): An open DB-API connection to the restored vPICList database.
+        database_path (str): Path of the SQLite file to create (existing decoder tables are replaced).
+        schema (str): Schema holding the vPIC tables on the source server.
+
+    Returns:
+        str: The path of the SQLite database.
+
+    Examples:
+        >>> import pyodbc
+        >>> source = pyodbc.connect("DRIVER={ODBC Driver 18 for SQL Server};SERVER=localhost;DATABASE=vPICList_Lite1;...")
+        >>> import_vpic_database(source, "vpic.sqlite")
+    """
+    target = sqlite3.connect(database_path)
+    try:
+        def copy(table: str) -> None:
+            cursor = source.cursor()
+            cursor.execute(f"SELECT * FROM {schema}.{table}")
+            columns = [column[0] for column in cursor.description]
+            _create_table(target, table, columns)
+            insert = f'INSERT INTO "{table}" VALUES ({", ".join("?" * len(columns))})'
+            rows = 0
+            while True:
+                batch = cursor.fetchmany(_IMPORT_BATCH_SIZE)
+                if not batch:
+                    break
+                target.executemany(insert, [tuple(_sqlite_value(value) for value in row) for row in batch])
+                rows += len(batch)
+            cursor.close()
+            logger.info(f"Imported {rows} rows from {table}")
+
+        for table in VPIC_DECODER_TABLES:
+            copy(table)
+        for table in _lookup_tables(target):
+            if table not in VPIC_DECODER_TABLES:
+                copy(table)
+        _create_indexes(target)
+        target.commit()
+    finally:
+        target.close()
+    return database_path
+
+
+def import_vpic_csv_directory(directory: str, database_path: str, encoding: str = "utf-8") -> str:
+    """
+    Builds the SQLite decoder database from a directory of CSV exports, one `<Table>.csv` file per vPIC table with a
+    header row (e.g., produced with `bcp` or SSMS "Export Data" from the restored backup).
+
+    Args:
+        directory (str): Directory holding the CSV files.
+        database_path (str): Path of the SQLite file to create (existing decoder tables are replaced).
+        encoding (str): Text encoding of the CSV files.
+
+    Returns:
+        str: The path of the SQLite database.
+
+    Raises:
+        FileNotFoundError: If one of the required decoder tables has no CSV file.
+    """
+    target = sqlite3.connect(database_path)
+    try:
+        def copy(table: str) -> None:
+            with open(os.path.join(directory, f"{table}.csv"), "r", encoding=encoding, newline="") as f:
+                reader = csv.reader(f)
+                columns = next(reader)
+                _create_table(target, table, columns)
+                insert = f'INSERT INTO "{table}" VALUES ({", ".join("?" * len(columns))})'
+                rows = 0
+                batch = []
+                for row in reader:
+                    batch.append(tuple(_csv_value(value) for value in row))
+                    if len(batch) == _IMPORT_BATCH_SIZE:
+                        target.executemany(insert, batch)
+                        rows += len(batch)
+                        batch = []
+                target.executemany(insert, batch)
+                rows += len(batch)
+            logger.info(f"Imported {rows} rows from {table}.csv")
+
+        for table in VPIC_DECODER_TABLES:
+            copy(table)
+        for table in _lookup_tables(target):
+            if table not in VPIC_DECODER_TABLES and os.path.exists(os.path.join(directory, f"{table}.csv")):
+                copy(table)
+        _create_indexes(target)
+        target.commit()
+    finally:
+        target.close()
+    return database_path
+
+
+@lru_cache(maxsize=65536)
+def like_prefix_regex(keys: str) -> "re.Pattern":
+    """
+    Translates a pattern key into the regex equivalent of the decoder's `@keys like replace(Keys, '*', '_') + '%'`.
+    Keys use '*' (any character) and SQL Server LIKE character classes such as [A-C] or [^0]; the comparison is
+    case-insensitive and only anchored at the start.
+
+    Args:
+        keys (str): The Pattern.Keys value.
+
+    Returns:
+        re.Pattern: A compiled regex to use with `.match()`.
+    """
+    parts = []
+    i = 0
+    while i < len(keys):
+        char = keys[i]
+        if char == "[":
+            end = keys.find("]", i + 2)
+            if end > 0:
+                body = keys[i + 1:end]
+                negate = body.startswith("^")
+                if negate:
+                    body = body[1:]
+                parts.append("[" + ("^" if negate else "") + body.replace("\\", "\\\\").replace("[", "\\[") + "]")
+                i = end + 1
+                continue
+        if char in "*_":
+            parts.append(".")
+        elif char == "%":
+            parts.append(".*")
+        else:
+            parts.append(re.escape(char))
+        i += 1
+    return re.compile("".join(parts), re.IGNORECASE | re.DOTALL)
+
+
+def vin_descriptor(vin: str) -> str:
+    """
+    Returns the VIN descriptor (fVinDescriptor): the VIN padded with '*' to 17 characters, with the check digit
+    masked, cut to 11 characters (14 for 3rd character '9').
+
+    Args:
+        vin (str): The VIN.
+
+    Returns:
+        str: The upper-case descriptor.
+    """
+    vin = (vin.strip() + "*" * 17)[:17]
+    vin = vin[:8] + "*" + vin[9:]
+    return (vin[:14] if vin[2] == "9" else vin[:11]).upper()
+
+
+def _check_digit(vin: str, allowed: Sequence[FrozenSet[str]]) -> str:
+    if len(vin) != 17:
+        return ""
+    total = 0
+    for position, (char, chars) in enumerate(zip(vin, allowed)):
+        if char not in chars:
+            return "?"
+        total += TRANSLITERATION.get(char.upper(), -1) * CHECK_DIGIT_WEIGHTS[position]
+    remainder = total % 11
+    return "X" if remainder == 10 else str(remainder)
+
+
+def vin_check_digit(vin: str, is_car_mpv_lt: Optional[bool] = None) -> str:
+    """
+    Computes the check digit (9th position) of a 17 character VIN.
+    With `is_car_mpv_lt` it follows fVINCheckDigit2, which only requires position 13 to be numeric for passenger
+    cars, MPVs and light trucks; without it, fVINCheckDigit (positions 13-14 numeric unless the 3rd character is '9').
+
+    Args:
+        vin (str): The VIN.
+        is_car_mpv_lt (Optional[bool]): Whether the WMI is a passenger car, MPV or light truck manufacturer.
+
+    Returns:
+        str: The expected check digit ('0'-'9' or 'X'), '?' if a character is not allowed in its position,
+             or '' if the VIN is not 17 characters long.
+    """
+    return _check_digit(vin, _check_digit_classes(vin[2:3] == "9", is_car_mpv_lt))
+
+
+@lru_cache(maxsize=None)
+def _check_digit_classes(small_manufacturer: bool, is_car_mpv_lt: Optional[bool]) -> Tuple[FrozenSet[str], ...]:
+    """The characters allowed at each of the 17 positions by the check digit functions."""
+    allowed = []
+    for position in range(1, 18):
+        if position == 10:
+            allowed.append(_MODEL_YEAR_CHARS)
+        elif is_car_mpv_lt is None and position in (13, 14):
+            allowed.append(_DEFAULT_CHARS if small_manufacturer else _DIGITS)
+        elif position == 13 and not small_manufacturer and is_car_mpv_lt:
+            allowed.append(_DIGITS)
+        elif position == 14 and not small_manufacturer:
+            allowed.append(_DIGITS)
+        elif position >= 15:
+            allowed.append(_DIGITS)
+        else:
+            allowed.append(_DEFAULT_CHARS)
+    return tuple(allowed)
+
+
+@lru_cache(maxsize=65536)
+def valid_chars_in_key(keys: str) -> Tuple[Tuple[int, str], ...]:
+    """
+    Lists the (position, character) pairs a pattern key accepts (fValidCharsInKey). Positions are 1-based within the
+    key, '#' stands for any digit and '*' accepts anything, so it contributes no characters.
+
+    Args:
+        keys (str): The Pattern.Keys value.
+
+    Returns:
+        Tuple[Tuple[int, str], ...]: The accepted characters per key position.
+    """
+    result = []
+    position = 0
+    start = None
+    for i, char in enumerate(keys):
+        if start is None:
+            if char == "[":
+                start = i
+                continue
+            position += 1
+            if char == "#":
+                result.extend((position, digit) for digit in "0123456789")
+            elif char != "*":
+                result.append((position, char))
+        elif char == "]":
+            position += 1
+            result.extend((position, valid) for valid in _valid_chars_in_class(keys[start:i + 1]) if valid not in "*|")
+            start = None
+    return tuple(result)
+
+
+@lru_cache(maxsize=4096)
+def _valid_chars_in_class(character_class: str) -> str:
+    """fValidCharsInRegEx: the characters accepted by a single LIKE character class such as [A-CX] or [^0]."""
+    character_class = character_class.upper()
+    if "-" not in character_class and "^" not in character_class:
+        return character_class.replace("[", "").replace("]", "")
+    pattern = like_prefix_regex(character_class)
+    return "".join(char for char in VALID_CHARS if pattern.fullmatch(char))
+
+
+_FORMULA_OPERATORS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+
+def _evaluate_formula(expression: str) -> float:
+    """Evaluates a Conversion formula such as '2400 / 16.387064' (numbers and + - * / only)."""
+    def evaluate(node: ast.AST) -> float:
+        if isinstance(node, ast.Expression):
+            return evaluate(node.body)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.BinOp) and type(node.op) in _FORMULA_OPERATORS:
+            return _FORMULA_OPERATORS[type(node.op)](evaluate(node.left), evaluate(node.right))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            value = evaluate(node.operand)
+            return -value if isinstance(node.op, ast.USub) else value
+        raise ValueError(f"Unsupported formula: {expression}")
+    return evaluate(ast.parse(expression.strip(), mode="eval"))
+
+
+@lru_cache(maxsize=65536)
+def _convert(formula: str, data_type: str) -> str:
+    """Result of a Conversion formula as text, rounded for int targets; '0' if it cannot be evaluated (as in SQL)."""
+    try:
+        value = _evaluate_formula(formula)
+        if data_type == "int":
+            return str(int(Decimal(str(value)).quantize(Decimal(1), rounding="ROUND_HALF_UP")))
+        return format(value, ".10g")
+    except (ValueError, SyntaxError, ZeroDivisionError, ArithmeticError):
+        return "0"
+
+
+@dataclass
+class DecodingItem:
+    """
+    One decoded value, mirroring a row of the tblDecodingItem table type used by spVinDecode.
+    """
+    id: int
+    source: str
+    created_on: Optional[str]
+    priority: Optional[int]
+    pattern_id: Optional[int]
+    keys: Optional[str]
+    vin_schema_id: Optional[int]
+    wmi_id: Optional[int]
+    element_id: int
+    attribute_id: Optional[str]
+    value: Optional[str]
+    tobe_qced: Optional[bool] = None
+
+
+@dataclass
+class _Pass:
+    """The items and return codes produced by one spVinDecode_Core pass."""
+    items: List[DecodingItem]
+    return_codes: List[int]
+
+
+class OfflineVinDecoder:
+    """
+    Decodes VINs locally from a SQLite copy of the standalone vPIC database, reproducing the
+    spVinDecode / spVinDecode_Core / spVinDecode_ErrorCode stored procedures that back the DecodeVin and
+    DecodeVinValues endpoints. Build the database once with import_vpic_database or import_vpic_csv_directory.
+
+    Small tables are loaded into memory when the decoder is created and pattern lookups are cached per
+    WMI and model year, so repeated decodes of the same make/year only cost a few regex matches.
+    """
+    def __init__(self, database_path: str, pattern_cache_size: int = 4096):
+        """
+        Initializes the OfflineVinDecoder.
+
+        Args:
+            database_path (str): Path of the SQLite database built by import_vpic_database.
+            pattern_cache_size (int): Number of (WMI, model year) pattern sets kept in memory.
+        """
+        self.database_path = database_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database_path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        self._lookup_names: Dict[str, Dict[str, str]] = {}
+
+        self._elements = {row["Id"]: dict(row) for row in self._query("SELECT * FROM Element")}
+        self._error_codes = {row["Id"]: dict(row) for row in self._query("SELECT * FROM ErrorCode")}
+        self._wmis = {row["Wmi"].upper(): dict(row) for row in self._query("SELECT * FROM Wmi")}
+        self._conversions: Dict[int, List[Dict[str, Any]]] = {}
+        for row in self._query("SELECT * FROM Conversion ORDER BY Id"):
+            self._conversions.setdefault(row["FromElementId"], []).append(dict(row))
+        self._default_values: Dict[str, List[Dict[str, Any]]] = {}
+        for row in self._query("SELECT * FROM DefaultValue WHERE DefaultValue IS NOT NULL ORDER BY Id"):
+            self._default_values.setdefault(str(row["VehicleTypeId"]), []).append(dict(row))
+        self._empty_flat_values = {element["Code"]: "" for element in self._elements.values() if element["Decode"] and not element["IsPrivate"] and element["Code"]}
+        self._vin_exceptions: Set[str] = {row[0].upper() for row in self._query("SELECT VIN FROM VinException WHERE CheckDigit = 1")}
+        self._valid_chars_exceptions: Set[str] = {row[0].upper() for row in self._query("SELECT WMI FROM WMIYearValidChars_CacheExceptions")}
+
+        self._patterns = lru_cache(maxsize=pattern_cache_size)(self._load_patterns)
+        self._valid_chars = lru_cache(maxsize=pattern_cache_size)(self._load_valid_chars)
+        self._vehicle_specs = lru_cache(maxsize=pattern_cache_size)(self._load_vehicle_specs)
+
+    def _query(self, sql: str, parameters: Sequence[Any] = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def close(self) -> None:
+        """
+        Closes the underlying SQLite connection.
+        """
+        self._connection.close()
+
+
+    def _now(self) -> str:
+        return datetime.now().isoformat(sep=" ")
+
+    def _public_wmi(self, wmi: str) -> Optional[Dict[str, Any]]:
+        row = self._wmis.get(wmi)
+        if row is None or row["PublicAvailabilityDate"] is None or str(row["PublicAvailabilityDate"]) > self._now():
+            return None
+        return row
+
+    def _load_patterns(self, wmi: str, model_year: Optional[int]) -> List[Dict[str, Any]]:
+        """All patterns of the VIN schemas attached to a WMI for a model year, with their compiled key regex."""
+        rows = self._query(
+            """
+            SELECT p.Id, p.Keys, p.ElementId, p.AttributeId, p.VinSchemaId, COALESCE(p.UpdatedOn, p.CreatedOn) AS ChangedOn,
+                   wvs.YearFrom, wvs.WmiId, vs.TobeQCed
+            FROM Wmi w
+                JOIN Wmi_VinSchema wvs ON wvs.WmiId = w.Id
+                JOIN VinSchema vs ON vs.Id = wvs.VinSchemaId
+                JOIN Pattern p ON p.VinSchemaId = vs.Id
+            WHERE UPPER(w.Wmi) = ? AND (? IS NULL OR ? BETWEEN wvs.YearFrom AND COALESCE(wvs.YearTo, 2999))
+            ORDER BY wvs.Id, p.Id
+            """,
+            (wmi, model_year, model_year),
+        )
+        patterns = []
+        for row in rows:
+            pattern = dict(row)
+            pattern["Keys"] = pattern["Keys"] or ""
+            pattern["AttributeId"] = None if pattern["AttributeId"] is None else str(pattern["AttributeId"])
+            pattern["regex"] = like_prefix_regex(pattern["Keys"].replace("*", "_"))
+            patterns.append(pattern)
+        return patterns
+
+    def _matching_patterns(self, wmi: str, model_year: Optional[int], keys: str) -> List[Dict[str, Any]]:
+        """The patterns of a WMI and model year whose key matches `keys` (as `keys like replace(Keys, '*', '_') + '%'`)."""
+        return [pattern for pattern in self._patterns(wmi, model_year) if pattern["regex"].match(keys)]
+
+    def _descriptor_year(self, descriptor: str) -> Optional[int]:
+        """The model year the VinDescriptor table records for a descriptor, if any."""
+        rows = self._query("SELECT ModelYear FROM VinDescriptor WHERE Descriptor = ?", (descriptor,))
+        return rows[0][0] if rows else None
+
+    def _schema_tobe_qced(self, vin_schema_id: int) -> bool:
+        """Whether a VIN schema is still waiting for quality control."""
+        rows = self._query("SELECT TobeQCed FROM VinSchema WHERE Id = ?", (vin_schema_id,))
+        return bool(rows and rows[0][0])
+
+    def _engine_model_patterns(self, engine_model: str) -> List[Dict[str, Any]]:
+        """The element values an engine model name implies (EngineModelPattern)."""
+        rows = self._query(
+            """
+            SELECT p.ElementId, p.AttributeId, COALESCE(p.UpdatedOn, p.CreatedOn) AS ChangedOn
+            FROM EngineModel em JOIN EngineModelPattern p ON em.Id = p.EngineModelId JOIN Element e ON p.ElementId = e.Id
+            WHERE em.Name = ? ORDER BY p.Id
+            """,
+            (engine_model,),
+        )
+        return [{"ElementId": row["ElementId"], "AttributeId": str(row["AttributeId"]), "ChangedOn": row["ChangedOn"]} for row in rows]
+
+    def _makes_for_model(self, model_id: str) -> List[Tuple[str, str]]:
+        """(make id, make name) pairs of a model (Make_Model)."""
+        rows = self._query("SELECT mk.Id, mk.Name FROM Make_Model mm JOIN Make mk ON mm.MakeId = mk.Id WHERE mm.ModelId = ? ORDER BY mm.Id", (model_id,))
+        return [(str(row[0]), row[1]) for row in rows]
+
+    def _makes_for_wmi(self, wmi_id: int) -> List[Tuple[str, str]]:
+        """(make id, make name) pairs registered for a WMI (Wmi_Make)."""
+        rows = self._query("SELECT mk.Id, mk.Name FROM Wmi_Make wm JOIN Make mk ON mk.Id = wm.MakeId WHERE wm.WmiId = ?", (wmi_id,))
+        return [(str(row[0]), row[1]) for row in rows]
+
+    def _load_valid_chars(self, wmi: str, model_year: Optional[int]) -> Dict[int, str]:
+        """Valid characters per VIN position (WMIYearValidChars, or derived from the pattern keys if not cached)."""
+        valid: Dict[int, Set[str]] = {}
+        if wmi not in self._valid_chars_exceptions:
+            for row in self._query("SELECT DISTINCT Position, Char FROM WMIYearValidChars WHERE WMI = ? AND Year = ?", (wmi, model_year)):
+                if row[0] is not None and row[1] is not None:
+                    valid.setdefault(row[0], set()).add(row[1])
+        if not valid and model_year is not None:
+            for keys in {pattern["Keys"] for pattern in self._patterns(wmi, model_year)}:
+                for position, char in valid_chars_in_key(keys):
+                    valid.setdefault(position + 3, set()).add(char)
+        return {position: "".join(sorted(chars)) for position, chars in valid.items()}
+
+    def _load_vehicle_specs(self, wmi: str, vehicle_type: Optional[str], model_id: Optional[str], model_year: Optional[int]) -> List[Tuple[int, bool, List[Dict[str, Any]]]]:
+        """Vehicle spec schema patterns for a make/model/year: (pattern id, to be QCed, pattern rows)."""
+        if vehicle_type is None or model_id is None:
+            return []
+        rows = self._query(
+            """
+            SELECT DISTINCT sp.Id, s.TobeQCed
+            FROM VehicleSpecSchema s
+                JOIN VSpecSchemaPattern sp ON s.Id = sp.SchemaId
+                JOIN VehicleSpecPattern p ON sp.Id = p.VSpecSchemaPatternId
+                JOIN VehicleSpecSchema_Model vssm ON vssm.VehicleSpecSchemaId = s.Id
+                LEFT JOIN VehicleSpecSchema_Year vssy ON vssy.VehicleSpecSchemaId = s.Id
+                JOIN Wmi_Make wm ON wm.MakeId = s.MakeId
+                JOIN Wmi ON Wmi.Id = wm.WmiId
+            WHERE UPPER(Wmi.Wmi) = ? AND s.VehicleTypeId = ? AND vssm.ModelId = ? AND (vssy.Year = ? OR vssy.Id IS NULL)
+                AND p.IsKey = 1 AND COALESCE(s.TobeQCed, 0) = 0
+            ORDER BY sp.Id
+            """,
+            (wmi, vehicle_type, model_id, model_year),
+        )
+        specs = []
+        for row in rows:
+            patterns = [dict(pattern) for pattern in self._query(
+                """
+                SELECT p.IsKey, sp.SchemaId, p.VSpecSchemaPatternId, p.ElementId, p.AttributeId, COALESCE(p.UpdatedOn, p.CreatedOn) AS ChangedOn
+                FROM VehicleSpecPattern p JOIN VSpecSchemaPattern sp ON sp.Id = p.VSpecSchemaPatternId
+                WHERE p.VSpecSchemaPatternId = ?
+                """,
+                (row[0],),
+            )]
+            for pattern in patterns:
+                pattern["AttributeId"] = str(pattern["AttributeId"])
+            specs.append((row[0], bool(row[1]), patterns))
+        return specs
+
+    def _lookup_name(self, table: str, attribute_id: str) -> Optional[str]:
+        """Resolves an attribute id through a lookup table (Make, Model, BodyStyle, ...), loading the table on first use."""
+        names = self._lookup_names.get(table)
+        if names is None:
+            try:
+                names = {str(row[0]): row[1] for row in self._query(f'SELECT Id, Name FROM "{table}"')}
+            except sqlite3.Error:
+                logger.warning(f"Lookup table {table} is missing from the vPIC database", exc_info=True)
+                names = {}
+            self._lookup_names[table] = names
+        return names.get(str(attribute_id))
+
+
+    def _is_car_mpv_lt(self, wmi: str) -> bool:
+        row = self._wmis.get(wmi)
+        if row is None:
+            return False
+        return row["VehicleTypeId"] in (2, 7) or (row["VehicleTypeId"] == 3 and row["TruckTypeId"] == 1)
+
+    def _model_year_from_vin(self, vin: str) -> Optional[int]:
+        """fVinModelYear2: the model year from position 10, negative when the 30-year cycle is uncertain."""
+        if len(vin) < 10:
+            return None
+        char = vin[9]
+        model_year = None
+        if "A" <= char <= "H":
+            model_year = 2010 + ord(char) - ord("A")
+        elif "J" <= char <= "N":
+            model_year = 2010 + ord(char) - ord("A") - 1
+        elif char == "P":
+            model_year = 2023
+        elif "R" <= char <= "T":
+            model_year = 2010 + ord(char) - ord("A") - 3
+        elif "V" <= char <= "Y":
+            model_year = 2010 + ord(char) - ord("A") - 4
+        elif "1" <= char <= "9":
+            model_year = 2031 + ord(char) - ord("1")
+        if model_year is None:
+            return None
+        conclusive = False
+        if self._is_car_mpv_lt(vin_wmi(vin)):
+            if vin[6].isdigit():
+                model_year -= 30
+            conclusive = vin[6].isdigit() or "A" <= vin[6] <= "Z"
+        if model_year > datetime.now().year + 2:
+            model_year -= 30
+            conclusive = True
+        return model_year if conclusive else -model_year
+
+    def decode_items(self, vin: str, model_year: Optional[int] = None) -> List[DecodingItem]:
+        """
+        Runs the decoding passes for a VIN and returns the items of the best pass, like spVinDecode with
+        @includePrivate = 0, @includeAll = 0. Values are already resolved to their lookup names.
+
+        Args:
+            vin (str): The VIN (full or partial, '*' for unknown positions).
+            model_year (Optional[int]): The model year, if known.
+
+        Returns:
+            List[DecodingItem]: The decoded items (several items per element for multi-valued elements).
+        """
+        vin = vin.strip().upper()[:17]
+        descriptor = vin_descriptor(vin)
+        current_year = datetime.now().year
+        passes: List[_Pass] = []
+
+        descriptor_year = self._descriptor_year(descriptor)
+        if descriptor_year is not None and 1980 <= descriptor_year <= current_year + 2:
+            error12 = model_year is not None and model_year != descriptor_year
+            passes.append(self._decode_pass(vin, descriptor_year, descriptor, True, error12))
+        else:
+            model_year_source = "***X*|Y"
+            conclusive = True
+            other_year = None
+            vin_year = self._model_year_from_vin(vin)
+            if vin_year is not None and vin_year < 0:
+                other_year, vin_year, conclusive = -vin_year - 30, -vin_year, False
+            do_3_and_4 = True
+            if model_year is not None and 1980 <= model_year <= current_year + 2 and model_year not in (vin_year, other_year):
+                model_year_source = str(model_year)
+                user_pass = self._decode_pass(vin, model_year, model_year_source, True, True)
+                passes.append(user_pass)
+                do_3_and_4 = 8 in user_pass.return_codes and vin_year is not None
+            if do_3_and_4:
+                error12 = model_year is not None and vin_year is not None and model_year != vin_year
+                passes.append(self._decode_pass(vin, vin_year, model_year_source, conclusive, error12))
+                if other_year is not None:
+                    error12 = model_year is not None and model_year != other_year
+                    passes.append(self._decode_pass(vin, other_year, model_year_source, conclusive, error12))
+
+        items = max(passes, key=lambda decoding_pass: self._pass_rank(decoding_pass.items, model_year)).items
+
+        # Drop values from VIN schemas that are still waiting for quality control, then resolve lookup values.
+        result = []
+        for item in items:
+            if item.source[:7].lower() in ("pattern", "formula", "enginem", "convers") and item.vin_schema_id is not None:
+                if self._schema_tobe_qced(item.vin_schema_id):
+                    item.tobe_qced = True
+            if item.tobe_qced:
+                continue
+            if item.value == "XXX":
+                lookup_table = self._elements.get(item.element_id, {}).get("LookupTable")
+                item.value = item.attribute_id
+                if lookup_table is not None and item.attribute_id is not None:
+                    item.value = self._lookup_name(lookup_table, item.attribute_id) or item.attribute_id
+            result.append(item)
+        return result
+
+    def _pass_rank(self, items: List[DecodingItem], model_year: Optional[int]) -> Tuple[float, float, float, float]:
+        """Sort key picking the best pass: error weight, then decoded element weight, pattern count and model year."""
+        def value_or_lowest(value: Optional[int]) -> float:
+            return float("-inf") if value is None else value
+
+        error_value = None
+        model_year_value = None
+        weights: Dict[int, int] = {}
+        patterns = 0
+        for item in items:
+            if item.element_id == _ERROR_CODE:
+                codes = {code for code in (item.value or "").split(",")}
+                error_value = sum(error["weight"] or 0 for error_id, error in self._error_codes.items() if str(error_id) in codes)
+            elif item.element_id == _MODEL_YEAR and item.value:
+                model_year_value = int(item.value) + (10000 if model_year is not None and int(item.value) == model_year else 0)
+            weight = self._elements.get(item.element_id, {}).get("weight")
+            if item.value and weight is not None:
+                weights[item.element_id] = weight
+            if item.source in ("Pattern", "EngineModelPattern") and item.value not in (None, "", "Not Applicable"):
+                patterns += 1
+        return (value_or_lowest(error_value), value_or_lowest(sum(weights.values()) if weights else None),
+                value_or_lowest(patterns or None), value_or_lowest(model_year_value))
+
+    def _decode_pass(self, vin: str, model_year: Optional[int], model_year_source: str, conclusive: bool, error12: bool) -> _Pass:
+        """spVinDecode_Core: decodes the VIN for one candidate model year."""
+        wmi = vin_wmi(vin)
+        keys = ""
+        if len(vin) > 3:
+            keys = vin[3:8]
+            if len(vin) > 9:
+                keys += "|" + vin[9:17]
+        items: List[DecodingItem] = []
+        return_codes: List[int] = []
+        corrected_vin, error_bytes, unused_positions = "", "", ""
+        ids = itertools.count()
+
+        def add(**fields: Any) -> DecodingItem:
+            item = DecodingItem(id=next(ids), **fields)
+            items.append(item)
+            return item
+
+        wmi_row = self._public_wmi(wmi)
+        if wmi_row is None:
+            return_codes.append(7)
+        else:
+            wmi_id = wmi_row["Id"]
+            for pattern in self._matching_patterns(wmi, model_year, keys):
+                element = self._elements.get(pattern["ElementId"])
+                if (element is None or pattern["ElementId"] in _WMI_ELEMENTS or element["Decode"] is None or element["IsPrivate"]
+                        or pattern["TobeQCed"]):
+                    continue
+                add(source="Pattern", created_on=pattern["ChangedOn"], priority=pattern["YearFrom"], pattern_id=pattern["Id"],
+                    keys=pattern["Keys"].upper(), vin_schema_id=pattern["VinSchemaId"], wmi_id=pattern["WmiId"],
+                    element_id=pattern["ElementId"], attribute_id=pattern["AttributeId"], value="XXX", tobe_qced=bool(pattern["TobeQCed"]))
+
+            engine_models = sorted((item for item in items if item.element_id == _ENGINE_MODEL), key=lambda item: -(item.priority or 0))
+            if engine_models:
+                engine = engine_models[0]
+                for row in self._engine_model_patterns(engine.attribute_id):
+                    add(source="EngineModelPattern", created_on=row["ChangedOn"], priority=50, pattern_id=engine.pattern_id, keys=engine.keys,
+                        vin_schema_id=engine.vin_schema_id, wmi_id=wmi_id, element_id=row["ElementId"], attribute_id=row["AttributeId"], value="XXX")
+
+            wmi_changed_on = wmi_row["UpdatedOn"] or wmi_row["CreatedOn"]
+            vehicle_type_name = self._lookup_name("VehicleType", wmi_row["VehicleTypeId"]) if wmi_row["VehicleTypeId"] is not None else None
+            if vehicle_type_name is not None:
+                add(source="VehType", created_on=wmi_changed_on, priority=100, pattern_id=None, keys=wmi.upper(), vin_schema_id=None,
+                    wmi_id=wmi_id, element_id=_VEHICLE_TYPE, attribute_id=str(wmi_row["VehicleTypeId"]), value=vehicle_type_name.upper())
+            manufacturer_id = wmi_row["ManufacturerId"]
+            manufacturer_name = self._lookup_name("Manufacturer", manufacturer_id) if manufacturer_id is not None else None
+            manufacturer_id = None if manufacturer_name is None else str(manufacturer_id)
+            add(source="Manuf. Name", created_on=None, priority=100, pattern_id=None, keys=wmi.upper(), vin_schema_id=None, wmi_id=wmi_id,
+                element_id=_MANUFACTURER, attribute_id=manufacturer_id, value=manufacturer_name.upper() if manufacturer_name else None)
+            add(source="Manuf. Id", created_on=None, priority=100, pattern_id=None, keys=wmi.upper(), vin_schema_id=None, wmi_id=wmi_id,
+                element_id=_MANUFACTURER_ID, attribute_id=manufacturer_id, value=manufacturer_id)
+            if model_year is not None:
+                add(source="ModelYear", created_on=None, priority=100, pattern_id=None, keys=model_year_source, vin_schema_id=None, wmi_id=None,
+                    element_id=_MODEL_YEAR, attribute_id=str(model_year), value=str(model_year))
+
+            # Formula patterns (e.g. '###' for a displacement encoded in the VIN) take their value from the VIN itself.
+            formula_keys = re.sub(r"[0-9]", "#", keys)
+            seen = set()
+            for pattern in self._matching_patterns(wmi, model_year, formula_keys):
+                if (pattern["Id"] in seen or "#" not in pattern["Keys"] or pattern["ElementId"] in _WMI_ELEMENTS
+                        or pattern["ElementId"] not in self._elements):
+                    continue
+                seen.add(pattern["Id"])
+                first, last = pattern["Keys"].index("#"), pattern["Keys"].rindex("#")
+                add(source="Formula Pattern", created_on=pattern["ChangedOn"], priority=100, pattern_id=pattern["Id"], keys=pattern["Keys"],
+                    vin_schema_id=pattern["VinSchemaId"], wmi_id=None, element_id=pattern["ElementId"], attribute_id=pattern["AttributeId"],
+                    value=keys[first:last + 1])
+
+            items = self._keep_best_per_element(items)
+
+            model_id = next((item.attribute_id for item in items if item.element_id == _MODEL), None)
+            if model_id is not None:
+                model = next(item for item in items if item.element_id == _MODEL)
+                for make_id, make_name in self._makes_for_model(model_id):
+                    add(source="pattern - model", created_on=None, priority=1000, pattern_id=model.pattern_id, keys=model.keys,
+                        vin_schema_id=model.vin_schema_id, wmi_id=None, element_id=_MAKE, attribute_id=make_id, value=make_name.upper())
+            else:
+                makes = self._makes_for_wmi(wmi_id)
+                if len(makes) == 1:
+                    add(source="Make", created_on=wmi_changed_on, priority=-100, pattern_id=None, keys=wmi, vin_schema_id=None, wmi_id=wmi_id,
+                        element_id=_MAKE, attribute_id=makes[0][0], value=makes[0][1].upper())
+
+            self._add_conversions(items, add)
+            self._add_vehicle_specs(wmi, model_year, model_id, items, add)
+
+            if not any(item.pattern_id is not None for item in items):
+                return_codes.append(8)
+            else:
+                corrected_vin, error_bytes, unused_positions = self._error_codes_for(vin, model_year, items, return_codes)
+
+        body_classes = {item.attribute_id for item in items if item.element_id == _BODY_CLASS}
+        if "64" in body_classes:
+            return_codes.append(9)
+        is_off_road = bool(body_classes.intersection(_OFF_ROAD_BODY_CLASSES))
+        if is_off_road:
+            return_codes.append(10)
+        if model_year is None:
+            return_codes.append(11)
+        vehicle_type = next((item.attribute_id for item in items if item.element_id == _VEHICLE_TYPE), None)
+        is_check_digit_exception = vin in self._vin_exceptions
+
+        # Characters that are never allowed in their position (positions from start_position on must be numeric).
+        is_car_mpv_lt = False
+        if vin[2:3] == "9":
+            start_position = 15
+        elif self._is_car_mpv_lt(wmi):
+            start_position, is_car_mpv_lt = 13, True
+        else:
+            start_position = 14
+        invalid_chars = []
+        for position, char in enumerate(vin, start=1):
+            if position == 9 and (is_off_road or is_check_digit_exception):
+                continue
+            if ((position != 9 and position < start_position and char not in VALID_CHARS + "*")
+                    or (position != 9 and position >= start_position and char not in "0123456789*")
+                    or (position == 9 and char not in "0123456789X*")
+                    or (position == 10 and char not in "123456789ABCDEFGHJKLMNPRSTVWXY")):
+                corrected_vin = (corrected_vin or vin)[:position - 1] + "!" + (corrected_vin or vin)[position:]
+                invalid_chars.append(f"{position}:{'_' if char == ' ' else char}")
+        if invalid_chars:
+            return_codes.append(400)
+        if error12:
+            return_codes.append(12)
+
+        decoded_elements = {item.element_id for item in items}
+        for default in self._default_values.get(str(vehicle_type), []) if vehicle_type is not None else []:
+            element = self._elements.get(default["ElementId"])
+            if element is None or default["ElementId"] in decoded_elements:
+                continue
+            value = "Not Applicable" if element["DataType"] == "lookup" and str(default["DefaultValue"]) == "0" else "XXX"
+            add(source="Default", created_on=default["UpdatedOn"] or default["CreatedOn"], priority=10, pattern_id=None, keys=None,
+                vin_schema_id=None, wmi_id=None, element_id=default["ElementId"], attribute_id=str(default["DefaultValue"]), value=value)
+
+        if len(vin) < 17:
+            return_codes.append(6)
+        elif vin[8] != vin_check_digit(vin, is_car_mpv_lt) and not is_check_digit_exception:
+            return_codes.append(1)
+
+        errors = [code for code in return_codes if code not in (9, 10, 12)]
+        if not errors or errors == [14]:
+            return_codes.insert(0, 0)
+        if 0 in return_codes and not any(item.element_id == _MODEL for item in items):
+            return_codes.append(14)
+
+        additional_info = None
+        for code in (4, 5):
+            if code in return_codes:
+                additional_info = self._error_codes.get(code, {}).get("AdditionalErrorText") or ""
+        if 14 in return_codes:
+            additional_info = f"{additional_info or ''} Unused position(s): {unused_positions}; ".strip()
+        if 400 in return_codes:
+            additional_info = f"{additional_info or ''} Invalid character(s): {', '.join(invalid_chars)}; ".strip()
+        if vehicle_type == "10" or body_classes.intersection(_INCOMPLETE_BODY_CLASSES):
+            additional_info = f"{additional_info or ''} {_INCOMPLETE_VEHICLE_WARNING} ".strip()
+        if not conclusive:
+            additional_info = f"{additional_info or ''} {_UNCERTAIN_MODEL_YEAR_WARNING} ".strip()
+
+        messages, codes = [], []
+        for error_id in sorted(self._error_codes):
+            if error_id in return_codes:
+                name = self._error_codes[error_id]["Name"]
+                if is_off_road and error_id == 1:
+                    name += _OFF_ROAD_NOTE
+                elif is_check_digit_exception and error_id == 0:
+                    name += _CHECK_DIGIT_EXCEPTION_NOTE
+                messages.append(name.strip())
+                codes.append(str(error_id))
+        error_codes = ",".join(codes) or None
+        error_text = "; ".join(messages)[:500] or None
+        for element_id, value in ((_SUGGESTED_VIN, corrected_vin), (_ERROR_CODE, error_codes), (_ERROR_TEXT, error_text),
+                                  (_POSSIBLE_VALUES, error_bytes), (_ADDITIONAL_ERROR_TEXT, additional_info), (_VEHICLE_DESCRIPTOR, vin_descriptor(vin))):
+            add(source="Corrections", created_on=None, priority=999, pattern_id=None, keys="", vin_schema_id=None, wmi_id=None,
+                element_id=element_id, attribute_id=value, value=value)
+        return _Pass(items, return_codes)
+
+    @staticmethod
+    def _keep_best_per_element(items: List[DecodingItem]) -> List[DecodingItem]:
+        """Keeps one item per element (except multi-valued ones): highest priority, newest, most specific key, first."""
+        ranked = sorted(items, key=lambda item: item.id)
+        ranked.sort(key=lambda item: len((item.keys or "").replace("*", "")))
+        ranked.sort(key=lambda item: item.created_on or "", reverse=True)
+        ranked.sort(key=lambda item: float("-inf") if item.priority is None else item.priority, reverse=True)
+        kept: Set[int] = set()
+        seen: Set[int] = set()
+        for item in ranked:
+            if item.element_id in _MULTI_VALUE_ELEMENTS or item.element_id not in seen:
+                kept.add(item.id)
+                seen.add(item.element_id)
+        return [item for item in items if item.id in kept]
+
+    def _add_conversions(self, items: List[DecodingItem], add: Callable[..., DecodingItem]) -> None:
+        """Derives missing units from decoded values (e.g. displacement in CI and L from CC) via the Conversion table."""
+        candidates = sorted(items, key=lambda item: item.created_on or "", reverse=True)
+        candidates.sort(key=lambda item: float("-inf") if item.priority is None else item.priority, reverse=True)
+        for item in candidates:
+            for conversion in self._conversions.get(item.element_id, []):
+                if any(existing.element_id == conversion["ToElementId"] for existing in items):
+                    continue
+                formula = conversion["Formula"].replace("#x#", str(item.attribute_id))
+                data_type = (self._elements.get(conversion["ToElementId"], {}).get("DataType") or "").lower()
+                result = _convert(formula, data_type)
+                add(source=f"Conversion {conversion['Id']}: {formula}"[:50], created_on=None, priority=100, pattern_id=item.pattern_id,
+                    keys=item.keys, vin_schema_id=item.vin_schema_id, wmi_id=item.wmi_id, element_id=conversion["ToElementId"],
+                    attribute_id=result, value=result)
+
+    def _add_vehicle_specs(self, wmi: str, model_year: Optional[int], model_id: Optional[str], items: List[DecodingItem], add: Callable[..., DecodingItem]) -> None:
+        """Adds values from vehicle spec schemas (brochure data) whose key elements all match the decoded values."""
+        vehicle_type = next((item.attribute_id for item in items if item.element_id == _VEHICLE_TYPE), None)
+        decoded = {(item.element_id, item.attribute_id) for item in items}
+        decoded_elements = {item.element_id for item in items if item.element_id not in (1, 114, 121, 129, 150, 154, 155, 169, 186)}
+        best: Dict[int, Tuple[Dict[str, Any], bool]] = {}
+        for _, tobe_qced, patterns in self._vehicle_specs(wmi, vehicle_type, model_id, model_year):
+            if not all((pattern["ElementId"], pattern["AttributeId"]) in decoded for pattern in patterns if pattern["IsKey"]):
+                continue
+            for pattern in patterns:
+                if pattern["IsKey"] or pattern["ElementId"] in decoded_elements:
+                    continue
+                current = best.get(pattern["ElementId"])
+                if current is None or pattern["AttributeId"] < current[0]["AttributeId"]:
+                    best[pattern["ElementId"]] = (pattern, tobe_qced)
+        for element_id, (pattern, tobe_qced) in best.items():
+            add(source="Vehicle Specs", created_on=pattern["ChangedOn"], priority=-100, pattern_id=pattern["VSpecSchemaPatternId"], keys="",
+                vin_schema_id=pattern["SchemaId"], wmi_id=None, element_id=element_id, attribute_id=pattern["AttributeId"], value="XXX", tobe_qced=tobe_qced)
+
+    def _error_codes_for(self, vin: str, model_year: Optional[int], items: List[DecodingItem], return_codes: List[int]) -> Tuple[str, str, str]:
+        """spVinDecode_ErrorCode: checks positions 4-8 and 11 against the characters the patterns allow."""
+        wmi = vin_wmi(vin)
+        if len(wmi) < 3:
+            return_codes.append(6)
+            return "", "", ""
+        valid = self._valid_chars(wmi, model_year)
+        corrected = ""
+        replacements = ""
+        errors = 0
+        last_position, last_replacements = 0, ""
+        end = 11 if len(wmi) == 6 else 14
+        for position in range(4, min(end, len(vin)) + 1):
+            char = vin[position - 1]
+            allowed = valid.get(position) if position not in (9, 10) else None
+            if allowed and char not in allowed:
+                corrected += "!"
+                replacements += f"({position}:{allowed})"
+                errors += 1
+                last_position, last_replacements = position, allowed
+            else:
+                corrected += char
+        corrected = wmi + corrected if len(wmi) == 3 else wmi[:3] + corrected + wmi[3:]
+        if len(vin) > len(corrected):
+            corrected += vin[len(corrected):len(corrected) + 3]
+
+        corrected_vin, error_bytes = "", ""
+        if errors == 1:
+            if len(last_replacements) == 1:
+                return_codes.append(2)
+                corrected_vin = vin[:last_position - 1] + last_replacements + vin[last_position:17]
+                error_bytes = replacements
+            else:
+                matches = [char for char in last_replacements
+                           if vin_check_digit(vin[:last_position - 1] + char + vin[last_position:17])[:1] == vin[8:9]]
+                if len(matches) == 1:
+                    return_codes.append(3)
+                    corrected_vin = vin[:last_position - 1] + matches[0] + vin[last_position:17]
+                    error_bytes = f"({last_position}:{matches[0]})"
+                else:
+                    return_codes.append(4)
+                    corrected_vin = corrected
+                    error_bytes = f"({last_position}:{last_replacements})"
+        elif errors > 1:
+            return_codes.append(5)
+            corrected_vin = corrected
+            error_bytes = replacements
+
+        used: Set[Tuple[int, str]] = set()
+        for item in items:
+            if item.keys and "pattern" in item.source.lower():
+                used.update((position, char) for position, char in valid_chars_in_key(item.keys) if char != "|")
+        unused = [str(position) for position in range(4, min(11, len(vin)) + 1)
+                  if position in (4, 5, 6, 7, 8, 11) and (position - 3, vin[position - 1]) not in used]
+        if unused:
+            return_codes.append(14)
+        return corrected_vin, error_bytes, ",".join(unused)
+
+
+    def _output_items(self, items: List[DecodingItem]) -> List[Tuple[Dict[str, Any], DecodingItem]]:
+        """Pairs the decoded items with their public, decodable elements in the order DecodeVin lists them."""
+        output = []
+        for item in items:
+            element = self._elements.get(item.element_id)
+            if element is None or not element["Decode"] or element["IsPrivate"]:
+                continue
+            output.append((element, item))
+        output.sort(key=lambda pair: (_GROUP_ORDER.get(pair[0]["GroupName"] or "", 99), pair[0]["Id"]))
+        return output
+
+    @staticmethod
+    def _clean(value: Optional[str]) -> Optional[str]:
+        if value is None:
+            return None
+        return value.replace("\t", " ").replace("\r", " ").replace("\n", " ")
+
+    def decode(self, vin: str, model_year: Optional[int] = None) -> List[VinDecodeEntry]:
+        """
+        Decodes a VIN into variable/value pairs, like the DecodeVin endpoint.
+
+        Args:
+            vin (str): The VIN (full or partial, '*' for unknown positions).
+            model_year (Optional[int]): The model year, if known.
+
+        Returns:
+            List[VinDecodeEntry]: One entry per decoded variable.
+        """
+        return [
+            VinDecodeEntry.model_construct(value=self._clean(item.value), value_id=item.attribute_id, variable=element["Name"], variable_id=element["Id"])
+            for element, item in self._output_items(self.decode_items(vin, model_year))
+        ]
+
+    def decode_flat(self, vin: str, model_year: Optional[int] = None) -> VinDecodeFlatEntry:
+        """
+        Decodes a VIN into a single flat entry, like the DecodeVinValues endpoint. Variables without a value are
+        returned as empty strings, as the API does.
+
+        Args:
+            vin (str): The VIN (full or partial, '*' for unknown positions).
+            model_year (Optional[int]): The model year, if known.
+
+        Returns:
+            VinDecodeFlatEntry: The decoded values keyed like the API response.
+        """
+        return VinDecodeFlatEntry.model_validate(self.decode_flat_values(vin, model_year))
+
+    def decode_flat_values(self, vin: str, model_year: Optional[int] = None) -> Dict[str, str]:
+        """
+        Same as decode_flat, but returns the plain dict keyed by the API's variable codes (skips model validation).
+
+        Args:
+            vin (str): The VIN (full or partial, '*' for unknown positions).
+            model_year (Optional[int]): The model year, if known.
+
+        Returns:
+            Dict[str, str]: Variable code (e.g., "Make", "ModelYear", "ErrorCode") -> value.
+        """
+        values = dict(self._empty_flat_values)
+        for element, item in self._output_items(self.decode_items(vin, model_year)):
+            code = element["Code"] or element["Name"]
+            value = self._clean(item.value) or ""
+            if values.get(code) and item.element_id in _MULTI_VALUE_ELEMENTS:
+                values[code] = f"{values[code]}, {value}"
+            else:
+                values[code] = value
+            if item.element_id == _MAKE:
+                values["MakeID"] = item.attribute_id or ""
+            elif item.element_id == _MODEL:
+                values["ModelID"] = item.attribute_id or ""
+        values["VIN"] = vin.strip().upper()
+        return values
+
@@ -0,0 +1,163 @@
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+VIN_LENGTH = 17
+# Position 10 never holds I, O, Q, U, Z or 0.
+MODEL_YEAR_CHARS = "ABCDEFGHJKLMNPRSTVWXY123456789"
+# VIN characters (no I, O or Q), their check digit values and the check digit weight of each position.
+VALID_CHARS = "ABCDEFGHJKLMNPRSTUVWXYZ0123456789"
+TRANSLITERATION = {
+    **{str(digit): digit for digit in range(10)},
+    "A": 1, "B": 2, "C": 3, "D": 4, "E": 5, "F": 6, "G": 7, "H": 8,
+    "J": 1, "K": 2, "L": 3, "M": 4, "N": 5, "P": 7, "R": 9,
+    "S": 2, "T": 3, "U": 4, "V": 5, "W": 6, "X": 7, "Y": 8, "Z": 9,
+}
+CHECK_DIGIT_WEIGHTS = (8, 7, 6, 5, 4, 3, 2, 10, 0, 9, 8, 7, 6, 5, 4, 3, 2)
+
+# Problems are reported with the vPIC error code (and text) the server would have answered with,
+# so a VIN rejected locally looks the same as one rejected by DecodeVinValues.
+VIN_OK = "0"
+VIN_CHECK_DIGIT_ERROR = "1"
+VIN_INCOMPLETE = "6"
+VIN_MODEL_YEAR_ERROR = "11"
+VIN_INVALID_CHARACTERS = "400"
+VIN_ERROR_TEXTS = {
+    VIN_OK: "0 - VIN decoded clean. Check Digit (9th position) is correct",
+    VIN_CHECK_DIGIT_ERROR: "1 - Check Digit (9th position) does not calculate properly",
+    VIN_INCOMPLETE: "6 - Incomplete VIN",
+    VIN_MODEL_YEAR_ERROR: "11 - Incorrect Model Year, decoded data may not be accurate!",
+    VIN_INVALID_CHARACTERS: "400 - Invalid Characters Present",
+}
+
+
+def vin_wmi(vin: str) -> str:
+    """
+    Returns the World Manufacturer Identifier of a VIN (fVinWMI): the first 3 characters, plus characters 12-14 for
+    manufacturers building fewer than 1,000 vehicles a year (3rd character '9').
+
+    Args:
+        vin (str): The VIN.
+
+    Returns:
+        str: The 3 or 6 character WMI.
+    """
+    wmi = vin[:3]
+    if wmi[2:3] == "9" and len(vin) >= 14:
+        wmi += vin[11:14]
+    return wmi
+
+
+def validate_vin(vin: str, check_digit: bool = True) -> str:
+    """
+    Validates a full 17 character VIN locally: length, alphabet (no I, O or Q), model-year character and,
+    optionally, the position-9 check digit.
+
+    Args:
+        vin (str): The VIN (case-insensitive; surrounding whitespace is ignored).
+        check_digit (bool): Whether to verify the check digit. It is mandatory for North American VINs only,
+                            so pass False for VINs of vehicles built for other markets.
+
+    Returns:
+        str: VIN_OK, or the vPIC error code of the first problem found (see VIN_ERROR_TEXTS).
+    """
+    vin = vin.strip().upper()
+    if len(vin) != VIN_LENGTH:
+        return VIN_INCOMPLETE
+    if any(char not in VALID_CHARS for char in vin):
+        return VIN_INVALID_CHARACTERS
+    if vin[9] not in MODEL_YEAR_CHARS:
+        return VIN_MODEL_YEAR_ERROR
+    if check_digit:
+        remainder = sum(TRANSLITERATION[char] * weight for char, weight in zip(vin, CHECK_DIGIT_WEIGHTS)) % 11
+        if vin[8] != ("X" if remainder == 10 else str(remainder)):
+            return VIN_CHECK_DIGIT_ERROR
+    return VIN_OK
+
+
+def is_valid_vin(vin: str, check_digit: bool = True) -> bool:
+    """
+    Returns whether validate_vin finds no problem with the VIN.
+
+    Args:
+        vin (str): The VIN.
+        check_digit (bool): Whether to verify the check digit.
+
+    Returns:
+        bool: True if the VIN is valid.
+    """
+    return validate_vin(vin, check_digit) == VIN_OK
+
+
+def _validation_tables(numpy: Any) -> Dict[str, Any]:
+    """Character code -> transliterated value (-1 if not allowed) and character code -> is a model-year character lookup tables."""
+    values = numpy.full(256, -1, dtype=numpy.int64)
+    for char in VALID_CHARS:
+        values[ord(char)] = TRANSLITERATION[char]
+    model_year = numpy.zeros(256, dtype=bool)
+    for char in MODEL_YEAR_CHARS:
+        model_year[ord(char)] = True
+    check_chars = numpy.frombuffer(b"0123456789X", dtype=numpy.uint8)
+    return {"values": values, "model_year": model_year, "check_chars": check_chars, "weights": numpy.array(CHECK_DIGIT_WEIGHTS, dtype=numpy.int64)}
+
+
+def validate_vins(vins: Any, check_digit: bool = True) -> List[str]:
+    """
+    Validates many VINs at once. With NumPy installed, the VINs are packed into one (n, 17) character matrix and every
+    rule is evaluated as an array operation; otherwise each VIN goes through validate_vin.
+
+    Args:
+        vins (Any): The VINs: a list, NumPy array, Arrow array, pandas Series or any iterable of strings
+                    (None entries count as incomplete).
+        check_digit (bool): Whether to verify the check digit.
+
+    Returns:
+        List[str]: One code per VIN, in input order: VIN_OK or the vPIC error code of the first problem found.
+    """
+    if hasattr(vins, "to_pylist"):
+        vins = vins.to_pylist()
+    vins = ["" if vin is None else vin.strip().upper() for vin in vins]
+    try:
+        import numpy
+    except ImportError:
+        return [validate_vin(vin, check_digit) for vin in vins]
+    if not vins:
+        return []
+
+    tables = _validation_tables(numpy)
+    lengths = numpy.fromiter(map(len, vins), dtype=numpy.int64, count=len(vins))
+    # A fixed-width unicode array is one code point per uint32: cut / zero-pad every VIN to 17 characters and clamp
+    # code points to 255, so NUL padding and non-Latin-1 characters both fail the alphabet check.
+    matrix = numpy.minimum(numpy.array(vins, dtype=f"U{VIN_LENGTH}").view(numpy.uint32).reshape(len(vins), VIN_LENGTH), 255)
+    values = tables["values"][matrix]
+
+    codes = numpy.full(len(vins), VIN_OK, dtype=object)
+    if check_digit:
+        expected = tables["check_chars"][(values * tables["weights"]).sum(axis=1) % 11]
+        codes[matrix[:, 8] != expected] = VIN_CHECK_DIGIT_ERROR
+    # Assigned from the last rule to the first, so each VIN keeps the code of its first problem.
+    codes[~tables["model_year"][matrix[:, 9]]] = VIN_MODEL_YEAR_ERROR
+    codes[(values < 0).any(axis=1)] = VIN_INVALID_CHARACTERS
+    codes[lengths != VIN_LENGTH] = VIN_INCOMPLETE
+    return codes.tolist()
+
+
+def group_by_wmi(vins: Sequence[str], codes: Optional[Sequence[str]] = None) -> Dict[str, List[int]]:
+    """
+    Groups VINs by World Manufacturer Identifier, e.g. to send each manufacturer's VINs together or to decode them
+    against one compiled pattern index at a time.
+
+    Args:
+        vins (Sequence[str]): The VINs.
+        codes (Optional[Sequence[str]]): Validation codes from validate_vins; VINs whose code is not VIN_OK are left out.
+
+    Returns:
+        Dict[str, List[int]]: WMI -> positions of its VINs in `vins`, in input order.
+    """
+    groups: Dict[str, List[int]] = {}
+    for index, vin in enumerate(vins):
+        if codes is not None and codes[index] != VIN_OK:
+            continue
+        groups.setdefault(vin_wmi(vin.strip().upper()), []).append(index)
+    return groups
@@ -4,8 +4,14 @@ import asyncio
 # import os
 import pickle
 # import traceback
-import time
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, AsyncIterator, Awaitable, Callable, Iterable, Tuple
+
+from .lib.rate_limiter import AdaptiveTokenBucket, HostBudget, parse_retry_after
+from .lib.bulk import BulkResult, bulk
+from .lib.cache import ResponseCache
+from .lib.checkpoint import CheckpointJournal, checkpointed_bulk, default_key
+from .lib.download_store import DownloadStore
+from .lib.single_flight import SINGLE_FLIGHT_METHODS, SingleFlight, share_json
 
 # Setup logger
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -25,8 +31,10 @@ class NhtsaClient:
     VPIC_BASE_URL = "https://vpic.nhtsa.dot.gov/api"
     STATIC_FILES_BASE_URL = "https://static.nhtsa.gov"
     NRD_BASE_URL = "https://nrd.api.nhtsa.dot.gov"
+    HOSTS = ("api", "vpic", "static", "nrd")
+    THROTTLE_STATUS_CODES = (429, 503)
 
-    def __init__(self, max_concurrent_requests: int = 5, nhtsa_requests_per_minute: int = 100, session_data: Optional[bytes] = None):
+    def __init__(self, max_concurrent_requests: int = 5, nhtsa_requests_per_minute: int = 100, session_data: Optional[bytes] = None, burst_size: int = 5, host_budgets: Optional[Dict[str, HostBudget]] = None, cache: Optional[ResponseCache] = None, download_store: Optional[DownloadStore] = None, coalesce_requests: bool = True):
         """
         Initializes the NhtsaClient.
 
@@ -35,7 +43,27 @@ class NhtsaClient:
             nhtsa_requests_per_minute (int): The maximum number of requests allowed per minute for the NHTSA API
                                              to respect the server's rate limit.
             session_data (Optional[bytes]): Pickled session data to restore a previous session.
+            burst_size (int): The number of requests that may be sent back-to-back before the
+                              per-minute rate kicks in (token-bucket capacity).
+            host_budgets (Optional[Dict[str, HostBudget]]): Per-host overrides keyed by "api", "vpic", "static" or "nrd".
+                                                            Hosts without an override get the budget described by the
+                                                            arguments above. Each host has its own limiter and pool,
+                                                            so a large static download never blocks vPIC or NRD calls.
+            cache (Optional[ResponseCache]): Response cache for GET requests (e.g., MemoryCache or SQLiteCache).
+                                             Static file downloads are never cached. Disabled when None.
+            download_store (Optional[DownloadStore]): Local store for static file downloads. When set, downloads send
+                                                      If-None-Match / If-Modified-Since and reuse the local copy on 304.
+            coalesce_requests (bool): Let concurrent identical GET/HEAD requests (same host, method, path and
+                                      parameters) share one network call and one parsed JSON body.
         """
+        self.cache = cache
+        self.download_store = download_store
+        self.single_flight: Optional[SingleFlight] = SingleFlight() if coalesce_requests else None
+        self.host_budgets: Dict[str, HostBudget] = {
+            host: HostBudget(requests_per_minute=nhtsa_requests_per_minute, max_concurrent_requests=max_concurrent_requests, burst_size=burst_size)
+            for host in self.HOSTS
+        }
+        self.host_budgets.update(host_budgets or {})
         self.client = httpx.AsyncClient(
             base_url=self.BASE_URL,
             headers={
@@ -46,7 +74,7 @@ class NhtsaClient:
             },
             follow_redirects=True,
             timeout=30.0,
-            limits=httpx.Limits(max_connections=max_concurrent_requests, max_keepalive_connections=max_concurrent_requests)
+            limits=httpx.Limits(max_connections=self.host_budgets["api"].max_concurrent_requests, max_keepalive_connections=self.host_budgets["api"].max_concurrent_requests)
         )
         self.vpic_client = httpx.AsyncClient(
             base_url=self.VPIC_BASE_URL,
@@ -57,7 +85,7 @@ class NhtsaClient:
             },
             follow_redirects=True,
             timeout=30.0,
-            limits=httpx.Limits(max_connections=max_concurrent_requests, max_keepalive_connections=max_concurrent_requests)
+            limits=httpx.Limits(max_connections=self.host_budgets["vpic"].max_concurrent_requests, max_keepalive_connections=self.host_budgets["vpic"].max_concurrent_requests)
         )
         self.static_client = httpx.AsyncClient(
             base_url=self.STATIC_FILES_BASE_URL,
@@ -68,7 +96,7 @@ class NhtsaClient:
             },
             follow_redirects=True,
             timeout=60.0,
-            limits=httpx.Limits(max_connections=max_concurrent_requests, max_keepalive_connections=max_concurrent_requests)
+            limits=httpx.Limits(max_connections=self.host_budgets["static"].max_concurrent_requests, max_keepalive_connections=self.host_budgets["static"].max_concurrent_requests)
         )
         # New client for NRD APIs
         self.nrd_client = httpx.AsyncClient(
@@ -80,19 +108,22 @@ class NhtsaClient:
             },
             follow_redirects=True,
             timeout=30.0,
-            limits=httpx.Limits(max_connections=max_concurrent_requests, max_keepalive_connections=max_concurrent_requests)
+            limits=httpx.Limits(max_connections=self.host_budgets["nrd"].max_concurrent_requests, max_keepalive_connections=self.host_budgets["nrd"].max_concurrent_requests)
         )
 
         self.session_cookies: Dict[str, str] = {}
         
-        # Concurrency control for internal requests
-        self.semaphore = asyncio.Semaphore(max_concurrent_requests)
+        # Concurrency control for internal requests, one pool per upstream host
+        self.semaphores: Dict[str, asyncio.Semaphore] = {host: asyncio.Semaphore(budget.max_concurrent_requests) for host, budget in self.host_budgets.items()}
         
-        # Global Rate limiting for NHTSA server (100 requests/minute)
+        # Rate limiting per upstream host (e.g., 100 requests/minute), allowing short bursts of `burst_size` requests.
+        # Hosts don't throttle each other, so total throughput is the sum of the per-host budgets.
+        # Each limiter adapts to 429/503 responses and ramps back toward the configured rate afterwards.
         self.nhtsa_requests_per_minute = nhtsa_requests_per_minute
-        self.nhtsa_request_interval = 60.0 / self.nhtsa_requests_per_minute # Seconds per request (e.g., 0.6 seconds)
-        self._last_global_request_completion_time = 0.0 # Tracks when the last request (across all concurrent ones) finished its work and rate limiting sleep
-        self._global_rate_limit_lock = asyncio.Lock() # Protects access to _last_global_request_completion_time
+        self.rate_limiters: Dict[str, AdaptiveTokenBucket] = {
+            host: AdaptiveTokenBucket(rate=budget.requests_per_minute / 60.0, capacity=budget.burst_size)
+            for host, budget in self.host_budgets.items()
+        }
 
         # Initialize API modules
         from .api.safetyservice.index import SafetyServiceAPI
@@ -195,9 +226,38 @@ class NhtsaClient:
             logger.error(f"Failed to load NHTSA session from data: {e}", exc_info=True)
             return False
 
+    def _select_client(self, use_vpic_client: bool = False, use_static_client: bool = False, use_nrd_client: bool = False) -> Tuple[str, httpx.AsyncClient]:
+        """
+        Resolves which upstream host (and httpx client) a request goes to.
+
+        Returns:
+            Tuple[str, httpx.AsyncClient]: The host key ("api", "vpic", "static" or "nrd") and its client.
+        """
+        if use_static_client:
+            return "static", self.static_client
+        if use_vpic_client:
+            return "vpic", self.vpic_client
+        if use_nrd_client:
+            return "nrd", self.nrd_client
+        return "api", self.client
+
+    def _propagate_cookies(self, response: httpx.Response) -> None:
+        """
+        Stores the cookies set by a response and propagates them to all clients.
+        """
+        self.session_cookies.update(response.cookies)
+        for name, value in response.cookies.items():
+            # Propagate cookies to all clients
+            self.client.cookies.set(name, value)
+            self.vpic_client.cookies.set(name, value)
+            self.static_client.cookies.set(name, value)
+            self.nrd_client.cookies.set(name, value)
+
     async def _request(self, method: str, path: str, use_vpic_client: bool = False, use_static_client: bool = False, use_nrd_client: bool = False, **kwargs) -> httpx.Response:
         """
-        Internal request handler with rate limiting and a retry mechanism for timeouts.
+        Internal request handler with adaptive rate limiting and a retry mechanism for timeouts and throttling (429/503).
+        Concurrent identical GET/HEAD requests are coalesced: they share one network call, one rate-limit token and
+        one response, whose `json()` is decoded once for all of them.
 
         Args:
             method (str): The HTTP method (e.g., "GET", "POST").
@@ -212,63 +272,201 @@ class NhtsaClient:
 
         Raises:
             httpx.RequestError: If an HTTP request fails after multiple retries.
+            httpx.HTTPStatusError: If the server answers with a non-throttling error status.
         """
-        if use_static_client:
-            current_client = self.static_client
-        elif use_vpic_client:
-            current_client = self.vpic_client
-        elif use_nrd_client:
-            current_client = self.nrd_client
-        else:
-            current_client = self.client
+        if self.single_flight is None or method.upper() not in SINGLE_FLIGHT_METHODS:
+            return await self._send(method, path, use_vpic_client, use_static_client, use_nrd_client, **kwargs)
+        host, _ = self._select_client(use_vpic_client, use_static_client, use_nrd_client)
+        key = ResponseCache.make_key(host, method, path, **kwargs)
+
+        async def send() -> httpx.Response:
+            return share_json(await self._send(method, path, use_vpic_client, use_static_client, use_nrd_client, **kwargs))
+        return await self.single_flight.do(key, send)
+
+    async def _send(self, method: str, path: str, use_vpic_client: bool = False, use_static_client: bool = False, use_nrd_client: bool = False, **kwargs) -> httpx.Response:
+        """
+        Sends one request (or serves it from the cache) with adaptive rate limiting and a retry mechanism for timeouts and throttling (429/503).
+
+        Args:
+            method (str): The HTTP method (e.g., "GET", "POST").
+            path (str): The URL path for the request.
+            use_vpic_client (bool): If True, use the vPIC client.
+            use_static_client (bool): If True, use the static files client.
+            use_nrd_client (bool): If True, use the NRD client.
+            **kwargs: Additional keyword arguments to pass to httpx.AsyncClient.request.
+
+        Returns:
+            httpx.Response: The HTTP response object.
+
+        Raises:
+            httpx.RequestError: If an HTTP request fails after multiple retries.
+            httpx.HTTPStatusError: If the server answers with a non-throttling error status.
+        """
+        host, current_client = self._select_client(use_vpic_client, use_static_client, use_nrd_client)
+
+        # Serve repeated GET lookups from the cache without spending a rate-limit token
+        cache_key, cache_ttl = None, 0.0
+        if self.cache is not None and method.upper() == "GET" and host != "static":
+            cache_ttl = self.cache.ttl_for(path)
+            if cache_ttl > 0:
+                cache_key = self.cache.make_key(host, method, path, **kwargs)
+                cached_response = await self.cache.get(cache_key)
+                if cached_response is not None:
+                    return cached_response
 
         response = None
         for attempt in range(3):  # Try up to 3 times
             try:
-                # 1. Acquire the semaphore to limit concurrent HTTP calls to the server
-                async with self.semaphore:
-                    # 2. Acquire the global rate limit lock to determine if we need to wait
-                    async with self._global_rate_limit_lock:
-                        now = time.monotonic()
-                        # Calculate when the earliest the *next* request (globally) can begin its network operation.
-                        next_allowed_time = self._last_global_request_completion_time + self.nhtsa_request_interval
-                        sleep_duration = next_allowed_time - now
-                        if sleep_duration > 0:
-                            await asyncio.sleep(sleep_duration)
-                        # Mark the completion time for this request's rate-limiting slot.
-                        # This ensures the global rate is maintained, by dictating when the *next* request can start.
-                        self._last_global_request_completion_time = time.monotonic()
-
-                    # 3. Make the actual HTTP request (this happens outside the _global_rate_limit_lock,
-                    #    allowing concurrent HTTP operations up to max_concurrent_requests once past the rate limit check)
+                # 1. Wait for a rate limit token. The limiter never sleeps while holding its lock,
+                #    so independent requests can burst through in parallel while tokens are available.
+                await self.rate_limiters[host].acquire()
+                # 2. Acquire the host's semaphore to limit concurrent HTTP calls to that server
+                async with self.semaphores[host]:
+                    # 3. Make the actual HTTP request
                     response = await current_client.request(method, path, **kwargs)
-                    response.raise_for_status() # This will raise for 4xx/5xx responses
+                    if response.status_code != 304: # 304 answers a conditional request and is handled by the caller
+                        response.raise_for_status() # This will raise for 4xx/5xx responses
 
                     # Update session cookies after each successful request
-                    self.session_cookies.update(response.cookies)
-                    for name, value in response.cookies.items():
-                        # Propagate cookies to all clients
-                        self.client.cookies.set(name, value)
-                        self.vpic_client.cookies.set(name, value)
-                        self.static_client.cookies.set(name, value)
-                        self.nrd_client.cookies.set(name, value)
+                    self._propagate_cookies(response)
 
+                    self.rate_limiters[host].record_success()
+                    if cache_key is not None:
+                        await self.cache.set(cache_key, response, cache_ttl)
                     return response
 
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in self.THROTTLE_STATUS_CODES:
+                    logger.error(f"An unexpected error occurred during request to {path}: {e}", exc_info=True)
+                    raise
+                # The server is pushing back: slow this host down and wait out Retry-After before the next attempt.
+                retry_after = parse_retry_after(e.response.headers.get("retry-after"))
+                logger.warning(f"Request to {path} was throttled ({e.response.status_code}) on attempt {attempt + 1}, retry after {retry_after}s. Retrying...")
+                self.rate_limiters[host].record_throttle(retry_after)
             except httpx.RequestError as e:
                 # A request failed (e.g., network error, timeout, or HTTP status error caught by raise_for_status)
                 logger.warning(f"Request to {path} failed on attempt {attempt + 1}: {e}. Retrying...", exc_info=True)
-                # This failed attempt still consumed a "slot" in terms of rate limiting.
-                # The _last_global_request_completion_time was already updated when the request *started* its slot.
-                # So, no need to update it again here as it correctly reflects the last point in time a request *began* its slot.
+                # This failed attempt still consumed a token, so the retry waits for a fresh one.
                 await asyncio.sleep(2 ** attempt)  # Exponential backoff before next retry
             except Exception as e:
                 logger.error(f"An unexpected error occurred during request to {path}: {e}", exc_info=True)
-                # For any other exception, re-raise immediately. The rate limit timestamp was set at slot start.
+                # For any other exception, re-raise immediately. The rate limit token was spent at slot start.
                 raise
         # If all retries fail, raise the last encountered error.
         raise httpx.RequestError(f"Failed to complete request to {path} after multiple retries.")
 
+    async def _stream(self, method: str, path: str, sink: Callable[[bytes], Awaitable[None]], chunk_size: int = 1024 * 1024, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None, response_hook: Optional[Callable[[httpx.Response], Awaitable[None]]] = None, use_vpic_client: bool = False, use_static_client: bool = False, use_nrd_client: bool = False, **kwargs) -> httpx.Response:
+        """
+        Internal streaming request handler. Same rate limiting and throttling handling as `_request`, but the body is
+        handed to `sink` chunk by chunk instead of being buffered, so peak memory stays around `chunk_size`.
+        A failure is only retried while no bytes have reached the sink yet.
+
+        Args:
+            method (str): The HTTP method (e.g., "GET").
+            path (str): The URL path for the request.
+            sink (Callable[[bytes], Awaitable[None]]): Coroutine function called with each chunk of the body.
+            chunk_size (int): Size in bytes of the chunks passed to `sink`.
+            progress_callback (Optional[Callable[[int, Optional[int]], None]]): Called after each chunk with the bytes
+                                                                               received so far and the Content-Length (None if unknown).
+            response_hook (Optional[Callable[[httpx.Response], Awaitable[None]]]): Awaited with the response before the first chunk
+                                                                                    is read (e.g., to check 206 vs 200 for Range requests).
+            use_vpic_client (bool): If True, use the vPIC client.
+            use_static_client (bool): If True, use the static files client.
+            use_nrd_client (bool): If True, use the NRD client.
+            **kwargs: Additional keyword arguments to pass to httpx.AsyncClient.stream.
+
+        Returns:
+            httpx.Response: The (closed) response, useful for its status code and headers. A 304 response has no body.
+
+        Raises:
+            httpx.RequestError: If the request fails after multiple retries, or fails after part of the body was written.
+            httpx.HTTPStatusError: If the server answers with a non-throttling error status.
+        """
+        host, current_client = self._select_client(use_vpic_client, use_static_client, use_nrd_client)
+
+        for attempt in range(3):  # Try up to 3 times
+            received = 0
+            try:
+                await self.rate_limiters[host].acquire()
+                async with self.semaphores[host]:
+                    async with current_client.stream(method, path, **kwargs) as response:
+                        if response.status_code != 304: # 304 answers a conditional request and is handled by the caller
+                            response.raise_for_status()
+                            content_length = response.headers.get("content-length")
+                            total = int(content_length) if content_length and content_length.isdigit() else None
+                            if response_hook is not None:
+                                await response_hook(response)
+                            async for chunk in response.aiter_bytes(chunk_size):
+                                await sink(chunk)
+                                received += len(chunk)
+                                if progress_callback is not None:
+                                    progress_callback(received, total)
+
+                    self._propagate_cookies(response)
+                    self.rate_limiters[host].record_success()
+                    return response
+
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in self.THROTTLE_STATUS_CODES:
+                    logger.error(f"An unexpected error occurred during streaming request to {path}: {e}", exc_info=True)
+                    raise
+                retry_after = parse_retry_after(e.response.headers.get("retry-after"))
+                logger.warning(f"Streaming request to {path} was throttled ({e.response.status_code}) on attempt {attempt + 1}, retry after {retry_after}s. Retrying...")
+                self.rate_limiters[host].record_throttle(retry_after)
+            except httpx.RequestError as e:
+                if received:
+                    # Part of the body already reached the sink, so a blind retry would duplicate it.
+                    logger.error(f"Streaming request to {path} failed after {received} bytes: {e}", exc_info=True)
+                    raise
+                logger.warning(f"Streaming request to {path} failed on attempt {attempt + 1}: {e}. Retrying...", exc_info=True)
+                await asyncio.sleep(2 ** attempt)  # Exponential backoff before next retry
+            except Exception as e:
+                logger.error(f"An unexpected error occurred during streaming request to {path}: {e}", exc_info=True)
+                raise
+        raise httpx.RequestError(f"Failed to complete streaming request to {path} after multiple retries.")
+
+    def bulk(self, method: Callable[..., Awaitable[Any]], inputs: Iterable[Any], max_concurrency: Optional[int] = None, ordered: bool = True, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None, raise_errors: bool = False, journal: Optional[CheckpointJournal] = None, job: Optional[str] = None, key: Callable[[Any], str] = default_key, replay: bool = False) -> AsyncIterator[BulkResult]:
+        """
+        Fans an API method out over many inputs with a bounded work queue; see lib.bulk.bulk.
+
+            async for result in client.bulk(client.recalls.get_recalls_by_vehicle, [("acura", "rdx", 2012), ...]):
+                if result.ok: ...
+
+        Args:
+            method (Callable[..., Awaitable[Any]]): Any async API method (or other async callable).
+            inputs (Iterable[Any]): One entry per call: a dict of keyword arguments, a tuple of positional
+                                    arguments, or a single positional argument.
+            max_concurrency (Optional[int]): Calls in flight at once. Defaults to the largest per-host
+                                             `max_concurrent_requests`, which keeps that host's pool busy.
+            ordered (bool): Yield results in input order; otherwise as they complete.
+            progress_callback (Optional[Callable[[int, Optional[int]], None]]): Called with (finished, total).
+            raise_errors (bool): Re-raise the first error instead of capturing it in its BulkResult.
+            journal (Optional[CheckpointJournal]): Checkpoint the run: inputs already finished under `job` are skipped
+                                                   and each finished call is recorded as it completes, so a
+                                                   restarted run resumes where it stopped (see lib.checkpoint).
+            job (Optional[str]): The job name in the journal; defaults to the method's qualified name.
+            key (Callable[[Any], str]): Builds an input's journal key; by default its JSON form.
+            replay (bool): With a journal, also yield finished inputs with their stored results (no request is made).
+
+        Returns:
+            AsyncIterator[BulkResult]: One result per input (per input run or replayed, with a journal).
+        """
+        if max_concurrency is None:
+            max_concurrency = max(budget.max_concurrent_requests for budget in self.host_budgets.values())
+        options = dict(max_concurrency=max_concurrency, ordered=ordered, progress_callback=progress_callback, raise_errors=raise_errors)
+        if journal is None:
+            return bulk(method, inputs, **options)
+        return checkpointed_bulk(journal, job or getattr(method, "__qualname__", repr(method)), method, inputs, key=key, replay=replay, **options)
+
+    def get_current_rates(self) -> Dict[str, float]:
+        """
+        Returns the current adaptive request rate of each upstream host.
+
+        Returns:
+            Dict[str, float]: Requests per minute keyed by host ("api", "vpic", "static", "nrd").
+        """
+        return {host: limiter.requests_per_minute for host, limiter in self.rate_limiters.items()}
+
     async def close(self):
         """
         Closes the httpx client sessions.
@@ -0,0 +1,108 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+# In ordered mode finished results wait for slower earlier items; this many per worker may be buffered.
+ORDERED_BUFFER_PER_WORKER = 4
+
+
+@dataclass
+class BulkResult:
+    """The outcome of one input of a bulk run: either `value` or `error` is set."""
+    index: int
+    input: Any
+    value: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        """True if the call succeeded."""
+        return self.error is None
+
+
+def _call(method: Callable[..., Awaitable[Any]], item: Any) -> Awaitable[Any]:
+    """Calls `method` with one bulk input: a dict is passed as keyword arguments, a tuple as positional arguments."""
+    if isinstance(item, dict):
+        return method(**item)
+    if isinstance(item, tuple):
+        return method(*item)
+    return method(item)
+
+
+async def bulk(method: Callable[..., Awaitable[Any]], inputs: Iterable[Any], max_concurrency: int = 5, ordered: bool = True, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None, raise_errors: bool = False) -> AsyncIterator[BulkResult]:
+    """
+    Calls an async method once per input with bounded concurrency and streams the results.
+    At most `max_concurrency` calls exist at any time and inputs are pulled from `inputs` lazily, so a generator of
+    millions of inputs never turns into millions of parked coroutines. A failing call is captured in its
+    BulkResult instead of aborting the batch (unless `raise_errors`). Leaving the loop early cancels the calls
+    still running.
+
+    Args:
+        method (Callable[..., Awaitable[Any]]): The async callable, e.g. client.recalls.get_recalls_by_vehicle.
+        inputs (Iterable[Any]): One entry per call: a dict of keyword arguments, a tuple of positional arguments,
+                                or a single positional argument.
+        max_concurrency (int): Calls in flight at once.
+        ordered (bool): Yield results in input order; otherwise as they complete.
+        progress_callback (Optional[Callable[[int, Optional[int]], None]]): Called after each finished call with the
+                                                                          number finished and the input count
+                                                                          (None if `inputs` has no length).
+        raise_errors (bool): Re-raise the first error (cancelling the remaining calls) instead of capturing it.
+
+    Yields:
+        BulkResult: One result per input.
+    """
+    total = len(inputs) if hasattr(inputs, "__len__") else None
+    items = iter(enumerate(inputs))
+    max_concurrency = max(1, max_concurrency)
+    max_buffered = max_concurrency * ORDERED_BUFFER_PER_WORKER
+    running: Dict[asyncio.Task, Any] = {}
+    finished: Dict[int, BulkResult] = {}
+    exhausted = False
+    launched = emitted = completed = 0
+
+    async def run(index: int, item: Any) -> BulkResult:
+        try:
+            return BulkResult(index=index, input=item, value=await _call(method, item))
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.warning(f"Bulk call {index} of {getattr(method, '__name__', method)} failed: {e}")
+            return BulkResult(index=index, input=item, error=e)
+
+    try:
+        while True:
+            while not exhausted and len(running) < max_concurrency and (not ordered or launched - emitted < max_buffered):
+                try:
+                    index, item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                running[asyncio.ensure_future(run(index, item))] = item
+                launched += 1
+
+            if ordered:
+                while emitted in finished:
+                    yield finished.pop(emitted)
+                    emitted += 1
+            else:
+                for index in list(finished):
+                    yield finished.pop(index)
+                    emitted += 1
+
+            if not running:
+                break
+            done, _ = await asyncio.wait(set(running), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                del running[task]
+                result = task.result() # Only raises with raise_errors; the finally block cancels the rest.
+                finished[result.index] = result
+                completed += 1
+                if progress_callback is not None:
+                    progress_callback(completed, total)
+    finally:
+        # The caller stopped early, was cancelled, or a call raised: don't leave orphaned calls running.
+        for task in running:
+            task.cancel()
@@ -0,0 +1,272 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Per-endpoint TTLs in seconds, matched as substrings of the request path (first match wins).
+# Near-static lookup lists change a few times a year at most, VIN decodes never change for a given vPIC release.
+DEFAULT_TTL_RULES: Dict[str, float] = {
+    "/vehicles/DecodeVin": 7 * 24 * 3600,
+    "/vehicles/DecodeWMI": 7 * 24 * 3600,
+    "/vehicles/GetAllMakes": 24 * 3600,
+    "/vehicles/GetAllManufacturers": 24 * 3600,
+    "/vehicles/GetVehicleVariableList": 24 * 3600,
+    "/vehicles/GetVehicleVariableValuesList": 24 * 3600,
+    "/vehicles/GetMakes": 24 * 3600,
+    "/vehicles/GetModels": 24 * 3600,
+    "/vehicles/GetVehicleTypes": 24 * 3600,
+    "/vehicles/GetWMIsForManufacturer": 24 * 3600,
+    "/products/vehicle/modelYears": 24 * 3600,
+    "/products/vehicle/makes": 24 * 3600,
+    "/products/vehicle/models": 24 * 3600,
+    "/SafetyRatings/modelyear": 24 * 3600,
+    "occupant-types": 24 * 3600,
+    "vehicleModels": 24 * 3600,
+}
+
+# Headers that describe how the body was sent rather than the body itself.
+_BODY_ENCODING_HEADERS = frozenset(("content-encoding", "content-length", "transfer-encoding"))
+
+
+@dataclass
+class CachedResponse:
+    """The stored parts of a response: plain values only, so reading a cache never runs code from it."""
+    status_code: int
+    headers: str # JSON list of [name, value] pairs, duplicates kept.
+    content: bytes
+    method: str
+    url: str
+
+    @property
+    def size(self) -> int:
+        """Approximate stored size in bytes."""
+        return len(self.content) + len(self.headers) + len(self.url)
+
+
+class ResponseCache(ABC):
+    """
+    Base class for response caches used by NhtsaClient._request.
+    Subclasses store CachedResponse entries under a request key and implement `_get`, `_set` and `clear`.
+    """
+    def __init__(self, default_ttl: float = 3600.0, ttl_rules: Optional[Dict[str, float]] = None):
+        """
+        Initializes the ResponseCache.
+
+        Args:
+            default_ttl (float): TTL in seconds for paths that match no rule. Use 0 to only cache paths with a rule.
+            ttl_rules (Optional[Dict[str, float]]): Path substring -> TTL in seconds. Defaults to DEFAULT_TTL_RULES.
+                                                    A TTL of 0 disables caching for matching paths.
+        """
+        self.default_ttl = default_ttl
+        self.ttl_rules = DEFAULT_TTL_RULES if ttl_rules is None else ttl_rules
+
+    def ttl_for(self, path: str) -> float:
+        """
+        Resolves the TTL for a request path.
+
+        Args:
+            path (str): The request path or URL.
+
+        Returns:
+            float: The TTL in seconds (0 means do not cache).
+        """
+        for fragment, ttl in self.ttl_rules.items():
+            if fragment in path:
+                return ttl
+        return self.default_ttl
+
+    @staticmethod
+    def make_key(host: str, method: str, path: str, **kwargs: Any) -> str:
+        """
+        Builds a stable cache key from everything that influences the response.
+
+        Args:
+            host (str): The upstream host key ("api", "vpic", "nrd", ...).
+            method (str): The HTTP method.
+            path (str): The URL path.
+            **kwargs: The httpx request keyword arguments (params, data, headers, ...).
+
+        Returns:
+            str: A hex digest identifying the request.
+        """
+        raw = json.dumps([host, method.upper(), path, kwargs], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> Optional[httpx.Response]:
+        """
+        Returns the cached response for a key, or None if it is missing or expired.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[httpx.Response]: A rebuilt response object.
+        """
+        entry = await self._get(key)
+        if entry is None:
+            return None
+        headers = [tuple(header) for header in json.loads(entry.headers)]
+        return httpx.Response(entry.status_code, headers=headers, content=entry.content, request=httpx.Request(entry.method, entry.url))
+
+    async def set(self, key: str, response: httpx.Response, ttl: float) -> None:
+        """
+        Stores a response under a key.
+
+        Args:
+            key (str): The cache key.
+            response (httpx.Response): The response to store. Its body must already be read.
+            ttl (float): The TTL in seconds.
+        """
+        # response.content is already decoded, so the headers describing the wire encoding are not replayed with it.
+        headers = [(name, value) for name, value in response.headers.multi_items() if name.lower() not in _BODY_ENCODING_HEADERS]
+        entry = CachedResponse(response.status_code, json.dumps(headers), response.content, response.request.method, str(response.request.url))
+        await self._set(key, entry, time.time() + ttl)
+
+    @abstractmethod
+    async def _get(self, key: str) -> Optional[CachedResponse]:
+        """Returns the entry stored under a key if it has not expired."""
+
+    @abstractmethod
+    async def _set(self, key: str, entry: CachedResponse, expires_at: float) -> None:
+        """Stores an entry under a key until `expires_at` (epoch seconds)."""
+
+    @abstractmethod
+    async def clear(self) -> None:
+        """Removes every cached entry."""
+
+
+class MemoryCache(ResponseCache):
+    """
+    In-process LRU cache bounded by entry count and total payload size.
+    """
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 256 * 1024 * 1024, default_ttl: float = 3600.0, ttl_rules: Optional[Dict[str, float]] = None):
+        """
+        Initializes the MemoryCache.
+
+        Args:
+            max_entries (int): Maximum number of cached responses.
+            max_bytes (int): Maximum total size of cached responses in bytes.
+            default_ttl (float): TTL in seconds for paths that match no rule.
+            ttl_rules (Optional[Dict[str, float]]): Path substring -> TTL in seconds.
+        """
+        super().__init__(default_ttl, ttl_rules)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[CachedResponse, float]]" = OrderedDict()
+        self._size = 0
+
+    async def _get(self, key: str) -> Optional[CachedResponse]:
+        stored = self._entries.get(key)
+        if stored is None:
+            return None
+        entry, expires_at = stored
+        if expires_at < time.time():
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def _set(self, key: str, entry: CachedResponse, expires_at: float) -> None:
+        if key in self._entries:
+            self._pop(key)
+        self._entries[key] = (entry, expires_at)
+        self._size += entry.size
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            self._pop(next(iter(self._entries)))
+
+    def _pop(self, key: str) -> None:
+        entry, _ = self._entries.pop(key)
+        self._size -= entry.size
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+
+class SQLiteCache(ResponseCache):
+    """
+    On-disk cache stored in a single SQLite file, shared across processes and restarts.
+    Evicts expired entries first, then the least recently used ones once `max_entries` is exceeded.
+    """
+    def __init__(self, database_path: str, max_entries: int = 100000, default_ttl: float = 3600.0, ttl_rules: Optional[Dict[str, float]] = None):
+        """
+        Initializes the SQLiteCache.
+
+        Args:
+            database_path (str): Path of the SQLite file (created if missing).
+            max_entries (int): Maximum number of cached responses.
+            default_ttl (float): TTL in seconds for paths that match no rule.
+            ttl_rules (Optional[Dict[str, float]]): Path substring -> TTL in seconds.
+        """
+        super().__init__(default_ttl, ttl_rules)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database_path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, status_code INTEGER NOT NULL, headers TEXT NOT NULL, content BLOB NOT NULL, "
+            "method TEXT NOT NULL, url TEXT NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._connection.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    async def _run(self, function, *args):
+        # SQLite calls are blocking, so they run in the default executor to keep the event loop free.
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    def _get_sync(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT status_code, headers, content, method, url, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[5] < time.time():
+                self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                return None
+            self._connection.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            return CachedResponse(*row[:5])
+
+    def _set_sync(self, key: str, entry: CachedResponse, expires_at: float) -> None:
+        with self._lock:
+            now = time.time()
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, entry.status_code, entry.headers, entry.content, entry.method, entry.url, expires_at, now)
+            )
+            overflow = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._connection.execute("DELETE FROM responses WHERE expires_at < ?", (now,))
+                self._connection.execute(
+                    "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY last_access LIMIT ?)",
+                    (max(0, self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0] - self.max_entries),)
+                )
+
+    async def _get(self, key: str) -> Optional[CachedResponse]:
+        return await self._run(self._get_sync, key)
+
+    async def _set(self, key: str, entry: CachedResponse, expires_at: float) -> None:
+        await self._run(self._set_sync, key, entry, expires_at)
+
+    def _clear_sync(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+
+    async def clear(self) -> None:
+        await self._run(self._clear_sync)
+
+    def close(self) -> None:
+        """
+        Closes the underlying SQLite connection.
+        """
+        self._connection.close()
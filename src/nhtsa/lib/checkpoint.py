@@ -0,0 +1,212 @@
+import asyncio
+import importlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, Optional, Set
+
+from pydantic import BaseModel
+
+from .bulk import BulkResult, _call, bulk
+
+logger = logging.getLogger(__name__)
+
+# Returned by the checkpointed wrapper for finished inputs that are not replayed; such results are dropped.
+_SKIPPED = object()
+
+
+def default_key(item: Any) -> str:
+    """
+    Builds the journal key of a bulk input: its JSON form, with dict keys sorted.
+
+    Args:
+        item (Any): The input (a dict of keyword arguments, a tuple of positional arguments, or a single argument).
+
+    Returns:
+        str: The key.
+    """
+    return json.dumps(item, sort_keys=True, default=str)
+
+
+def _encode(value: Any) -> Any:
+    # Pydantic models keep their class (also inside lists and dicts) so a replay returns the same types the API
+    # method returned. Containers are tagged so they cannot be mistaken for a model entry.
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, BaseModel):
+        return {"model": f"{type(value).__module__}:{type(value).__qualname__}", "data": value.model_dump(mode="json", by_alias=True)}
+    if isinstance(value, list):
+        return {"list": [_encode(item) for item in value]}
+    if isinstance(value, tuple):
+        return {"tuple": [_encode(item) for item in value]}
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return {"dict": {key: _encode(item) for key, item in value.items()}}
+    raise TypeError(f"Cannot checkpoint a {type(value).__name__}: only Pydantic models, JSON scalars and lists, tuples and str-keyed dicts of them are stored.")
+
+
+def _decode(value: Any) -> Any:
+    if not isinstance(value, dict):
+        return value
+    if "list" in value:
+        return [_decode(item) for item in value["list"]]
+    if "tuple" in value:
+        return tuple(_decode(item) for item in value["tuple"])
+    if "dict" in value:
+        return {key: _decode(item) for key, item in value["dict"].items()}
+    module_name, qualname = value["model"].split(":", 1)
+    model = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        model = getattr(model, name)
+    return model.model_validate(value["data"])
+
+
+def _dump(value: Any) -> str:
+    return json.dumps(_encode(value))
+
+
+def _load(payload: str) -> Any:
+    return _decode(json.loads(payload))
+
+
+class CheckpointJournal:
+    """
+    Local journal of finished work for long-running crawls, stored in a single SQLite file (WAL mode).
+    Every finished call is recorded under a job name and a key, together with its result, as soon as it completes.
+    A job restarted after a crash skips (or replays from the journal) every key already recorded, so finished work
+    never spends rate-limit budget twice.
+    """
+    def __init__(self, database_path: str):
+        """
+        Initializes the CheckpointJournal.
+
+        Args:
+            database_path (str): Path of the SQLite file (created if missing).
+        """
+        self.database_path = database_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database_path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints (job TEXT NOT NULL, key TEXT NOT NULL, payload TEXT, finished_at REAL NOT NULL, PRIMARY KEY (job, key))"
+        )
+
+    async def _run(self, function, *args):
+        # SQLite calls are blocking, so they run in the default executor to keep the event loop free.
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    def _done_keys_sync(self, job: str) -> Set[str]:
+        with self._lock:
+            return {row[0] for row in self._connection.execute("SELECT key FROM checkpoints WHERE job = ?", (job,))}
+
+    async def done_keys(self, job: str) -> Set[str]:
+        """
+        Returns the keys already finished for a job.
+
+        Args:
+            job (str): The job name.
+
+        Returns:
+            Set[str]: The finished keys.
+        """
+        return await self._run(self._done_keys_sync, job)
+
+    def _record_sync(self, job: str, key: str, payload: Optional[str]) -> None:
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)", (job, key, payload, time.time()))
+
+    async def record(self, job: str, key: str, value: Any = None) -> None:
+        """
+        Marks a key of a job as finished, storing its result.
+
+        Args:
+            job (str): The job name.
+            key (str): The finished key.
+            value (Any): The result: a Pydantic model, a JSON scalar, or lists, tuples and str-keyed dicts of them.
+
+        Raises:
+            TypeError: If the value could not be rebuilt from the journal as it is.
+        """
+        await self._run(self._record_sync, job, key, _dump(value))
+
+    def _get_sync(self, job: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection.execute("SELECT payload FROM checkpoints WHERE job = ? AND key = ?", (job, key)).fetchone()
+            return row[0] if row else None
+
+    async def get(self, job: str, key: str) -> Any:
+        """
+        Returns the stored result of a finished key.
+
+        Args:
+            job (str): The job name.
+            key (str): The key.
+
+        Returns:
+            Any: The result (rebuilt as its Pydantic model when it was one), or None if the key is not finished.
+        """
+        payload = await self._run(self._get_sync, job, key)
+        return None if payload is None else _load(payload)
+
+    def _reset_sync(self, job: str) -> int:
+        with self._lock:
+            return self._connection.execute("DELETE FROM checkpoints WHERE job = ?", (job,)).rowcount
+
+    async def reset(self, job: str) -> int:
+        """
+        Forgets every finished key of a job, so the next run starts over.
+
+        Args:
+            job (str): The job name.
+
+        Returns:
+            int: The number of keys removed.
+        """
+        return await self._run(self._reset_sync, job)
+
+    def close(self) -> None:
+        """
+        Closes the underlying SQLite connection.
+        """
+        self._connection.close()
+
+
+async def checkpointed_bulk(journal: CheckpointJournal, job: str, method: Callable[..., Awaitable[Any]], inputs: Iterable[Any], key: Callable[[Any], str] = default_key, replay: bool = False, **bulk_options: Any) -> AsyncIterator[BulkResult]:
+    """
+    Runs lib.bulk.bulk over the inputs of a job, skipping those the journal already has and recording each
+    successful call as soon as it finishes. Failed calls are not recorded, so a rerun retries them.
+
+    Args:
+        journal (CheckpointJournal): The journal.
+        job (str): The job name; keys are only compared within a job.
+        method (Callable[..., Awaitable[Any]]): The async API method.
+        inputs (Iterable[Any]): The inputs, as for lib.bulk.bulk.
+        key (Callable[[Any], str]): Builds an input's journal key; by default its JSON form.
+        replay (bool): Yield finished inputs too, with their result read back from the journal (no request is
+                       made). Needed when a crawl derives its next level from earlier results.
+        **bulk_options: max_concurrency, ordered, progress_callback and raise_errors for lib.bulk.bulk.
+
+    Yields:
+        BulkResult: One result per input that was run (or replayed); `index` is the position in `inputs`.
+    """
+    done = await journal.done_keys(job)
+    if done:
+        logger.info(f"Resuming job '{job}': {len(done)} inputs already finished")
+
+    async def call(item: Any) -> Any:
+        item_key = key(item)
+        if item_key in done:
+            return await journal.get(job, item_key) if replay else _SKIPPED
+        value = await _call(method, item)
+        await journal.record(job, item_key, value)
+        return value
+
+    # Each input is wrapped in a 1-tuple so bulk passes it to `call` unchanged; `input` is unwrapped below.
+    # Sized inputs stay sized, so progress callbacks still get a total.
+    wrapped = [(item,) for item in inputs] if hasattr(inputs, "__len__") else ((item,) for item in inputs)
+    async for result in bulk(call, wrapped, **bulk_options):
+        if result.value is _SKIPPED:
+            continue
+        result.input = result.input[0]
+        yield result
@@ -0,0 +1,99 @@
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Type
+
+from pydantic import BaseModel
+
+from .flat_files import unwrap_optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ROW_GROUP_SIZE = 100_000
+
+
+def require_pyarrow():
+    """
+    Imports pyarrow lazily; it is an optional dependency (`pip install nhtsa[parquet]`).
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Columnar export requires pyarrow. Install it with `pip install nhtsa[parquet]` or `pip install pyarrow`.") from e
+    return pyarrow
+
+
+def arrow_schema(record_model: Type[BaseModel]) -> "pyarrow.Schema":
+    """
+    Builds an Arrow schema from a record model. Column names are the model's field names and column types follow
+    the annotations: int -> int64, bool -> bool, date -> date32, datetime -> timestamp[us], anything else -> string.
+
+    Args:
+        record_model (Type[BaseModel]): The record model (e.g., ComplaintFlatFileRecord or TSBInfo).
+
+    Returns:
+        pyarrow.Schema: The schema.
+    """
+    pa = require_pyarrow()
+    types = {int: pa.int64(), bool: pa.bool_(), date: pa.date32(), datetime: pa.timestamp("us"), float: pa.float64()}
+    return pa.schema([
+        pa.field(name, types.get(unwrap_optional(field.annotation), pa.string()))
+        for name, field in record_model.model_fields.items()
+    ])
+
+
+def write_parquet(records: Iterable[BaseModel], record_model: Type[BaseModel], path: str, row_group_size: int = DEFAULT_ROW_GROUP_SIZE, compression: str = "zstd") -> int:
+    """
+    Writes records to a Parquet file in row-group batches, so only `row_group_size` rows are held in memory at a time.
+    Pair it with a lazy reader such as iter_flat_file_records to convert a flat file without ever materializing it.
+
+    Args:
+        records (Iterable[BaseModel]): The records to write (any iterable, typically a generator).
+        record_model (Type[BaseModel]): The model the records are instances of; defines the columns and their types.
+        path (str): The Parquet file to write.
+        row_group_size (int): Number of rows per row group (and per in-memory batch).
+        compression (str): Parquet compression codec (e.g., "zstd", "snappy", "none").
+
+    Returns:
+        int: The number of rows written.
+    """
+    pa = require_pyarrow()
+    schema = arrow_schema(record_model)
+    names = schema.names
+    rows = 0
+    with pa.parquet.ParquetWriter(path, schema, compression=compression) as writer:
+        columns: Dict[str, List[Any]] = {name: [] for name in names}
+        for record in records:
+            values = record.__dict__
+            for name in names:
+                columns[name].append(values.get(name))
+            rows += 1
+            if rows % row_group_size == 0:
+                writer.write_table(pa.table(columns, schema=schema), row_group_size=row_group_size)
+                columns = {name: [] for name in names}
+        if columns[names[0]]:
+            writer.write_table(pa.table(columns, schema=schema), row_group_size=row_group_size)
+    logger.info(f"Wrote {rows} {record_model.__name__} rows to {path}")
+    return rows
+
+
+def write_parquet_columns(columns: Dict[str, List[Any]], record_model: Type[BaseModel], path: str, row_group_size: int = DEFAULT_ROW_GROUP_SIZE, compression: str = "zstd") -> int:
+    """
+    Writes already column-oriented data (e.g., dict(TSBInfoColumns)) to a Parquet file.
+
+    Args:
+        columns (Dict[str, List[Any]]): Field name -> equal-length list of values.
+        record_model (Type[BaseModel]): The row model whose fields define the columns and their types.
+        path (str): The Parquet file to write.
+        row_group_size (int): Number of rows per row group.
+        compression (str): Parquet compression codec (e.g., "zstd", "snappy", "none").
+
+    Returns:
+        int: The number of rows written.
+    """
+    pa = require_pyarrow()
+    schema = arrow_schema(record_model)
+    table = pa.table({name: columns[name] for name in schema.names}, schema=schema)
+    pa.parquet.write_table(table, path, row_group_size=row_group_size, compression=compression)
+    logger.info(f"Wrote {table.num_rows} {record_model.__name__} rows to {path}")
+    return table.num_rows
@@ -0,0 +1,169 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import shutil
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import aiofiles
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadStore:
+    """
+    Local store for static files downloaded from static.nhtsa.gov.
+    Remembers each file's ETag / Last-Modified validators so later downloads can be made conditional:
+    when the server answers 304 Not Modified, the local copy is served instead of re-downloading the archive.
+    """
+    INDEX_FILE_NAME = "index.json"
+
+    def __init__(self, directory: str):
+        """
+        Initializes the DownloadStore.
+
+        Args:
+            directory (str): Directory holding the downloaded files and the validator index. Must already exist.
+        """
+        self.directory = directory
+        self._index_path = os.path.join(directory, self.INDEX_FILE_NAME)
+        self._index: Optional[Dict[str, Dict[str, Optional[str]]]] = None
+        self._lock = asyncio.Lock()
+
+    async def _load_index(self) -> Dict[str, Dict[str, Optional[str]]]:
+        """
+        Loads the validator index from disk on first use.
+
+        Returns:
+            Dict[str, Dict[str, Optional[str]]]: URL -> {"path", "etag", "last_modified"}.
+        """
+        if self._index is None:
+            if os.path.exists(self._index_path):
+                async with aiofiles.open(self._index_path, "r", encoding="utf-8") as f:
+                    self._index = json.loads(await f.read())
+            else:
+                self._index = {}
+        return self._index
+
+    def path_for(self, url: str) -> str:
+        """
+        Returns the local file path used for a URL.
+
+        Args:
+            url (str): The full URL of the static file.
+
+        Returns:
+            str: A path inside the store directory, unique per URL but keeping the original file name.
+        """
+        digest = hashlib.sha1(url.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(self.directory, f"{digest}_{os.path.basename(urlsplit(url).path)}")
+
+    async def conditional_headers(self, url: str) -> Dict[str, str]:
+        """
+        Builds If-None-Match / If-Modified-Since headers for a URL whose local copy still exists.
+
+        Args:
+            url (str): The full URL of the static file.
+
+        Returns:
+            Dict[str, str]: The conditional request headers (empty if nothing is stored).
+        """
+        async with self._lock:
+            entry = (await self._load_index()).get(url)
+        if not entry or not os.path.exists(entry["path"]):
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    async def local_path(self, url: str) -> Optional[str]:
+        """
+        Returns where the stored copy of a URL lives, if there is one.
+
+        Args:
+            url (str): The full URL of the static file.
+
+        Returns:
+            Optional[str]: The local file path, or None if the URL was never stored or the file was removed.
+        """
+        async with self._lock:
+            entry = (await self._load_index()).get(url)
+        if not entry or not os.path.exists(entry["path"]):
+            return None
+        return entry["path"]
+
+    async def read(self, url: str) -> bytes:
+        """
+        Reads the stored copy of a URL.
+
+        Args:
+            url (str): The full URL of the static file.
+
+        Returns:
+            bytes: The stored file content.
+        """
+        async with self._lock:
+            path = (await self._load_index())[url]["path"]
+        async with aiofiles.open(path, "rb") as f:
+            return await f.read()
+
+    async def save(self, url: str, response: httpx.Response) -> None:
+        """
+        Stores a downloaded file together with the validators from its response headers.
+
+        Args:
+            url (str): The full URL of the static file.
+            response (httpx.Response): The 200 response whose body has been read.
+        """
+        path = self.path_for(url)
+        async with aiofiles.open(path, "wb") as f:
+            await f.write(response.content)
+        await self.record(url, path, response.headers)
+
+    async def keep(self, url: str, source_path: str, headers: httpx.Headers) -> str:
+        """
+        Keeps a copy of a file downloaded elsewhere under `path_for(url)`, so the stored copy survives the caller
+        moving or deleting theirs, and records its validators. The copy is a hard link when the filesystem allows it.
+
+        Args:
+            url (str): The full URL of the static file.
+            source_path (str): Where the file was downloaded to.
+            headers (httpx.Headers): The response headers carrying ETag / Last-Modified.
+
+        Returns:
+            str: The path of the stored copy.
+        """
+        path = self.path_for(url)
+        if os.path.abspath(source_path) != os.path.abspath(path):
+            partial_path = path + ".part"
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            try:
+                os.link(source_path, partial_path)
+            except OSError:
+                # Other filesystem, or no hard link support: copy instead.
+                await asyncio.get_running_loop().run_in_executor(None, shutil.copyfile, source_path, partial_path)
+            os.replace(partial_path, path)
+        await self.record(url, path, headers)
+        return path
+
+    async def record(self, url: str, path: str, headers: httpx.Headers) -> None:
+        """
+        Records the local path and validators of a file that is already on disk.
+
+        Args:
+            url (str): The full URL of the static file.
+            path (str): Where the file was written.
+            headers (httpx.Headers): The response headers carrying ETag / Last-Modified.
+        """
+        async with self._lock:
+            index = await self._load_index()
+            index[url] = {"path": path, "etag": headers.get("etag"), "last_modified": headers.get("last-modified")}
+            async with aiofiles.open(self._index_path, "w", encoding="utf-8") as f:
+                await f.write(json.dumps(index, indent=2))
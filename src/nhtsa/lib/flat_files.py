@@ -0,0 +1,116 @@
+import io
+import logging
+import zipfile
+from datetime import date
+from typing import Any, Callable, Iterator, List, Optional, Tuple, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+RecordT = TypeVar("RecordT", bound=BaseModel)
+
+# ODI flat files are exported from a Windows system; cp1252 covers the odd curly quote in narrative fields.
+FLAT_FILE_ENCODING = "cp1252"
+
+
+def _convert_str(value: str) -> Optional[str]:
+    return value or None
+
+
+def _convert_int(value: str) -> Optional[int]:
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _convert_date(value: str) -> Optional[date]:
+    # Dates are YYYYMMDD; a few older fields only carry YYYYMM. Slicing is much cheaper than strptime per row.
+    try:
+        if len(value) == 8:
+            return date(int(value[:4]), int(value[4:6]), int(value[6:]))
+        if len(value) == 6:
+            return date(int(value[:4]), int(value[4:]), 1)
+    except ValueError:
+        pass
+    return None
+
+
+def _convert_bool(value: str) -> Optional[bool]:
+    if value == "Y":
+        return True
+    if value == "N":
+        return False
+    return None
+
+
+_CONVERTERS = {int: _convert_int, date: _convert_date, bool: _convert_bool}
+
+
+def unwrap_optional(annotation: Any) -> Any:
+    """
+    Returns the inner type of an Optional[...] annotation (or the annotation itself if it is not Optional).
+
+    Args:
+        annotation (Any): A field annotation, e.g. Optional[int].
+
+    Returns:
+        Any: The non-None type, e.g. int.
+    """
+    if get_origin(annotation) is Union:
+        return next(arg for arg in get_args(annotation) if arg is not type(None))
+    return annotation
+
+
+def flat_file_layout(record_model: Type[BaseModel]) -> List[Tuple[str, Callable[[str], Any]]]:
+    """
+    Derives a flat-file layout from a record model: one (column name, converter) pair per column, in column order.
+    The model's field order must match the field numbers of the layout file (e.g., CMPL.txt), and each field's
+    annotation (str, int, date or bool, optionally wrapped in Optional) decides how the raw text is converted.
+
+    Args:
+        record_model (Type[BaseModel]): The record model (e.g., ComplaintFlatFileRecord).
+
+    Returns:
+        List[Tuple[str, Callable[[str], Any]]]: The column names (field aliases) and converters.
+    """
+    layout = []
+    for name, field in record_model.model_fields.items():
+        layout.append((field.alias or name, _CONVERTERS.get(unwrap_optional(field.annotation), _convert_str)))
+    return layout
+
+
+def iter_flat_file_records(zip_path: str, record_model: Type[RecordT], member: Optional[str] = None, encoding: str = FLAT_FILE_ENCODING) -> Iterator[RecordT]:
+    """
+    Lazily reads a tab-delimited ODI flat file straight out of its ZIP archive, yielding one typed record per row.
+    The member is decompressed as a stream and never extracted to disk, and rows are parsed one at a time,
+    so memory use stays constant no matter how many rows the file has.
+
+    Args:
+        zip_path (str): Path to the downloaded archive (e.g., FLAT_CMPL.zip).
+        record_model (Type[RecordT]): The record model describing the layout (e.g., ComplaintFlatFileRecord).
+        member (Optional[str]): Name of the file inside the archive. Defaults to the first .txt member.
+        encoding (str): Text encoding of the flat file.
+
+    Yields:
+        RecordT: One record per data row. Empty or malformed values become None; rows with too many fields are skipped.
+    """
+    layout = flat_file_layout(record_model)
+    with zipfile.ZipFile(zip_path) as archive:
+        if member is None:
+            member = next(name for name in archive.namelist() if name.lower().endswith(".txt"))
+        logger.info(f"Reading {record_model.__name__} rows from {zip_path}:{member}")
+        with archive.open(member) as raw:
+            for line_number, line in enumerate(io.TextIOWrapper(raw, encoding=encoding, errors="replace", newline="\n"), start=1):
+                values = line.rstrip("\r\n").split("\t")
+                if len(values) == 1 and not values[0]:
+                    continue
+                if len(values) > len(layout):
+                    # A stray tab inside a narrative field shifts every later column, so the row cannot be trusted.
+                    logger.warning(f"Line {line_number} of {member} has {len(values)} fields, expected at most {len(layout)}; skipping.")
+                    continue
+                record = {name: convert(value.strip()) for (name, convert), value in zip(layout, values)}
+                for name, _ in layout[len(values):]:
+                    record[name] = None
+                yield record_model.model_construct(**record)
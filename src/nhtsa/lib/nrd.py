@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, Optional
+
+from .pagination import DEFAULT_PAGE_SIZE, iter_pages
+from .signal_store import SignalStoreMixin
+from .signals import download_test_channels
+
+if TYPE_CHECKING:
+    from ..client import NhtsaClient
+
+logger = logging.getLogger(__name__)
+
+
+class NrdDatabaseMixin(SignalStoreMixin):
+    """
+    Streaming and channel download helpers shared by the NRD test database APIs (vehicle crash, biomechanics and
+    component tests). They are built on each class's own get_all_test_data, get_instrumentation_information,
+    get_instrumentation_detail_information and search_test_data, which take the same arguments on every NRD database.
+    """
+    client: "NhtsaClient"
+
+    def _prefetch(self, prefetch: Optional[int]) -> int:
+        return self.client.host_budgets["nrd"].max_concurrent_requests if prefetch is None else prefetch
+
+    def iter_all_test_data(self, order_by: Optional[str] = None, sort_by: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE, prefetch: Optional[int] = None) -> AsyncIterator[Any]:
+        """
+        Streams every test record of get_all_test_data, fetching the following pages ahead concurrently.
+
+        Args:
+            order_by (Optional[str]): Field to order the results by.
+            sort_by (Optional[str]): Sort order ("ASC" or "DESC").
+            page_size (int): Number of rows requested per page.
+            prefetch (Optional[int]): Pages requested ahead. Defaults to the NRD host's max_concurrent_requests.
+
+        Returns:
+            AsyncIterator[Any]: The records, in page order (use with `async for`).
+        """
+        return iter_pages(lambda page_number: self.get_all_test_data(page_number=page_number, order_by=order_by, count=page_size, sort_by=sort_by), page_size, self._prefetch(prefetch))
+
+    def iter_instrumentation_information(self, test_no: str, order_by: Optional[str] = None, sort_by: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE, prefetch: Optional[int] = None) -> AsyncIterator[Any]:
+        """
+        Streams every instrumentation record of a test, fetching the following pages ahead concurrently.
+
+        Args:
+            test_no (str): The test number.
+            order_by (Optional[str]): Field to order the results by.
+            sort_by (Optional[str]): Sort order ("ASC" or "DESC").
+            page_size (int): Number of rows requested per page.
+            prefetch (Optional[int]): Pages requested ahead. Defaults to the NRD host's max_concurrent_requests.
+
+        Returns:
+            AsyncIterator[Any]: The records, in page order (use with `async for`).
+        """
+        return iter_pages(lambda page_number: self.get_instrumentation_information(test_no, page_number=page_number, order_by=order_by, count=page_size, sort_by=sort_by), page_size, self._prefetch(prefetch))
+
+    def iter_search_test_data(self, page_size: int = DEFAULT_PAGE_SIZE, prefetch: Optional[int] = None, **filters: Any) -> AsyncIterator[Any]:
+        """
+        Streams every record matching a search_test_data query, fetching the following pages ahead concurrently.
+
+        Args:
+            page_size (int): Number of rows requested per page.
+            prefetch (Optional[int]): Pages requested ahead. Defaults to the NRD host's max_concurrent_requests.
+            **filters: Any search_test_data argument except page_number and count (e.g., vehicle_make, order_by).
+
+        Returns:
+            AsyncIterator[Any]: The records, in page order (use with `async for`).
+        """
+        return iter_pages(lambda page_number: self.search_test_data(page_number=page_number, count=page_size, **filters), page_size, self._prefetch(prefetch))
+
+    async def download_instrumentation_channels(self, test_no: str, directory: str, overwrite: bool = False) -> Dict[str, str]:
+        """
+        Downloads every instrumentation channel of a test (details fetched concurrently) into a memory-mappable
+        .npy signal file plus a .json curve index. Requires NumPy (`pip install nhtsa[numpy]`).
+        See lib.signals.download_test_channels for the file layout.
+
+        Args:
+            test_no (str): The test number.
+            directory (str): An existing directory for the channel files.
+            overwrite (bool): Download again even if the test's files already exist.
+
+        Returns:
+            Dict[str, str]: {"signals": path, "index": path}. The channels are also added to the attached
+                            signal store, if any.
+        """
+        paths = await download_test_channels(self, test_no, directory, overwrite)
+        if self.signal_store is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.signal_store.import_channel_files, paths["index"])
+        return paths
+
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import math
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PAGE_SIZE = 100
+
+
+def page_info(response: Any, page_size: int) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Reads the current page number and the total page count from the `meta.pagination` block of an NRD response.
+
+    Args:
+        response (Any): The parsed response (an APIResponse).
+        page_size (int): The `count` the page was requested with, used to derive the page count from a total row count.
+
+    Returns:
+        Tuple[Optional[int], Optional[int]]: (current page, total pages); either is None when the server did not say.
+    """
+    pagination = getattr(getattr(response, "meta", None), "pagination", None)
+    current_page = getattr(pagination, "current_page", None)
+    total_pages = getattr(pagination, "total_pages", None)
+    if total_pages is None and getattr(pagination, "total_count", None) is not None:
+        total_pages = math.ceil(pagination.total_count / page_size)
+    return current_page, total_pages
+
+
+async def iter_pages(fetch_page: Callable[[Optional[int]], Awaitable[Any]], page_size: int = DEFAULT_PAGE_SIZE, prefetch: int = 4) -> AsyncIterator[Any]:
+    """
+    Streams every record of a paginated NRD endpoint, in page order.
+    The first page is fetched on its own to learn the page count from its Pagination metadata; after that up to
+    `prefetch` pages are requested ahead concurrently (each request still goes through the client's NRD rate limiter
+    and concurrency budget). Without pagination metadata it walks the pages one by one until a short or empty page.
+
+    Args:
+        fetch_page (Callable[[Optional[int]], Awaitable[Any]]): Fetches one page by page number (None for the
+                                                                 server's first page), e.g. a bound API method.
+        page_size (int): The `count` every page is requested with.
+        prefetch (int): Pages requested ahead of the one being consumed.
+
+    Yields:
+        Any: The records (`results` entries) of every page.
+    """
+    first = await fetch_page(None)
+    records = first.results or []
+    for record in records:
+        yield record
+    current_page, total_pages = page_info(first, page_size)
+    # NRD pages are numbered from the page the server returns by default; assume 1 if it does not report it.
+    first_page = 1 if current_page is None else current_page
+
+    if total_pages is None:
+        logger.debug("No pagination metadata in the first page; paging until a short page.")
+        page_number = first_page
+        while len(records) >= page_size:
+            page_number += 1
+            records = (await fetch_page(page_number)).results or []
+            for record in records:
+                yield record
+        return
+
+    last_page = first_page + total_pages - 1
+    next_page = first_page + 1
+    pending: Deque[asyncio.Task] = deque()
+    try:
+        while pending or next_page <= last_page:
+            while next_page <= last_page and len(pending) < max(1, prefetch):
+                pending.append(asyncio.ensure_future(fetch_page(next_page)))
+                next_page += 1
+            for record in (await pending.popleft()).results or []:
+                yield record
+    finally:
+        # The caller stopped early or a page failed: don't leave orphaned requests running.
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """
+    Asynchronous token-bucket rate limiter.
+    Tokens refill continuously at `rate` per second up to `capacity`, so short bursts of up to `capacity`
+    requests go out immediately while the long-run rate never exceeds `rate`.
+    """
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        Initializes the TokenBucket.
+
+        Args:
+            rate (float): Tokens added per second (e.g., 100 requests/minute -> 100 / 60).
+            capacity (int): Maximum number of tokens that can accumulate, i.e. the burst size.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last_refill = time.monotonic()
+        self._lock = asyncio.Lock() # Protects _tokens and _last_refill. Never held while sleeping.
+
+    def _refill(self, now: float) -> None:
+        """
+        Adds the tokens accumulated since the last refill, capped at capacity.
+
+        Args:
+            now (float): The current time.monotonic() value.
+        """
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self) -> None:
+        """
+        Reserves one token, sleeping (outside the lock) until the reservation becomes valid.
+        Reservations may drive the balance negative; later callers then queue up behind earlier ones,
+        which keeps the ordering fair without holding the lock during the wait.
+        """
+        async with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    Token bucket whose rate adapts to server feedback (AIMD).
+    A throttling response (429/503) multiplies the rate by `decrease_factor` and pauses the bucket for the
+    server's Retry-After, while every successful response adds `increase_per_minute` back, up to the
+    configured ceiling. Long crawls therefore settle at the highest rate the server actually accepts.
+    """
+    def __init__(self, rate: float, capacity: int = 1, min_rate: Optional[float] = None, decrease_factor: float = 0.5, increase_per_minute: float = 1.0):
+        """
+        Initializes the AdaptiveTokenBucket.
+
+        Args:
+            rate (float): The ceiling rate in tokens per second. The bucket starts at this rate.
+            capacity (int): Maximum number of tokens that can accumulate, i.e. the burst size.
+            min_rate (Optional[float]): The floor rate in tokens per second. Defaults to 5% of the ceiling.
+            decrease_factor (float): Multiplier applied to the current rate when the server pushes back.
+            increase_per_minute (float): Requests per minute added back to the rate after each success.
+        """
+        super().__init__(rate, capacity)
+        self.max_rate = rate
+        self.min_rate = min_rate if min_rate is not None else rate * 0.05
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_per_minute / 60.0
+        self._blocked_until = 0.0
+        self._last_decrease = 0.0
+
+    @property
+    def requests_per_minute(self) -> float:
+        """
+        The current (adapted) rate expressed in requests per minute.
+        """
+        return self.rate * 60.0
+
+    async def acquire(self) -> None:
+        """
+        Reserves one token, additionally waiting out any Retry-After pause set by a throttling response.
+        """
+        await super().acquire()
+        pause = self._blocked_until - time.monotonic()
+        if pause > 0:
+            await asyncio.sleep(pause)
+
+    def record_success(self) -> None:
+        """
+        Additive increase: nudges the rate back toward the ceiling after a successful response.
+        """
+        self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def record_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Multiplicative decrease: cuts the rate after a 429/503 response, drains the bucket and honours Retry-After.
+        Several throttled responses from the same burst only cut the rate once.
+
+        Args:
+            retry_after (Optional[float]): Seconds the server asked us to wait, if it said so.
+        """
+        now = time.monotonic()
+        if now - self._last_decrease >= 1.0 / self.rate:
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._last_decrease = now
+            logger.warning(f"Server is throttling requests; reducing rate to {self.requests_per_minute:.1f} requests/minute.")
+        # Leftover burst tokens must not let the retries go straight out again: drain the bucket, and without a
+        # Retry-After wait at least one interval of the reduced rate.
+        self._refill(now)
+        self._tokens = min(self._tokens, 0.0)
+        self._blocked_until = max(self._blocked_until, now + (retry_after or 1.0 / self.rate))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a Retry-After header given either as delay-seconds or as an HTTP date.
+
+    Args:
+        value (Optional[str]): The raw header value.
+
+    Returns:
+        Optional[float]: The number of seconds to wait, or None if the header is missing or malformed.
+    """
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value.strip())
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        logger.warning(f"Could not parse Retry-After header: {value}", exc_info=True)
+        return None
+
+
+class HostBudget(BaseModel):
+    """
+    Rate limit and concurrency budget for a single upstream host (api, vpic, static or nrd).
+    """
+    requests_per_minute: int = Field(100, description="Maximum number of requests per minute sent to this host.")
+    max_concurrent_requests: int = Field(5, description="Maximum number of in-flight requests to this host.")
+    burst_size: int = Field(5, description="Number of requests that may be sent back-to-back (token-bucket capacity).")
@@ -0,0 +1,20 @@
+from typing import Any, Dict
+
+from pydantic import BaseModel
+
+
+def record_dict(record: Any) -> Dict[str, Any]:
+    """
+    Turns a result entry of an NRD response (a dict or a Pydantic model) into a new dict keyed by the API's field names.
+
+    Args:
+        record (Any): The entry. Anything else is wrapped as {"value": record}.
+
+    Returns:
+        Dict[str, Any]: The fields; the caller may modify it.
+    """
+    if isinstance(record, BaseModel):
+        return record.model_dump(by_alias=True)
+    if isinstance(record, dict):
+        return dict(record)
+    return {"value": record}
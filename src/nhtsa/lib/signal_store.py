@@ -0,0 +1,242 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from .signals import SIGNAL_DTYPE, require_numpy
+
+logger = logging.getLogger(__name__)
+
+
+class SignalStore:
+    """
+    Local, memory-mapped store for crash test channel data.
+    Every curve's (time, value) rows are appended to one contiguous float32 file (`signals.f32`) and an SQLite index
+    (`index.sqlite`) maps (database, test_no, curve_no) to the curve's row offset and length. Reads return views
+    into a read-only memory map, so thousands of channels can be sliced without loading or copying them.
+    Replacing a curve appends the new rows and repoints the index; the old rows stay in the file unused.
+    """
+    SIGNALS_FILE_NAME = "signals.f32"
+    INDEX_FILE_NAME = "index.sqlite"
+
+    def __init__(self, directory: str):
+        """
+        Initializes the SignalStore.
+
+        Args:
+            directory (str): Directory holding the signal file and its index. Must already exist.
+        """
+        self.directory = directory
+        self._signals_path = os.path.join(directory, self.SIGNALS_FILE_NAME)
+        self._lock = threading.Lock()
+        self._map = None
+        self._connection = sqlite3.connect(os.path.join(directory, self.INDEX_FILE_NAME), check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS curves (database TEXT NOT NULL, test_no TEXT NOT NULL, curve_no TEXT NOT NULL, "
+            "offset INTEGER NOT NULL, length INTEGER NOT NULL, PRIMARY KEY (database, test_no, curve_no))"
+        )
+
+    def _rows(self) -> "numpy.ndarray":
+        """Returns the whole signal file as a read-only (rows, 2) memory map, remapping it after it has grown."""
+        numpy = require_numpy()
+        size = os.path.getsize(self._signals_path) if os.path.exists(self._signals_path) else 0
+        rows = size // (2 * numpy.dtype(SIGNAL_DTYPE).itemsize)
+        if self._map is None or self._map.shape[0] != rows:
+            if rows == 0:
+                self._map = numpy.empty((0, 2), dtype=SIGNAL_DTYPE)
+            else:
+                self._map = numpy.memmap(self._signals_path, dtype=SIGNAL_DTYPE, mode="r", shape=(rows, 2))
+        return self._map
+
+    def put_test(self, database: str, test_no: str, curves: Dict[Any, Any]) -> None:
+        """
+        Stores the curves of one test: the rows are appended to the signal file and indexed in one transaction.
+
+        Args:
+            database (str): The NRD database ("vehicle", "biomechanics", "component", "cadb").
+            test_no (str): The test number (the test ID for the crash avoidance database).
+            curves (Dict[Any, Any]): Curve number -> (samples, 2) array-like of (time, value) rows.
+        """
+        numpy = require_numpy()
+        with self._lock:
+            entries: List[Tuple[str, str, str, int, int]] = []
+            row_bytes = 2 * numpy.dtype(SIGNAL_DTYPE).itemsize
+            with open(self._signals_path, "ab") as f:
+                # A crash mid-write can leave a partial row at the end; dropping it keeps every offset on a row boundary.
+                offset = os.fstat(f.fileno()).st_size // row_bytes
+                f.truncate(offset * row_bytes)
+                for curve_no, samples in curves.items():
+                    rows = numpy.ascontiguousarray(samples, dtype=SIGNAL_DTYPE).reshape(-1, 2)
+                    rows.tofile(f)
+                    entries.append((database, str(test_no), str(curve_no), offset, len(rows)))
+                    offset += len(rows)
+                f.flush()
+                os.fsync(f.fileno())
+            # Rows are durable before the index points at them; a crash in between only leaves unused rows behind.
+            self._connection.execute("BEGIN")
+            self._connection.executemany("INSERT OR REPLACE INTO curves VALUES (?, ?, ?, ?, ?)", entries)
+            self._connection.execute("COMMIT")
+        logger.debug(f"Stored {len(entries)} curves of {database} test {test_no} in {self.directory}")
+
+    def put(self, database: str, test_no: str, curve_no: Any, samples: Any) -> None:
+        """
+        Stores one curve.
+
+        Args:
+            database (str): The NRD database.
+            test_no (str): The test number.
+            curve_no (Any): The curve number.
+            samples (Any): (samples, 2) array-like of (time, value) rows.
+        """
+        self.put_test(database, test_no, {curve_no: samples})
+
+    def get(self, database: str, test_no: str, curve_no: Any) -> Optional["numpy.ndarray"]:
+        """
+        Returns one curve as a read-only (samples, 2) float32 view into the memory map.
+
+        Args:
+            database (str): The NRD database.
+            test_no (str): The test number.
+            curve_no (Any): The curve number.
+
+        Returns:
+            Optional[numpy.ndarray]: The (time, value) rows, or None if the curve is not stored.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT offset, length FROM curves WHERE database = ? AND test_no = ? AND curve_no = ?", (database, str(test_no), str(curve_no))
+            ).fetchone()
+            if row is None:
+                return None
+            return self._rows()[row[0]:row[0] + row[1]]
+
+    def get_test(self, database: str, test_no: str) -> Dict[str, "numpy.ndarray"]:
+        """
+        Returns every stored curve of a test as read-only views into the memory map.
+
+        Args:
+            database (str): The NRD database.
+            test_no (str): The test number.
+
+        Returns:
+            Dict[str, numpy.ndarray]: Curve number -> (time, value) rows; empty if the test is not stored.
+        """
+        with self._lock:
+            entries = self._connection.execute(
+                "SELECT curve_no, offset, length FROM curves WHERE database = ? AND test_no = ? ORDER BY offset", (database, str(test_no))
+            ).fetchall()
+            rows = self._rows()
+            return {curve_no: rows[offset:offset + length] for curve_no, offset, length in entries}
+
+    def keys(self, database: Optional[str] = None, test_no: Optional[str] = None) -> List[Tuple[str, str, str]]:
+        """
+        Lists the stored (database, test_no, curve_no) keys, optionally for one database and test.
+
+        Args:
+            database (Optional[str]): Only keys of this database.
+            test_no (Optional[str]): Only keys of this test.
+
+        Returns:
+            List[Tuple[str, str, str]]: The keys.
+        """
+        query, params = "SELECT database, test_no, curve_no FROM curves WHERE 1 = 1", []
+        if database is not None:
+            query += " AND database = ?"
+            params.append(database)
+        if test_no is not None:
+            query += " AND test_no = ?"
+            params.append(str(test_no))
+        with self._lock:
+            return [tuple(row) for row in self._connection.execute(query, params)]
+
+    def import_channel_files(self, index_path: str) -> int:
+        """
+        Imports a test downloaded with lib.signals.download_test_channels (its .json index and .npy signal file).
+
+        Args:
+            index_path (str): Path of the test's .json index.
+
+        Returns:
+            int: The number of curves imported.
+        """
+        numpy = require_numpy()
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        signals = numpy.load(os.path.splitext(index_path)[0] + ".npy", mmap_mode="r")
+        curves = {curve_no: signals[entry["offset"]:entry["offset"] + entry["length"]] for curve_no, entry in index["curves"].items()}
+        self.put_test(index["database"], index["test_no"], curves)
+        return len(curves)
+
+    def close(self) -> None:
+        """
+        Closes the index and drops the memory map.
+        """
+        with self._lock:
+            self._map = None
+            self._connection.close()
+
+
+class SignalStoreMixin:
+    """
+    Local read path for the NRD database APIs: once a SignalStore is attached, downloaded curves are kept in it and
+    can be read back (memory-mapped) without a network call. The database key is the last segment of `base_path`.
+    """
+    base_path: str
+    signal_store: Optional[SignalStore] = None
+
+    @property
+    def database(self) -> str:
+        """The database key used in the signal store ("vehicle", "biomechanics", "component" or "cadb")."""
+        return self.base_path.rstrip("/").rsplit("/", 1)[-1]
+
+    def attach_signal_store(self, store: SignalStore) -> SignalStore:
+        """
+        Attaches a signal store; curves downloaded through this API are written to it from now on.
+
+        Args:
+            store (SignalStore): The store (it can be shared by all NRD APIs).
+
+        Returns:
+            SignalStore: The store, also kept on `self.signal_store`.
+        """
+        self.signal_store = store
+        return store
+
+    def _require_signal_store(self) -> SignalStore:
+        if self.signal_store is None:
+            raise RuntimeError("No signal store attached; call attach_signal_store(SignalStore(directory)) first.")
+        return self.signal_store
+
+    def get_stored_curve(self, test_no: str, curve_no: Any) -> Optional["numpy.ndarray"]:
+        """
+        Reads one curve from the attached signal store, without a network call.
+
+        Args:
+            test_no (str): The test number.
+            curve_no (Any): The curve number.
+
+        Returns:
+            Optional[numpy.ndarray]: A read-only (samples, 2) float32 view of (time, value) rows, or None if not stored.
+
+        Raises:
+            RuntimeError: If no signal store is attached.
+        """
+        return self._require_signal_store().get(self.database, test_no, curve_no)
+
+    def get_stored_curves(self, test_no: str) -> Dict[str, "numpy.ndarray"]:
+        """
+        Reads every stored curve of a test from the attached signal store, without a network call.
+
+        Args:
+            test_no (str): The test number.
+
+        Returns:
+            Dict[str, numpy.ndarray]: Curve number -> read-only (time, value) view.
+
+        Raises:
+            RuntimeError: If no signal store is attached.
+        """
+        return self._require_signal_store().get_test(self.database, test_no)
@@ -0,0 +1,215 @@
+import asyncio
+import json
+import logging
+import os
+import warnings
+from typing import Any, Dict, List, Optional, Sequence
+
+import aiofiles
+
+from .records import record_dict
+
+logger = logging.getLogger(__name__)
+
+# Curve strings separate numbers with commas, semicolons, whitespace or JSON brackets;
+# all of them are mapped to spaces so NumPy's C text parser can read the string in one pass.
+_SEPARATORS = str.maketrans({char: " " for char in ",;[](){}\t\r\n\"'"})
+
+# Field names the NRD uses in instrumentation records; the first one present wins.
+CURVE_NO_FIELDS = ("curveNo", "curveno", "curve_no", "curveNumber")
+SIGNAL_FIELDS = ("curveData", "curvedata", "data", "signalData", "values")
+TIME_FIELDS = ("time", "timeValue", "x")
+VALUE_FIELDS = ("value", "dataValue", "y")
+
+# Channel files hold (time, value) rows in float32: half the size of float64 and plenty for sensor data.
+SIGNAL_DTYPE = "float32"
+
+
+def require_numpy():
+    """
+    Imports NumPy lazily; it is an optional dependency (`pip install nhtsa[numpy]`).
+    """
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("Curve arrays require NumPy. Install it with `pip install nhtsa[numpy]` or `pip install numpy`.") from e
+    return numpy
+
+
+def parse_curve(curve_data: Optional[str], columns: int = 2) -> "numpy.ndarray":
+    """
+    Parses a curve string straight into a float64 array, without building intermediate Python lists.
+
+    Args:
+        curve_data (Optional[str]): The curve string, e.g. "0.0,1.2;0.001,1.3;..." or "[[0.0, 1.2], ...]".
+        columns (int): Numbers per sample: 2 for (time, value) pairs, 1 for bare values.
+
+    Returns:
+        numpy.ndarray: A (samples, columns) array; empty (0, columns) for a missing or empty curve.
+
+    Raises:
+        ValueError: If the string holds something other than numbers, or a number count not divisible by `columns`.
+    """
+    numpy = require_numpy()
+    if not curve_data:
+        return numpy.empty((0, columns))
+    with warnings.catch_warnings():
+        # Older NumPy versions only warn (and return what they read so far) when the text has garbage in it.
+        warnings.simplefilter("error", DeprecationWarning)
+        try:
+            values = numpy.fromstring(curve_data.translate(_SEPARATORS), dtype=numpy.float64, sep=" ")
+        except (ValueError, DeprecationWarning) as e:
+            raise ValueError(f"Curve data is not a list of numbers: {curve_data[:80]!r}") from e
+    if values.size % columns:
+        raise ValueError(f"Curve data holds {values.size} numbers, which is not a multiple of {columns}.")
+    return values.reshape(-1, columns)
+
+
+def _first_field(record: Dict[str, Any], names: Sequence[str]) -> Optional[str]:
+    return next((name for name in names if record.get(name) is not None), None)
+
+
+def signal_from_records(records: Sequence[Any]) -> "numpy.ndarray":
+    """
+    Extracts the (time, value) samples of a channel from the records of an instrumentation detail response.
+    The samples are either a curve string or a list of pairs in a signal field of the record (see SIGNAL_FIELDS),
+    or one record per sample with time and value fields.
+
+    Args:
+        records (Sequence[Any]): The `results` of get_instrumentation_detail_information.
+
+    Returns:
+        numpy.ndarray: A (samples, 2) float64 array.
+
+    Raises:
+        ValueError: If the records hold no recognizable signal.
+    """
+    numpy = require_numpy()
+    rows = [record_dict(record) for record in records]
+    for row in rows:
+        field = _first_field(row, SIGNAL_FIELDS)
+        if field is None:
+            continue
+        signal = row[field]
+        if isinstance(signal, str):
+            return parse_curve(signal, columns=2)
+        return numpy.asarray(signal, dtype=numpy.float64).reshape(-1, 2)
+    time_field = _first_field(rows[0], TIME_FIELDS) if rows else None
+    value_field = _first_field(rows[0], VALUE_FIELDS) if rows else None
+    if time_field and value_field:
+        samples = numpy.empty((len(rows), 2))
+        samples[:, 0] = numpy.fromiter((row[time_field] for row in rows), dtype=numpy.float64, count=len(rows))
+        samples[:, 1] = numpy.fromiter((row[value_field] for row in rows), dtype=numpy.float64, count=len(rows))
+        return samples
+    raise ValueError("The instrumentation detail holds no signal data.")
+
+
+def channel_file_paths(directory: str, database: str, test_no: str) -> Dict[str, str]:
+    """
+    Returns the paths of a test's channel files: "signals" (.npy) and "index" (.json).
+
+    Args:
+        directory (str): The channel directory.
+        database (str): The NRD database ("vehicle", "biomechanics", "component", ...).
+        test_no (str): The test number.
+
+    Returns:
+        Dict[str, str]: {"signals": path, "index": path}.
+    """
+    stem = os.path.join(directory, f"{database}_{test_no}")
+    return {"signals": stem + ".npy", "index": stem + ".json"}
+
+
+def _write_signals(path: str, signals: List["numpy.ndarray"]) -> None:
+    numpy = require_numpy()
+    # Written next to the target and renamed, so a crash never leaves a truncated file under the final name.
+    partial_path = path + ".part"
+    with open(partial_path, "wb") as f:
+        numpy.save(f, numpy.concatenate(signals).astype(SIGNAL_DTYPE) if signals else numpy.empty((0, 2), dtype=SIGNAL_DTYPE))
+    os.replace(partial_path, path)
+
+
+async def download_test_channels(api: Any, test_no: str, directory: str, overwrite: bool = False) -> Dict[str, str]:
+    """
+    Downloads every instrumentation channel of an NRD test into two files:
+    `<database>_<test_no>.npy`, one (samples, 2) float32 array of all channels' (time, value) rows back to back
+    (open it with numpy.load(path, mmap_mode="r") to slice channels without reading the file), and
+    `<database>_<test_no>.json`, the index mapping each curve number to its row offset, length and
+    instrumentation record. Curves are enumerated with iter_instrumentation_information and their details are
+    fetched with client.bulk, bounded by the NRD concurrency budget; curves whose request fails are logged and left
+    out of the index.
+
+    Args:
+        api (Any): A VehicleCrashTestDatabaseAPI, BiomechanicsTestDatabaseAPI or ComponentTestDatabaseAPI.
+        test_no (str): The test number.
+        directory (str): An existing directory for the channel files.
+        overwrite (bool): Download again even if the test's files already exist.
+
+    Returns:
+        Dict[str, str]: {"signals": path, "index": path}.
+    """
+    database = api.base_path.rstrip("/").rsplit("/", 1)[-1]
+    paths = channel_file_paths(directory, database, str(test_no))
+    if not overwrite and os.path.exists(paths["index"]) and os.path.exists(paths["signals"]):
+        logger.info(f"Channels of {database} test {test_no} are already downloaded to {paths['signals']}")
+        return paths
+
+    curves = []
+    async for record in api.iter_instrumentation_information(test_no):
+        record = record_dict(record)
+        field = _first_field(record, CURVE_NO_FIELDS)
+        if field is not None:
+            curves.append((record[field], record))
+    logger.info(f"Downloading {len(curves)} channels of {database} test {test_no}")
+
+    loop = asyncio.get_running_loop()
+    index: Dict[str, Any] = {"database": database, "test_no": str(test_no), "dtype": SIGNAL_DTYPE, "columns": ["time", "value"], "curves": {}}
+    signals = []
+    offset = 0
+    details = api.client.bulk(
+        api.get_instrumentation_detail_information, [(curve_no, test_no) for curve_no, _ in curves], max_concurrency=api.client.host_budgets["nrd"].max_concurrent_requests
+    )
+    async for result in details:
+        curve_no, record = curves[result.index]
+        if not result.ok:
+            logger.warning(f"Skipping curve {curve_no} of {database} test {test_no}: {result.error}")
+            continue
+        try:
+            # Parsing long curve strings is CPU work, so it runs in the default executor to keep the event loop free.
+            signal = await loop.run_in_executor(None, signal_from_records, result.value.results or [])
+        except ValueError as e:
+            logger.warning(f"Skipping curve {curve_no} of {database} test {test_no}: {e}")
+            continue
+        index["curves"][str(curve_no)] = {"offset": offset, "length": len(signal), "info": record}
+        signals.append(signal)
+        offset += len(signal)
+
+    # The index is written last (and replaced atomically): a test whose index exists has a complete signal file.
+    if os.path.exists(paths["index"]):
+        os.remove(paths["index"])
+    await loop.run_in_executor(None, _write_signals, paths["signals"], signals)
+    async with aiofiles.open(paths["index"] + ".part", "w", encoding="utf-8") as f:
+        await f.write(json.dumps(index, default=str))
+    os.replace(paths["index"] + ".part", paths["index"])
+    logger.info(f"Saved {len(signals)} channels ({offset} samples) of {database} test {test_no} to {paths['signals']}")
+    return paths
+
+
+def load_test_channels(directory: str, database: str, test_no: str) -> Dict[str, "numpy.ndarray"]:
+    """
+    Opens a test's channel files memory-mapped and returns one (samples, 2) view per curve number.
+
+    Args:
+        directory (str): The channel directory.
+        database (str): The NRD database ("vehicle", "biomechanics", "component", ...).
+        test_no (str): The test number.
+
+    Returns:
+        Dict[str, numpy.ndarray]: Curve number -> read-only (time, value) view; nothing is read until sliced.
+    """
+    numpy = require_numpy()
+    paths = channel_file_paths(directory, database, str(test_no))
+    with open(paths["index"], "r", encoding="utf-8") as f:
+        index = json.load(f)
+    signals = numpy.load(paths["signals"], mmap_mode="r")
+    return {curve_no: signals[entry["offset"]:entry["offset"] + entry["length"]] for curve_no, entry in index["curves"].items()}
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Only idempotent methods are coalesced: sharing one answer between identical reads is always safe.
+SINGLE_FLIGHT_METHODS = ("GET", "HEAD")
+
+
+def share_json(response: httpx.Response) -> httpx.Response:
+    """
+    Makes `response.json()` decode the body once and hand every caller the same object.
+    Used on responses shared between coalesced callers, so N identical requests cost one parse instead of N.
+
+    Args:
+        response (httpx.Response): The response.
+
+    Returns:
+        httpx.Response: The same response.
+    """
+    if getattr(response, "_shared_json", False):
+        return response
+    decoded = []
+
+    def json_once(**kwargs: Any) -> Any:
+        if kwargs:
+            return json.loads(response.content, **kwargs)
+        if not decoded:
+            decoded.append(json.loads(response.content))
+        return decoded[0]
+
+    response.json = json_once
+    response._shared_json = True
+    return response
+
+
+class SingleFlight:
+    """
+    Request coalescing: concurrent calls with the same key share one in-flight call and its result.
+    The first caller starts the call as a task; callers arriving while it runs wait for the same task instead of
+    starting their own. Once it finishes the key is released, so later calls run again (caching is the
+    ResponseCache's job, not this one's). The task is only cancelled when every caller waiting on it has been.
+    """
+    def __init__(self):
+        """
+        Initializes the SingleFlight.
+        """
+        self._flights: Dict[str, Tuple[asyncio.Task, list]] = {} # key -> (task, [number of waiting callers])
+        self.calls = 0
+        self.shared = 0
+
+    @property
+    def in_flight(self) -> int:
+        """The number of distinct calls currently running."""
+        return len(self._flights)
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs `call` once for all concurrent callers of `key` and returns its result (or raises its error) to each.
+
+        Args:
+            key (str): Identifies identical calls, e.g. ResponseCache.make_key(host, method, path, **kwargs).
+            call (Callable[[], Awaitable[Any]]): Starts the call; only invoked by the first caller of a flight.
+
+        Returns:
+            Any: The call's result, the same object for every caller of the flight.
+        """
+        self.calls += 1
+        flight = self._flights.get(key)
+        if flight is None:
+            task = asyncio.ensure_future(call())
+            flight = self._flights[key] = (task, [0])
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        else:
+            self.shared += 1
+            logger.debug(f"Joining in-flight call {key[:12]} ({flight[1][0]} callers waiting)")
+        task, waiting = flight
+        waiting[0] += 1
+        try:
+            # shield: one caller giving up must not cancel the call the others are waiting for.
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if waiting[0] == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            waiting[0] -= 1
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Model years whose makes, models and per-vehicle data are re-fetched on every refresh (the newest ones still change).
+DEFAULT_RECENT_YEARS = 2
+
+_TREE_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS model_years (model_year TEXT PRIMARY KEY, makes_crawled_at REAL)",
+    "CREATE TABLE IF NOT EXISTS makes (model_year TEXT NOT NULL, make TEXT NOT NULL, models_crawled_at REAL, PRIMARY KEY (model_year, make))",
+    "CREATE TABLE IF NOT EXISTS vehicles (model_year TEXT NOT NULL, make TEXT NOT NULL, model TEXT NOT NULL, fetched_at REAL, content_hash TEXT, "
+    "PRIMARY KEY (model_year, make, model))",
+)
+
+
+def _year_order(model_year: str) -> int:
+    return int(model_year) if model_year.isdigit() else -1
+
+
+class VehicleTreeIndex:
+    """
+    Base for local SQLite indexes built by walking an issue type's model years -> makes -> models
+    (RecallsAPI and ComplaintsAPI list them with the same three methods).
+    The tree is stored once in `model_years`, `makes` and `vehicles`; later refreshes only walk model years that are
+    new, were not finished, or are among the `recent_years` newest. Each level is fetched concurrently with
+    client.bulk and every parent is marked as walked in the same transaction as its children, so an interrupted
+    walk continues where it stopped. Subclasses add their own tables with `schema` and fill `vehicles.fetched_at`.
+    """
+    def __init__(self, api: Any, database_path: str, schema: Sequence[str] = ()):
+        """
+        Initializes the VehicleTreeIndex.
+
+        Args:
+            api (Any): The API whose get_all_model_years, get_all_makes_for_model_year and
+                       get_all_models_for_make_and_model_year walk the tree.
+            database_path (str): Path of the SQLite file (created if missing).
+            schema (Sequence[str]): CREATE statements of the subclass's tables.
+        """
+        self.api = api
+        self.database_path = database_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(database_path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        for statement in (*_TREE_SCHEMA, *schema):
+            self._connection.execute(statement)
+
+    async def _run(self, function, *args):
+        # SQLite calls are blocking, so they run in the default executor to keep the event loop free.
+        return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+
+    def _query_sync(self, query: str, params: Tuple = ()) -> List[Tuple]:
+        with self._lock:
+            return self._connection.execute(query, params).fetchall()
+
+    async def _query(self, query: str, params: Tuple = ()) -> List[Tuple]:
+        return await self._run(self._query_sync, query, params)
+
+    def _executemany_sync(self, query: str, rows: List[Tuple]) -> None:
+        with self._lock:
+            self._connection.execute("BEGIN")
+            self._connection.executemany(query, rows)
+            self._connection.execute("COMMIT")
+
+    @staticmethod
+    def _recent_years(model_years: List[str], recent_years: int) -> Set[str]:
+        return set(sorted(model_years, key=_year_order, reverse=True)[:recent_years])
+
+    async def recent_model_years(self, recent_years: int = DEFAULT_RECENT_YEARS) -> Set[str]:
+        """
+        Returns the `recent_years` newest model years of the stored tree.
+
+        Args:
+            recent_years (int): How many.
+
+        Returns:
+            Set[str]: The model years.
+        """
+        return self._recent_years([row[0] for row in await self._query("SELECT model_year FROM model_years")], recent_years)
+
+    def _store_children_sync(self, parent_table: str, parent_key: Dict[str, str], child_table: str, children: List[Dict[str, str]], crawled_column: str) -> None:
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                for child in children:
+                    names = list(child)
+                    self._connection.execute(
+                        f"INSERT OR IGNORE INTO {child_table} ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})", [child[name] for name in names]
+                    )
+                where = " AND ".join(f"{name} = ?" for name in parent_key)
+                self._connection.execute(f"UPDATE {parent_table} SET {crawled_column} = ? WHERE {where}", (time.time(), *parent_key.values()))
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    async def refresh_tree(self, recent_years: int = DEFAULT_RECENT_YEARS, progress_callback: Optional[Callable[[int, Optional[int]], None]] = None, only_recent: bool = False) -> Dict[str, int]:
+        """
+        Updates the model year / make / model tree. Makes are only listed for model years that were never walked (or
+        whose walk did not finish) and for the `recent_years` newest; likewise models for makes.
+
+        Args:
+            recent_years (int): Number of newest model years that are always walked again.
+            progress_callback (Optional[Callable[[int, Optional[int]], None]]): Passed to client.bulk for each level.
+            only_recent (bool): Only walk the `recent_years` newest model years, e.g. when the rest comes from a
+                                flat file. The other model years are still listed, so a later full walk finds them.
+
+        Returns:
+            Dict[str, int]: Counts of "model_years", "makes" and "models" requests made and "failed" ones.
+        """
+        stats = {"model_years": 1, "makes": 0, "models": 0, "failed": 0}
+        model_years = [result.model_year for result in (await self.api.get_all_model_years()).results]
+        await self._run(self._executemany_sync, "INSERT OR IGNORE INTO model_years (model_year) VALUES (?)", [(year,) for year in model_years])
+        recent = self._recent_years(model_years, recent_years)
+
+        pending_years = [
+            year for year, crawled_at in await self._query("SELECT model_year, makes_crawled_at FROM model_years")
+            if year in recent or (crawled_at is None and not only_recent)
+        ]
+        async for result in self.api.client.bulk(self.api.get_all_makes_for_model_year, pending_years, ordered=False, progress_callback=progress_callback):
+            stats["makes"] += 1
+            if not result.ok:
+                stats["failed"] += 1
+                continue
+            makes = [{"model_year": result.input, "make": make.make} for make in result.value.results]
+            await self._run(self._store_children_sync, "model_years", {"model_year": result.input}, "makes", makes, "makes_crawled_at")
+
+        pending_makes = [
+            (year, make) for year, make, crawled_at in await self._query("SELECT model_year, make, models_crawled_at FROM makes")
+            if year in recent or (crawled_at is None and not only_recent)
+        ]
+        async for result in self.api.client.bulk(self.api.get_all_models_for_make_and_model_year, pending_makes, ordered=False, progress_callback=progress_callback):
+            stats["models"] += 1
+            if not result.ok:
+                stats["failed"] += 1
+                continue
+            year, make = result.input
+            models = [{"model_year": year, "make": make, "model": model.model} for model in result.value.results]
+            await self._run(self._store_children_sync, "makes", {"model_year": year, "make": make}, "vehicles", models, "models_crawled_at")
+        logger.info(f"Vehicle tree of {self.database_path} refreshed: {stats}")
+        return stats
+
+    async def vehicles_to_fetch(self, recent_years: int = DEFAULT_RECENT_YEARS, max_age: Optional[float] = None, only_recent: bool = False) -> List[Tuple[str, str, str]]:
+        """
+        Lists the vehicles whose data should be fetched: those never fetched, those of the `recent_years` newest
+        model years, and (with `max_age`) those last fetched longer ago than that.
+
+        Args:
+            recent_years (int): Number of newest model years that are always fetched again.
+            max_age (Optional[float]): Also list vehicles last fetched more than this many seconds ago.
+            only_recent (bool): Only list vehicles of the recent model years, fetched or not.
+
+        Returns:
+            List[Tuple[str, str, str]]: (model_year, make, model) tuples.
+        """
+        recent = await self.recent_model_years(recent_years)
+        stale_before = None if max_age is None else time.time() - max_age
+        return [
+            (year, make, model) for year, make, model, fetched_at in await self._query("SELECT model_year, make, model, fetched_at FROM vehicles")
+            if year in recent or (not only_recent and (fetched_at is None or (stale_before is not None and fetched_at < stale_before)))
+        ]
+
+    def close(self) -> None:
+        """
+        Closes the underlying SQLite connection.
+        """
+        self._connection.close()
@@ -0,0 +1,64 @@
+import asyncio
+import gzip
+import json
+import sqlite3
+
+import httpx
+import pytest
+
+from nhtsa.lib.cache import MemoryCache, SQLiteCache
+
+PAYLOAD = {"Count": 1, "Results": [{"Make_Name": "HONDA"}]}
+
+
+async def _gzip_response() -> httpx.Response:
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = gzip.compress(json.dumps(PAYLOAD).encode("utf-8"))
+        return httpx.Response(200, headers={"Content-Encoding": "gzip", "Content-Type": "application/json"}, content=body)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        return await client.get("https://vpic.nhtsa.dot.gov/api/vehicles/GetAllMakes?format=json")
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryCache()
+    else:
+        cache = SQLiteCache(str(tmp_path / "cache.sqlite"))
+        yield cache
+        cache.close()
+
+
+def test_gzip_response_round_trip(cache):
+    async def run():
+        response = await _gzip_response()
+        assert response.headers["content-encoding"] == "gzip"
+        await cache.set("key", response, 60)
+        cached = await cache.get("key")
+        assert cached.status_code == 200
+        assert "content-encoding" not in cached.headers
+        assert cached.headers["content-type"] == "application/json"
+        assert cached.json() == PAYLOAD
+
+    asyncio.run(run())
+
+
+def test_expired_entry_is_missing(cache):
+    async def run():
+        await cache.set("key", await _gzip_response(), -1)
+        assert await cache.get("key") is None
+
+    asyncio.run(run())
+
+
+def test_sqlite_cache_keeps_other_tables(tmp_path):
+    path = str(tmp_path / "shared.sqlite")
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE response_cache (key TEXT)")
+    connection.commit()
+    connection.close()
+    SQLiteCache(path).close()
+    connection = sqlite3.connect(path)
+    assert connection.execute("SELECT name FROM sqlite_master WHERE name = 'response_cache'").fetchone() is not None
+    connection.close()
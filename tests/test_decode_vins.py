@@ -0,0 +1,96 @@
+import asyncio
+import gc
+import logging
+import types
+
+import httpx
+import pytest
+
+from nhtsa.api.vin_decoding.index import VinDecodingAPI
+from nhtsa.api.vin_decoding.models import DecodeVinBatchEntry, DecodeVinBatchResult
+from nhtsa.api.vin_decoding.validation import CHECK_DIGIT_WEIGHTS, TRANSLITERATION
+
+
+def _vin(prefix: str, serial: int) -> str:
+    """Builds a VIN with a valid check digit from an 8 character prefix, model year A, plant B and a serial."""
+    vin = f"{prefix}0AB{serial:06d}"
+    remainder = sum(TRANSLITERATION[char] * weight for char, weight in zip(vin, CHECK_DIGIT_WEIGHTS)) % 11
+    return vin[:8] + ("X" if remainder == 10 else str(remainder)) + vin[9:]
+
+
+def _api(decode_vin_batch) -> VinDecodingAPI:
+    client = types.SimpleNamespace(host_budgets={"vpic": types.SimpleNamespace(max_concurrent_requests=4)})
+    api = VinDecodingAPI(client)
+    api.decode_vin_batch = decode_vin_batch
+    return api
+
+
+async def _echo(data: str) -> DecodeVinBatchResult:
+    await asyncio.sleep(0)
+    return DecodeVinBatchResult.model_construct(results=[DecodeVinBatchEntry.model_construct(vin=item.split(",")[0]) for item in data.split(";")])
+
+
+async def _fail(data: str) -> DecodeVinBatchResult:
+    await asyncio.sleep(0)
+    raise httpx.RequestError("boom")
+
+
+async def _collect(api: VinDecodingAPI, vins, **options):
+    return [entry.vin async for entry in api.decode_vins([(vin, None) for vin in vins], **options)]
+
+
+@pytest.fixture
+def unretrieved(caplog):
+    """Collects asyncio's "exception was never retrieved" reports."""
+    caplog.set_level(logging.ERROR, logger="asyncio")
+    yield lambda: (gc.collect(), [record for record in caplog.records if "never retrieved" in record.getMessage()])[1]
+
+
+def test_decodes_in_input_order():
+    vins = [_vin("1HGCM826", serial) for serial in range(120)]
+    assert asyncio.run(_collect(_api(_echo), vins, chunk_size=7)) == vins
+
+
+def test_short_answer_raises():
+    async def short(data: str) -> DecodeVinBatchResult:
+        return DecodeVinBatchResult.model_construct(results=[])
+
+    with pytest.raises(ValueError, match="returned 0 rows"):
+        asyncio.run(_collect(_api(short), [_vin("1HGCM826", 1)]))
+
+
+def test_failed_chunk_fails_shared_decodes(unretrieved):
+    # The second and third VINs share the first one's decode (same descriptor); chunk_size=1 puts them in later chunks.
+    vins = [_vin("1HGCM826", 1), _vin("1HGCM826", 2), _vin("1HGCM826", 3), _vin("2T1BU4EE", 4)]
+    with pytest.raises(httpx.RequestError):
+        asyncio.run(asyncio.wait_for(_collect(_api(_fail), vins, chunk_size=1, dedupe=True, max_attempts=1), 5))
+    assert unretrieved() == []
+
+
+def test_failed_chunk_of_unique_vins_leaves_no_unretrieved_futures(unretrieved):
+    vins = [_vin(prefix, 1) for prefix in ("1HGCM826", "2T1BU4EE", "JN1AZ4EH", "WVWZZZ1K")]
+    with pytest.raises(httpx.RequestError):
+        asyncio.run(_collect(_api(_fail), vins, chunk_size=2, dedupe=True, max_attempts=1))
+    assert unretrieved() == []
+
+
+def test_stopping_early_cancels_shared_decodes(unretrieved):
+    async def run():
+        vins = [_vin("1HGCM826", serial) for serial in range(50)] + [_vin("2T1BU4EE", serial) for serial in range(50)]
+        decoded = []
+        async for entry in _api(_echo).decode_vins([(vin, None) for vin in vins], chunk_size=1, dedupe=True):
+            decoded.append(entry.vin)
+            if len(decoded) == 3:
+                break
+        return decoded
+
+    assert len(asyncio.run(run())) == 3
+    assert unretrieved() == []
+
+
+def test_check_digit_can_be_skipped():
+    # A European VIN: position 9 is not a check digit, so it rarely matches the North American formula.
+    vin = "WVWZZZ1KZAB000001"
+    rejected = asyncio.run(_api(_echo).decode_vins([(vin, None)], validate=True).__anext__())
+    assert rejected.error_code == "1"
+    assert asyncio.run(_collect(_api(_echo), [vin], validate=True, check_digit=False)) == [vin]
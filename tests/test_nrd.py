@@ -0,0 +1,61 @@
+import asyncio
+import types
+
+from nhtsa.lib.nrd import NrdDatabaseMixin
+
+
+def _page(records, page_number, total_count, page_size):
+    pagination = types.SimpleNamespace(current_page=page_number, total_pages=None, total_count=total_count)
+    return types.SimpleNamespace(results=records[(page_number - 1) * page_size:page_number * page_size], meta=types.SimpleNamespace(pagination=pagination))
+
+
+class FakeDatabaseAPI(NrdDatabaseMixin):
+    """Serves 250 tests and 45 channels per test from memory, recording every page request."""
+    def __init__(self):
+        self.client = types.SimpleNamespace(host_budgets={"nrd": types.SimpleNamespace(max_concurrent_requests=3)})
+        self.tests = [{"testNo": number} for number in range(1, 251)]
+        self.calls = []
+
+    async def get_all_test_data(self, page_number=None, order_by=None, count=20, sort_by=None):
+        self.calls.append(("tests", page_number, order_by, sort_by))
+        return _page(self.tests, page_number or 1, len(self.tests), count)
+
+    async def get_instrumentation_information(self, test_no, page_number=None, order_by=None, count=20, sort_by=None):
+        self.calls.append(("instrumentation", test_no, page_number))
+        return _page([{"curveNo": number} for number in range(1, 46)], page_number or 1, 45, count)
+
+    async def search_test_data(self, page_number=None, count=20, **filters):
+        self.calls.append(("search", page_number, filters))
+        matches = [test for test in self.tests if test["testNo"] % filters["every"] == 0]
+        return _page(matches, page_number or 1, len(matches), count)
+
+
+async def _collect(records):
+    return [record async for record in records]
+
+
+def test_iter_all_test_data():
+    api = FakeDatabaseAPI()
+    records = asyncio.run(_collect(api.iter_all_test_data(order_by="testNo", sort_by="ASC", page_size=100)))
+    assert records == api.tests
+    assert api.calls == [("tests", None, "testNo", "ASC"), ("tests", 2, "testNo", "ASC"), ("tests", 3, "testNo", "ASC")]
+
+
+def test_iter_instrumentation_information():
+    api = FakeDatabaseAPI()
+    records = asyncio.run(_collect(api.iter_instrumentation_information("77", page_size=20)))
+    assert [record["curveNo"] for record in records] == list(range(1, 46))
+    assert {call[1] for call in api.calls} == {"77"}
+
+
+def test_iter_search_test_data():
+    api = FakeDatabaseAPI()
+    records = asyncio.run(_collect(api.iter_search_test_data(page_size=10, every=7)))
+    assert [record["testNo"] for record in records] == list(range(7, 251, 7))
+    assert all(call[2] == {"every": 7} for call in api.calls)
+
+
+def test_prefetch_defaults_to_the_nrd_budget():
+    api = FakeDatabaseAPI()
+    assert api._prefetch(None) == 3
+    assert api._prefetch(1) == 1
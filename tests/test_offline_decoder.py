@@ -0,0 +1,56 @@
+import json
+import os
+
+import pytest
+
+from nhtsa.api.vin_decoding.compiled import CompiledVinDecoder
+from nhtsa.api.vin_decoding.offline import OfflineVinDecoder, import_vpic_csv_directory
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# DecodeVinValues answers for the rows in fixtures/vpic: three Honda WMIs over two VIN schemas whose pattern keys
+# use '[...]' classes (including '[^...]'), '*', '_' and '%'.
+with open(os.path.join(FIXTURES, "vpic_answers.json"), "r", encoding="utf-8") as f:
+    ANSWERS = json.load(f)
+
+
+@pytest.fixture(scope="module")
+def database(tmp_path_factory):
+    return import_vpic_csv_directory(os.path.join(FIXTURES, "vpic"), str(tmp_path_factory.mktemp("vpic") / "vpic.sqlite"))
+
+
+@pytest.fixture(scope="module")
+def offline(database):
+    decoder = OfflineVinDecoder(database)
+    yield decoder
+    decoder.close()
+
+
+@pytest.fixture(scope="module")
+def compiled(database):
+    decoder = CompiledVinDecoder(database)
+    yield decoder
+    decoder.close()
+
+
+@pytest.mark.parametrize("answer", ANSWERS, ids=[answer["VIN"] for answer in ANSWERS])
+def test_offline_decoder_matches_vpic(offline, answer):
+    assert offline.decode_flat_values(answer["VIN"]) == answer
+
+
+@pytest.mark.parametrize("answer", ANSWERS, ids=[answer["VIN"] for answer in ANSWERS])
+def test_compiled_decoder_matches_offline_decoder(offline, compiled, answer):
+    assert compiled.decode_flat_values(answer["VIN"]) == offline.decode_flat_values(answer["VIN"])
+
+
+def test_compiled_decoder_matches_with_model_year(offline, compiled):
+    for answer in ANSWERS:
+        for model_year in (2003, 2006, 2009):
+            assert compiled.decode_flat_values(answer["VIN"], model_year) == offline.decode_flat_values(answer["VIN"], model_year)
+
+
+def test_decode_flat_batch(compiled):
+    columns = compiled.decode_flat_batch([answer["VIN"] for answer in ANSWERS])
+    assert columns["make"] == [answer["Make"] for answer in ANSWERS]
+    assert columns["model"] == [answer["Model"] for answer in ANSWERS]
+    assert columns["error_code"] == [answer["ErrorCode"] for answer in ANSWERS]
@@ -0,0 +1,70 @@
+import asyncio
+import hashlib
+
+import httpx
+import pytest
+
+from nhtsa.api.static_files.index import StaticFilesAPI
+
+URL = "https://static.nhtsa.gov/odi/ffdd/cmpl/FLAT_CMPL.zip"
+
+
+class FakeClient:
+    """Answers HEAD with the given headers and streams `body` for ranged GETs (failing `failures` times first)."""
+    def __init__(self, headers, body=b"", failures=0):
+        self.headers = headers
+        self.body = body
+        self.failures = failures
+        self.download_store = None
+
+    async def _request(self, method, url, **kwargs):
+        return httpx.Response(200, headers=self.headers, request=httpx.Request(method, url))
+
+    async def _stream(self, method, url, sink, response_hook=None, headers=None, **kwargs):
+        if self.failures:
+            self.failures -= 1
+            raise httpx.ConnectError("connection reset")
+        start, end = (int(bound) for bound in headers["Range"].split("=")[1].split("-"))
+        response = httpx.Response(206, request=httpx.Request(method, url))
+        await response_hook(response)
+        await sink(self.body[start:end + 1])
+        return response
+
+
+def test_empty_file(tmp_path):
+    destination = str(tmp_path / "empty.zip")
+    progress = []
+    api = StaticFilesAPI(FakeClient({"Content-Length": "0", "Accept-Ranges": "bytes"}))
+    result = asyncio.run(api.download_file_resumable(URL, destination, expected_sha256=hashlib.sha256(b"").hexdigest(), progress_callback=lambda *args: progress.append(args)))
+    assert result == destination
+    assert (tmp_path / "empty.zip").read_bytes() == b""
+    assert progress == [(0, 0)]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["empty.zip"]
+
+
+def test_resumes_after_failure(tmp_path, monkeypatch):
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    body = bytes(range(256)) * 40
+    destination = str(tmp_path / "file.zip")
+    api = StaticFilesAPI(FakeClient({"Content-Length": str(len(body)), "Accept-Ranges": "bytes"}, body, failures=1))
+    asyncio.run(api.download_file_resumable(URL, destination, chunk_size=1024, expected_sha256=hashlib.sha256(body).hexdigest()))
+    assert (tmp_path / "file.zip").read_bytes() == body
+    assert sleeps == [1]
+
+
+def test_no_back_off_after_last_attempt(tmp_path, monkeypatch):
+    sleeps = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(asyncio, "sleep", sleep)
+    api = StaticFilesAPI(FakeClient({"Content-Length": "10", "Accept-Ranges": "bytes"}, b"0123456789", failures=3))
+    with pytest.raises(httpx.RequestError, match="after 3 attempts"):
+        asyncio.run(api.download_file_resumable(URL, str(tmp_path / "file.zip"), max_attempts=3))
+    assert sleeps == [1, 2]